@@ -0,0 +1,80 @@
+# coding: utf-8
+"""
+    compare the size and the speed of the stacks of RSS entries stored
+    with pickle, as done before django_th.serializers, and with msgpack
+
+    python benchmarks/bench_stacks.py [number of entries]
+"""
+import os
+import pickle
+import random
+import sys
+import time
+import timeit
+
+import arrow
+import feedparser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from django_th.serializers import StackCompressor, \
+    StackSerializer  # noqa: E402
+
+ITEM = '<item><title>entry {i}</title><link>https://foo.bar/{i}</link>' \
+       '<description>&lt;p&gt;{text}&lt;/p&gt;</description>' \
+       '<guid>https://foo.bar/{i}</guid><author>foo@bar.baz</author>' \
+       '<pubDate>{date}</pubDate></item>'
+
+
+def entries(count):
+    start = arrow.get('2017-09-01')
+    words = 'lorem ipsum dolor sit amet consectetur adipiscing elit sed ' \
+            'do eiusmod tempor incididunt ut labore et dolore magna ' \
+            'aliqua'.split()
+    rand = random.Random(0)
+    items = ''.join(ITEM.format(
+        i=i, text=' '.join(rand.choice(words) for _ in range(80)),
+        date=start.shift(minutes=i * 10).format(
+            'ddd, DD MMM YYYY HH:mm:ss') + ' GMT') for i in range(count))
+    feed = feedparser.parse(
+        '<?xml version="1.0" encoding="utf-8"?><rss version="2.0">'
+        '<channel><title>foo</title>{}</channel></rss>'.format(items))
+    for entry in feed.entries:
+        entry['my_date'] = arrow.get(time.mktime(entry.published_parsed))
+    return feed.entries
+
+
+def with_pickle():
+    return (lambda value: pickle.dumps(value, -1)), pickle.loads
+
+
+def with_msgpack():
+    serializer = StackSerializer({})
+    return serializer.dumps, serializer.loads
+
+
+def with_msgpack_zstd():
+    serializer = StackSerializer({})
+    compressor = StackCompressor({})
+    return (lambda value: compressor.compress(serializer.dumps(value)),
+            lambda data: serializer.loads(compressor.decompress(data)))
+
+
+def main(count):
+    items = entries(count)
+    for func in (with_pickle, with_msgpack, with_msgpack_zstd):
+        dumps, loads = func()
+        data = dumps(items)
+        encode = min(timeit.repeat(lambda: dumps(items),
+                                   number=10, repeat=3)) / 10
+        decode = min(timeit.repeat(lambda: loads(data),
+                                   number=10, repeat=3)) / 10
+        print('{:18} {:6} entries : {:6} bytes per entry, encode {:8.2f} ms,'
+              ' decode {:8.2f} ms'.format(func.__name__, count,
+                                          len(data) // count,
+                                          encode * 1000, decode * 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,62 @@
+# coding: utf-8
+"""
+    compare the filtering by date of the RSS entries with arrow, as done
+    before django_th.timestamps, and with the UTC timestamps
+
+    python benchmarks/bench_timestamps.py [number of entries]
+"""
+import datetime
+import os
+import sys
+import time
+import timeit
+
+import arrow
+import feedparser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from django_th.timestamps import newer  # noqa: E402
+
+TIME_ZONE = 'Europe/Paris'
+DATE_TRIGGERED = '2017-10-01 12:00:00+00:00'
+
+
+def entries(count):
+    start = arrow.get('2017-09-01').timestamp
+    return [feedparser.FeedParserDict(
+        title='entry {}'.format(i),
+        published_parsed=time.gmtime(start + i * 600))
+        for i in range(count)]
+
+
+def with_arrow(items, date_triggered):
+    now = arrow.utcnow().to(TIME_ZONE)
+    kept = []
+    for entry in items:
+        published = datetime.datetime.utcfromtimestamp(
+            time.mktime(entry.published_parsed))
+        published = arrow.get(str(published)).to(TIME_ZONE)
+        date_triggered = arrow.get(str(date_triggered)).to(TIME_ZONE)
+        if now >= published >= date_triggered:
+            kept.append(entry)
+    return kept
+
+
+def with_timestamps(items, date_triggered):
+    return newer(items, date_triggered)
+
+
+def main(count):
+    items = entries(count)
+    for func in (with_arrow, with_timestamps):
+        best = min(timeit.repeat(lambda: func(items, DATE_TRIGGERED),
+                                 number=10, repeat=3)) / 10
+        print('{:16} {:6} entries : {:8.2f} ms, {} kept'.format(
+            func.__name__, count, best * 1000,
+            len(func(items, DATE_TRIGGERED))))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
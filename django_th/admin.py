@@ -4,6 +4,7 @@ from django_th.forms.services import ServicesAdminForm
 from django_th.models import ServicesActivated
 from django_th.models import UserService
 from django_th.models import TriggerService
+from django_th.rows import invalidate
 
 
 class ServicesManagedAdmin(admin.ModelAdmin):
@@ -14,6 +15,7 @@ class ServicesManagedAdmin(admin.ModelAdmin):
 
     def make_status_enable(self, request, queryset):
         rows_updated = queryset.update(status=True)
+        invalidate(queryset.model)
         if rows_updated == 1:
             message_bit = "1 service was"
         else:
@@ -23,6 +25,7 @@ class ServicesManagedAdmin(admin.ModelAdmin):
 
     def make_status_disable(self, request, queryset):
         rows_updated = queryset.update(status=False)
+        invalidate(queryset.model)
 
         if rows_updated == 1:
             message_bit = "1 service was"
@@ -96,7 +99,8 @@ class TriggerServiceAdmin(admin.ModelAdmin):
         get the list of the User Service
     """
     list_display = ('user', 'provider', 'consumer', 'description',
-                    'date_created', 'date_triggered', 'status')
+                    'date_created', 'date_triggered', 'poll_interval',
+                    'next_run_at', 'status')
     list_filter = [
         ('user', admin.RelatedOnlyFieldListFilter),
         ProviderServiceListFilter,
@@ -0,0 +1,202 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import copy
+import datetime
+import hashlib
+import os
+from functools import lru_cache
+
+# django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.timezone import now
+from logging import getLogger
+
+__all__ = ['Blob', 'BlobNotFound', 'blob_storage', 'offload', 'resolve',
+           'sweep']
+
+logger = getLogger('django_th.trigger_happy')
+
+
+class Blob(object):
+    """
+        a long text of the data, eg the content of an article, stored
+        outside of redis under its sha256 : stored once, whatever the
+        number of triggers reading it
+    """
+
+    def __init__(self, digest):
+        self.digest = digest
+
+    @property
+    def name(self):
+        """
+            name of the file in the blob storage, eg ab/cd/abcd...
+        """
+        return '{}/{}/{}'.format(self.digest[:2], self.digest[2:4],
+                                 self.digest)
+
+    def __eq__(self, other):
+        return isinstance(other, Blob) and other.digest == self.digest
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __repr__(self):
+        return 'Blob({})'.format(self.digest)
+
+
+class BlobNotFound(LookupError):
+    """
+        the text of a Blob is not in the blob storage, eg dropped by hand
+        or stored on another node
+    """
+
+
+@lru_cache(maxsize=None)
+def _storage(location):
+    return FileSystemStorage(location=location)
+
+
+def blob_storage():
+    """
+        the storage of settings.DJANGO_TH['blob_location']
+        :rtype: FileSystemStorage
+    """
+    return _storage(settings.DJANGO_TH.get('blob_location', 'blobs'))
+
+
+def _walk(value, func):
+    """
+        the value with func applied to its texts and blobs ; the dicts
+        and lists are copied only when one of their values changed
+    """
+    if isinstance(value, dict):
+        changed = {}
+        for key, item in value.items():
+            new = _walk(item, func)
+            if new is not item:
+                changed[key] = new
+        if not changed:
+            return value
+        value = copy.copy(value)
+        for key, new in changed.items():
+            # as is : FeedParserDict renames some keys
+            dict.__setitem__(value, key, new)
+        return value
+    if isinstance(value, list):
+        items = [_walk(item, func) for item in value]
+        if all(new is item for new, item in zip(items, value)):
+            return value
+        return items
+    if isinstance(value, (str, Blob)):
+        return func(value)
+    return value
+
+
+def offload(value, min_size=None):
+    """
+        replace the texts of the data longer than min_size bytes by a Blob
+        :param value: the data, or a list of them
+        :param min_size: settings.DJANGO_TH['blob_min_size'] by default,
+                         0 (the default setting) to keep the texts
+        :return: the data, the ones given are not modified
+    """
+    if min_size is None:
+        min_size = settings.DJANGO_TH.get('blob_min_size', 0)
+    if not min_size:
+        return value
+    storage = blob_storage()
+
+    def store(text):
+        # at most 4 bytes per character
+        if isinstance(text, Blob) or len(text) * 4 < min_size:
+            return text
+        data = text.encode('utf-8')
+        if len(data) < min_size:
+            return text
+        blob = Blob(hashlib.sha256(data).hexdigest())
+        if not storage.exists(blob.name):
+            storage.save(blob.name, ContentFile(data))
+        else:
+            # stored again : sweep() keeps it until the data are stored
+            try:
+                os.utime(storage.path(blob.name))
+            except OSError:
+                # dropped by sweep() meanwhile
+                storage.save(blob.name, ContentFile(data))
+        return blob
+
+    return _walk(value, store)
+
+
+def resolve(value, strict=True):
+    """
+        read the texts of the data replaced by a Blob
+        :param value: the data, or a list of them
+        :param strict: False to replace the texts lost by an empty one
+        :return: the data, the ones given are not modified
+        :raise BlobNotFound: a text is lost
+    """
+    storage = blob_storage()
+    texts = {}
+
+    def read(blob):
+        if not isinstance(blob, Blob):
+            return blob
+        if blob.digest not in texts:
+            try:
+                with storage.open(blob.name) as f:
+                    texts[blob.digest] = f.read().decode('utf-8')
+            except (IOError, OSError) as e:
+                if strict:
+                    raise BlobNotFound(blob.digest) from e
+                logger.error("text {} lost - {}".format(blob.digest, e))
+                texts[blob.digest] = ''
+        return texts[blob.digest]
+
+    return _walk(value, read)
+
+
+def _files(storage, path=''):
+    directories, files = storage.listdir(path)
+    for directory in directories:
+        for name in _files(storage, '{}{}/'.format(path, directory)):
+            yield name
+    for name in files:
+        yield path + name
+
+
+def sweep(values, grace=3600):
+    """
+        drop the texts no data refer to any more
+        :param values: everything stored, see StackStore.stored()
+        :param grace: seconds a text is kept after being stored, for the
+                      data not stored yet
+        :return: number of texts dropped
+    """
+    storage = blob_storage()
+    if not storage.exists(''):
+        return 0
+    used = set()
+
+    def mark(blob):
+        if isinstance(blob, Blob):
+            used.add(blob.name)
+        return blob
+
+    for value in values:
+        _walk(value, mark)
+    limit = now() - datetime.timedelta(seconds=grace)
+    dropped = 0
+    for name in _files(storage):
+        if name not in used and storage.get_modified_time(name) < limit:
+            storage.delete(name)
+            dropped += 1
+    return dropped
@@ -0,0 +1,216 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import asyncio
+import functools
+import signal
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+
+# django
+from django.conf import settings
+from django.db import close_old_connections
+from logging import getLogger
+
+# trigger happy
+from django_th.models import TriggerService
+
+logger = getLogger('django_th.trigger_happy')
+
+ENGINES = ('pool', 'async')
+
+OK = 'ok'
+ERROR = 'error'
+TIMEOUT = 'timeout'
+
+
+class DeadlineExceeded(BaseException):
+    """
+        raised in the middle of the trigger : not an Exception, so that
+        the services catching them do not swallow it
+    """
+
+
+def _deadline_reached(signum, frame):
+    raise DeadlineExceeded()
+
+
+def _by_id(args):
+    """
+        run func for one trigger in a process of the pool
+        the trigger is loaded here from its id, and only a small
+        status record goes back to the parent
+        :param args: func, trigger id, deadline in seconds
+        :return: trigger id, status, elapsed seconds
+    """
+    func, trigger_id, deadline = args
+    start = time.time()
+    status = OK
+    if deadline:
+        signal.signal(signal.SIGALRM, _deadline_reached)
+        signal.setitimer(signal.ITIMER_REAL, deadline)
+    try:
+        service = TriggerService.objects.select_related(
+            'consumer__name', 'provider__name', 'user').get(id=trigger_id)
+        func(service)
+    except DeadlineExceeded:
+        status = TIMEOUT
+        logger.warning("trigger {} - took more than {}s".format(
+            trigger_id, deadline))
+    except Exception as e:
+        status = ERROR
+        logger.error("trigger {} - {}".format(trigger_id, e))
+    finally:
+        if deadline:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return trigger_id, status, time.time() - start
+
+
+def _ids(triggers):
+    """
+        stream the ids of the triggers without loading the objects
+    """
+    if hasattr(triggers, 'values_list'):
+        return triggers.values_list('id', flat=True).iterator()
+    return (trigger.id for trigger in triggers)
+
+
+def run_pool(func, triggers, deadline=None, chunksize=None):
+    """
+        run func for each trigger in a pool of processes
+        the ids are sent by chunks and the results come back as soon
+        as they are ready ; a trigger that exceeds its deadline is
+        stopped without stopping the others
+        :param func: Read().reading or Pub().publishing
+        :param triggers: iterable of TriggerService
+        :param deadline: seconds allowed to each trigger
+        :param chunksize: number of ids sent at once to a process
+        :return: number of triggers by status
+    """
+    if deadline is None:
+        deadline = settings.DJANGO_TH.get('trigger_timeout', 60)
+    if chunksize is None:
+        chunksize = settings.DJANGO_TH.get('chunksize', 10)
+    statuses = Counter()
+    with Pool(processes=settings.DJANGO_TH.get('processes')) as pool:
+        tasks = ((func, trigger_id, deadline)
+                 for trigger_id in _ids(triggers))
+        for trigger_id, status, elapsed in pool.imap_unordered(
+                _by_id, tasks, chunksize=chunksize):
+            statuses[status] += 1
+    return statuses
+
+
+def _call(func, trigger, started=None):
+    """
+        run func in a thread of the executor, with its own db connection
+        :param func: the function to call
+        :param trigger: the TriggerService to handle
+        :param started: function called once a thread runs the trigger
+    """
+    if started is not None:
+        started()
+    close_old_connections()
+    try:
+        return func(trigger)
+    finally:
+        close_old_connections()
+
+
+async def _handle(executor, semaphore, func, trigger, deadline):
+    """
+        one coroutine per trigger ; the blocking service SDK
+        is offloaded to the executor
+    """
+    loop = asyncio.get_event_loop()
+    async with semaphore:
+        started = asyncio.Event()
+        running = loop.run_in_executor(
+            executor, _call, func, trigger,
+            functools.partial(loop.call_soon_threadsafe, started.set))
+        try:
+            # the deadline starts when a thread runs the trigger, not while
+            # it waits for the thread of a trigger that timed out
+            await started.wait()
+            await asyncio.wait_for(running, deadline)
+        except asyncio.TimeoutError:
+            logger.warning("{} - took more than {}s".format(
+                trigger, deadline))
+            return TIMEOUT
+        except Exception as e:
+            logger.error("{} - {}".format(trigger, e))
+            return ERROR
+    return OK
+
+
+async def _handle_all(func, triggers, concurrency, deadline):
+    """
+        schedule all the triggers, at most `concurrency` at a time
+        a thread can not be stopped : the one of a trigger that exceeded
+        its deadline runs until the requests of the service time out, the
+        run does not wait for it
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        return await asyncio.gather(
+            *[_handle(executor, semaphore, func, trigger, deadline)
+              for trigger in triggers])
+    finally:
+        executor.shutdown(wait=False)
+
+
+def run_async(func, triggers, concurrency=None, deadline=None):
+    """
+        run func for each trigger as coroutines
+        with at most `concurrency` triggers in flight at once
+        :param func: Read().reading or Pub().publishing
+        :param triggers: iterable of TriggerService
+        :param concurrency: number of triggers handled at the same time
+        :param deadline: seconds allowed to each trigger
+        :return: number of triggers by status
+    """
+    if concurrency is None:
+        concurrency = settings.DJANGO_TH.get('concurrency', 50)
+    if deadline is None:
+        deadline = settings.DJANGO_TH.get('trigger_timeout', 60)
+    # the queryset is evaluated here, before any thread touches the db
+    triggers = list(triggers)
+    if not triggers:
+        return Counter()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        statuses = loop.run_until_complete(
+            _handle_all(func, triggers, concurrency, deadline or None))
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+    return Counter(statuses)
+
+
+def run(func, triggers, engine=None, concurrency=None, deadline=None):
+    """
+        dispatch the triggers to the engine set in the options
+        or in settings.DJANGO_TH['engine']
+        :param func: Read().reading or Pub().publishing
+        :param triggers: iterable of TriggerService
+        :param engine: 'pool' or 'async'
+        :param concurrency: number of triggers in flight for 'async'
+        :param deadline: seconds allowed to each trigger
+        :return: number of triggers by status
+    """
+    engine = engine or settings.DJANGO_TH.get('engine', 'pool')
+    if engine == 'async':
+        statuses = run_async(func, triggers, concurrency, deadline)
+    else:
+        statuses = run_pool(func, triggers, deadline)
+    if statuses:
+        logger.info("{} triggers : {}".format(
+            sum(statuses.values()), ', '.join(
+                '{} {}'.format(count, status)
+                for status, count in sorted(statuses.items()))))
+    return statuses
@@ -1,5 +1,7 @@
+import re
+
 from django import forms
-from django.forms import TextInput, PasswordInput
+from django.forms import TextInput, PasswordInput, Textarea
 from django.utils.translation import ugettext_lazy as _
 
 # trigger happy
@@ -10,8 +12,25 @@ from django_th.models import User, UserService, \
 class TriggerServiceForm(forms.ModelForm):
 
     """
-        Form to edit the description
+        Form to edit the description and the rules filtering the data
     """
+    def _clean_rules(self, field):
+        rules = self.cleaned_data.get(field, '')
+        for rule in rules.splitlines():
+            try:
+                re.compile(rule.strip())
+            except re.error as e:
+                raise forms.ValidationError(
+                    _('Invalid rule %(rule)s : %(error)s'),
+                    params={'rule': rule, 'error': e})
+        return rules
+
+    def clean_match(self):
+        return self._clean_rules('match')
+
+    def clean_does_not_match(self):
+        return self._clean_rules('does_not_match')
+
     class Meta:
 
         """
@@ -21,9 +40,12 @@ class TriggerServiceForm(forms.ModelForm):
         exclude = ['provider', 'consumer', 'user', 'date_triggered',
                    'date_created', 'status', 'result', 'date_result',
                    'consumer_failed', 'provider_failed', 'counter_ok',
-                   'counter_ko']
+                   'counter_ko', 'poll_interval', 'next_run_at']
         widgets = {
             'description': TextInput(attrs={'class': 'form-control'}),
+            'match': Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'does_not_match': Textarea(attrs={'class': 'form-control',
+                                              'rows': 3}),
         }
 
 
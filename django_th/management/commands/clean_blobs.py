@@ -0,0 +1,23 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand
+from logging import getLogger
+
+from django_th.blobs import sweep
+from django_th.stack_store import stack_store
+
+logger = getLogger('django_th.trigger_happy')
+
+
+class Command(BaseCommand):
+
+    help = 'Drop the long texts of the data no trigger will publish'
+
+    def handle(self, *args, **options):
+        """
+            keep the texts of the stacks and of the outboxes only
+        """
+        dropped = sweep(stack_store().stored())
+        logger.info("{} texts dropped".format(dropped))
@@ -1,18 +1,14 @@
 #!/usr/bin/env python
 # coding: utf-8
 from __future__ import unicode_literals
-from multiprocessing import Pool, TimeoutError
 # django
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from logging import getLogger
-from django.db.models import Q
 # trigger happy
-from django_th.models import TriggerService
+from django_th.engines import ENGINES, run
 from django_th.publish import Pub
-
-# create logger
-logger = getLogger('django_th.trigger_happy')
+from django_th.scheduler import active_triggers
+from django_th.work_queue import WorkQueue, run_distributed
 
 
 class Command(BaseCommand):
@@ -20,25 +16,39 @@ class Command(BaseCommand):
     help = 'Trigger all the services and '\
            'publish the data coming from the cache'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--engine', dest='engine', choices=ENGINES,
+                            help='pool (one process per trigger) or async '
+                                 '(coroutines with bounded concurrency)')
+        parser.add_argument('--concurrency', dest='concurrency', type=int,
+                            help='number of triggers handled at the same '
+                                 'time by the async engine')
+        parser.add_argument('--deadline', dest='deadline', type=int,
+                            help='seconds allowed to each trigger')
+        parser.add_argument('--distributed', dest='distributed',
+                            action='store_true', default=None,
+                            help='share the triggers with the other nodes '
+                                 'through redis')
+
     def handle(self, *args, **options):
         """
             get all the triggers that need to be handled
         """
         from django.db import connection
         connection.close()
-        failed_tries = settings.DJANGO_TH.get('failed_tries', 10)
-        trigger = TriggerService.objects.filter(
-            Q(provider_failed__lte=failed_tries) |
-            Q(consumer_failed__lte=failed_tries),
-            status=True,
-            user__is_active=True,
-            provider__name__status=True,
-            consumer__name__status=True,
-        ).select_related('consumer__name', 'provider__name')
-        try:
-            with Pool(processes=settings.DJANGO_TH.get('processes')) as pool:
-                p = Pub()
-                result = pool.map_async(p.publishing, trigger)
-                result.get(timeout=60)
-        except TimeoutError as e:
-            logger.warning(e)
+        trigger = active_triggers()
+
+        def publishing(triggers):
+            run(Pub().publishing, triggers,
+                engine=options.get('engine'),
+                concurrency=options.get('concurrency'),
+                deadline=options.get('deadline'))
+
+        if options.get('distributed') or \
+                settings.DJANGO_TH.get('distributed', False):
+            # a queue of its own : a trigger can be read and published at
+            # the same time
+            run_distributed(publishing, trigger,
+                            queue=WorkQueue(name='django_th_publish_queue'))
+        else:
+            publishing(trigger)
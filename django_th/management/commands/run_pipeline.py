@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+# django
+from django.core.management.base import BaseCommand
+from django.conf import settings
+# trigger happy
+from django_th.pipeline import Pipeline
+from django_th.scheduler import claim_due_triggers, due_triggers
+from django_th.work_queue import run_distributed
+
+
+class Command(BaseCommand):
+
+    help = 'Trigger all the services and publish their data '\
+           'without waiting for the next publish'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', dest='concurrency', type=int,
+                            help='number of providers read at the same time')
+        parser.add_argument('--queue-size', dest='queue_size', type=int,
+                            help='number of triggers waiting to be '
+                                 'published before spilling in the cache')
+        parser.add_argument('--consumers', dest='consumers', type=int,
+                            help='number of threads publishing the data')
+        parser.add_argument('--distributed', dest='distributed',
+                            action='store_true', default=None,
+                            help='share the triggers with the other nodes '
+                                 'through redis')
+
+    def handle(self, *args, **options):
+        """
+            get all the triggers that need to be handled
+        """
+        from django.db import connection
+        connection.close()
+        pipeline = Pipeline(queue_size=options.get('queue_size'),
+                            consumers=options.get('consumers'))
+
+        def streaming(triggers):
+            pipeline.run(triggers, concurrency=options.get('concurrency'))
+
+        if options.get('distributed') or \
+                settings.DJANGO_TH.get('distributed', False):
+            run_distributed(streaming, due_triggers())
+        else:
+            streaming(claim_due_triggers())
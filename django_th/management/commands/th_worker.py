@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+import signal
+import threading
+# django
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.timezone import now as tz_now
+from logging import getLogger
+# trigger happy
+from django_th.pipeline import Pipeline
+from django_th.scheduler import claim_due_triggers, due_triggers, \
+    next_due
+from django_th.services import default_provider
+from django_th.stack_store import single_process, stack_store
+from django_th.work_queue import run_distributed
+
+logger = getLogger('django_th.trigger_happy')
+
+
+class Command(BaseCommand):
+
+    help = 'Keep running and trigger all the services, '\
+           'until SIGINT or SIGTERM is received'
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self.stopping = threading.Event()
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', dest='interval', type=int,
+                            help='maximum seconds to wait between two runs')
+        parser.add_argument('--concurrency', dest='concurrency', type=int,
+                            help='number of providers read at the same time')
+        parser.add_argument('--once', dest='once', action='store_true',
+                            default=False,
+                            help='handle the triggers once then exit')
+        parser.add_argument('--distributed', dest='distributed',
+                            action='store_true', default=None,
+                            help='share the triggers with the other nodes '
+                                 'through redis')
+
+    def stop(self, signum, frame):
+        """
+            finish the current run then exit
+        """
+        logger.info('worker stopping (signal {})'.format(signum))
+        self.stopping.set()
+
+    @staticmethod
+    def waiting_time(interval):
+        """
+            seconds to wait until the next trigger is due, at most interval
+        """
+        next_run_at = next_due()
+        if next_run_at is None:
+            return interval
+        return max(0, min(interval, (next_run_at - tz_now()).total_seconds()))
+
+    def handle(self, *args, **options):
+        """
+            load the services once then handle the due triggers
+            as soon as they are due, or every `interval` seconds
+        """
+        interval = options.get('interval') or \
+            settings.DJANGO_TH.get('worker_interval', 60)
+        handlers = {signum: signal.signal(signum, self.stop)
+                    for signum in (signal.SIGINT, signal.SIGTERM)}
+        # the services stay loaded for the lifetime of the worker
+        if not default_provider:
+            default_provider.load_services()
+        distributed = options.get('distributed') or \
+            settings.DJANGO_TH.get('distributed', False)
+        if not distributed:
+            single_process()
+        # a store the other nodes can not see is refused before starting
+        stack_store()
+        pipeline = Pipeline()
+
+        def streaming(triggers):
+            pipeline.run(triggers, concurrency=options.get('concurrency'))
+
+        logger.info('worker started')
+        try:
+            while not self.stopping.is_set():
+                # drop the connections that outlived CONN_MAX_AGE
+                close_old_connections()
+                try:
+                    if distributed:
+                        run_distributed(streaming, due_triggers())
+                    else:
+                        streaming(claim_due_triggers())
+                except Exception as e:
+                    logger.exception(e)
+                if options.get('once'):
+                    break
+                self.stopping.wait(self.waiting_time(interval))
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+            close_old_connections()
+        logger.info('worker stopped')
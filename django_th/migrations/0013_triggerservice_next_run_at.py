@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+        this migration adds the polling interval of each trigger
+        and the date of its next run, indexed to fetch the due triggers
+    """
+
+    dependencies = [
+        ('django_th', '0012_auto_20171003_2152'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='triggerservice',
+            name='poll_interval',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='triggerservice',
+            name='next_run_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+        this migration adds the validators (ETag and Last-Modified)
+        of the last response of each RSS feed
+    """
+
+    dependencies = [
+        ('django_th', '0013_triggerservice_next_run_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rss',
+            name='etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='rss',
+            name='modified',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
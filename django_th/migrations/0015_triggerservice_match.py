@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+        this migration adds the rules filtering the data of each trigger
+    """
+
+    dependencies = [
+        ('django_th', '0014_rss_etag_modified'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='triggerservice',
+            name='match',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='triggerservice',
+            name='does_not_match',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
@@ -5,7 +5,7 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils.timezone import now
 from django.utils.translation import ugettext_lazy as _
@@ -13,6 +13,7 @@ from django.utils.translation import ugettext_lazy as _
 from logging import getLogger
 
 from django_th.signals import digest_event
+from django_th.stack_store import shared_stack_store
 from django_th.tools import warn_user_and_admin
 
 logger = getLogger('django_th.trigger_happy')
@@ -111,6 +112,15 @@ class TriggerService(models.Model):
     counter_ok = models.IntegerField(default=0)
     counter_ko = models.IntegerField(default=0)
 
+    # minutes to wait between two reads of the provider, 0 for each run
+    poll_interval = models.PositiveIntegerField(default=0)
+    # the trigger is not read before that date
+    next_run_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    # regular expressions, one per line, the data read have to match
+    # or not to be published
+    match = models.TextField(blank=True, default='')
+    does_not_match = models.TextField(blank=True, default='')
+
     def show(self):
         """
 
@@ -217,6 +227,17 @@ post_save.connect(th_create_user_profile, sender=User,
                   dispatch_uid="create_user_profile")
 
 
+@receiver(post_delete, sender=TriggerService,
+          dispatch_uid='django_th_trigger_outbox')
+def trigger_deleted(sender, instance, **kwargs):
+    # the outbox does not expire : the data of a trigger deleted will never
+    # be published ; the ones kept in the memory of th_worker are lost
+    # when it stops
+    store = shared_stack_store()
+    if store is not None:
+        store.clear(instance.id)
+
+
 @receiver(digest_event)
 def digest_save(sender, **kwargs):
     """
@@ -252,3 +273,7 @@ def digest_save(sender, **kwargs):
                           duration=duration,
                           date_end=str(date_end),
                           provider=sender)
+
+
+# the configuration rows cached by the processes are dropped when saved
+from django_th import rows  # noqa
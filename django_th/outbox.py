@@ -0,0 +1,222 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import os
+import socket
+
+# django
+from django.conf import settings
+from django.core.cache import caches
+from django_redis import get_redis_connection
+from logging import getLogger
+from redis.exceptions import ResponseError, WatchError
+
+logger = getLogger('django_th.trigger_happy')
+
+
+class Outbox(object):
+    """
+        the data of a trigger waiting to be published
+
+        a redis stream without timeout, oldest data first, read by the
+        consumer group django_th where each process is a consumer : each
+        data is dropped once the consumer published it. The ones that
+        failed are given back first to the same process at its next run,
+        or to another one once they waited
+        settings.DJANGO_TH['outbox_claim_after'] seconds. After
+        settings.DJANGO_TH['outbox_max_tries'] tries they move to the dead
+        letters of the trigger. The data are pushed and taken in bulk
+    """
+    group = 'django_th'
+    # the keys of all the outboxes, and of their dead letters
+    pattern = 'django_th_outbox_*'
+    # number of dead letters kept per trigger
+    dead_length = 1000
+
+    def __init__(self, trigger_id, connection=None):
+        """
+            :param trigger_id: id of the trigger
+            :param connection: redis connection, the one of the
+                               django_th cache by default
+        """
+        self.key = 'django_th_outbox_{}'.format(trigger_id)
+        self.dead_key = 'django_th_outbox_dead_{}'.format(trigger_id)
+        self.cache = caches['django_th']
+        self.connection = connection
+        self.consumer = '{}:{}'.format(socket.gethostname(), os.getpid())
+        self.claim_after = settings.DJANGO_TH.get('outbox_claim_after', 600)
+        self.max_tries = settings.DJANGO_TH.get('outbox_max_tries', 5)
+
+    @property
+    def redis(self):
+        if self.connection is None:
+            self.connection = get_redis_connection('django_th')
+        return self.connection
+
+    def __len__(self):
+        return self.redis.xlen(self.key)
+
+    def push(self, items, stack=None):
+        """
+            put data at the end of the outbox
+            :param items: the data read from the provider
+            :param stack: cache stack the data come from, dropped at the
+                          same time as they are added
+        """
+        pipe = self.redis.pipeline()
+        for item in items or []:
+            # stored like the other values of the cache
+            pipe.xadd(self.key, {'data': self.cache.client.encode(item)})
+        if stack is not None:
+            pipe.delete(self.cache.make_key(stack))
+        pipe.execute()
+
+    def _drain(self, stack):
+        """
+            put the data of a cache stack, eg the data recycled, at the end
+            of the outbox ; the stack is watched : the data added to it
+            meanwhile are not dropped
+        """
+        key = self.cache.make_key(stack)
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    value = pipe.get(key)
+                    if value is None:
+                        return
+                    pipe.multi()
+                    for item in self.cache.client.decode(value) or []:
+                        pipe.xadd(self.key,
+                                  {'data': self.cache.client.encode(item)})
+                    pipe.delete(key)
+                    pipe.execute()
+                    return
+                except WatchError:
+                    continue
+
+    def _group(self):
+        """
+            create the consumer group, when nothing has been pushed yet
+        """
+        try:
+            self.redis.xgroup_create(self.key, self.group, id='0',
+                                     mkstream=True)
+        except ResponseError as e:
+            # created by another process meanwhile
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def _claim(self):
+        """
+            take back the data the other processes failed to publish, or
+            left when they stopped, then forget the processes gone
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        # the data are read with the ones that failed in this process :
+        # JUSTID does not count a try
+        pipe.xautoclaim(self.key, self.group, self.consumer,
+                        self.claim_after * 1000, '0-0', justid=True)
+        pipe.xinfo_consumers(self.key, self.group)
+        try:
+            _, consumers = pipe.execute()
+        except ResponseError as e:
+            if 'NOGROUP' not in str(e):
+                raise
+            self._group()
+            return
+        for consumer in consumers:
+            if consumer['pending'] == 0 and \
+                    consumer['idle'] > self.claim_after * 1000 and \
+                    consumer['name'] != self.consumer.encode():
+                self.redis.xgroup_delconsumer(self.key, self.group,
+                                              consumer['name'])
+
+    def _read(self, since, count):
+        """
+            :param since: 0 for the data given before to this process and
+                          not published, > for the others
+            :return: the data and their id, as stored
+        """
+        streams = self.redis.xreadgroup(self.group, self.consumer,
+                                        {self.key: since}, count=count)
+        return [(entry_id, fields[b'data'])
+                for _, entries in streams for entry_id, fields in entries
+                if fields]
+
+    def _bury(self, entries):
+        """
+            move the data tried too many times to the dead letters
+            :param entries: the data given before to this process
+            :return: the others
+        """
+        if not entries:
+            return entries
+        tries = {pending['message_id']: pending['times_delivered']
+                 for pending in self.redis.xpending_range(
+                     self.key, self.group, entries[0][0], entries[-1][0],
+                     len(entries), consumername=self.consumer)}
+        dead = [(entry_id, data) for entry_id, data in entries
+                if tries.get(entry_id, 0) > self.max_tries]
+        if not dead:
+            return entries
+        pipe = self.redis.pipeline()
+        for entry_id, data in dead:
+            pipe.xadd(self.dead_key, {'data': data, 'id': entry_id},
+                      maxlen=self.dead_length, approximate=True)
+        pipe.xack(self.key, self.group, *[entry_id for entry_id, _ in dead])
+        pipe.xdel(self.key, *[entry_id for entry_id, _ in dead])
+        pipe.execute()
+        logger.error("{} - {} data failed {} times, moved to {}".format(
+            self.key, len(dead), self.max_tries, self.dead_key))
+        return [entry for entry in entries if entry not in dead]
+
+    def take(self, count=None, stack=None):
+        """
+            the oldest data, left in the outbox until ack() : another
+            process will not get them before outbox_claim_after seconds
+            :param count: number of data to take, all of them by default
+            :param stack: cache stack to put at the end of the outbox
+                          first, eg the data put aside then recycled
+            :return: the data and their id, the ones that failed first
+            :rtype: list
+        """
+        if stack is not None:
+            self._drain(stack)
+        self._claim()
+        entries = self._bury(self._read('0', count))
+        if count is None or len(entries) < count:
+            entries += self._read('>', None if count is None
+                                  else count - len(entries))
+        return [(entry_id, self.cache.client.decode(data))
+                for entry_id, data in entries]
+
+    def ack(self, entry_ids):
+        """
+            drop the data published
+            :param entry_ids: the id given by take()
+        """
+        if entry_ids:
+            pipe = self.redis.pipeline()
+            pipe.xack(self.key, self.group, *entry_ids)
+            pipe.xdel(self.key, *entry_ids)
+            pipe.execute()
+
+    def peek(self, count=None):
+        """
+            the oldest data, left in the outbox
+        """
+        return [self.cache.client.decode(fields[b'data'])
+                for _, fields in self.redis.xrange(self.key, count=count)]
+
+    def dead(self, count=None):
+        """
+            the data moved to the dead letters, the oldest first
+        """
+        return [self.cache.client.decode(fields[b'data'])
+                for _, fields in self.redis.xrange(self.dead_key,
+                                                   count=count)]
+
+    def clear(self):
+        self.redis.delete(self.key, self.dead_key)
@@ -0,0 +1,147 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import queue
+import threading
+
+# django
+from django.conf import settings
+from django.db import close_old_connections
+from logging import getLogger
+
+# trigger happy
+from django_th.engines import run_async
+from django_th.publish import Pub
+from django_th.publishing_limit import PublishingLimit
+from django_th.read import Read
+from django_th.seen import SeenItems
+from django_th.stack_store import stack_store
+from django_th.stacks import bump_version
+
+logger = getLogger('django_th.trigger_happy')
+
+
+class Pipeline(object):
+    """
+        read the providers and hand their data straight to the consumers
+        through a bounded queue, without storing them : only the data that
+        do not fit in the queue, or that the consumer failed to publish,
+        are put in the outbox, published at the next runs
+    """
+
+    def __init__(self, queue_size=None, consumers=None, put_timeout=5):
+        """
+            :param queue_size: number of triggers waiting to be published
+            :param consumers: number of threads publishing the data
+            :param put_timeout: seconds a provider waits for a free slot
+                                before putting its data in the outbox
+        """
+        if queue_size is None:
+            queue_size = settings.DJANGO_TH.get('pipeline_queue_size', 100)
+        if consumers is None:
+            consumers = settings.DJANGO_TH.get('pipeline_consumers', 4)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.consumers = consumers
+        self.put_timeout = put_timeout
+        self.read = Read()
+        self.pub = Pub()
+
+    @staticmethod
+    def cache_stack(service):
+        """
+            name of the cache used by the provider of the trigger
+            :param service: service object
+            :return: th_<service>
+        """
+        return 'th_' + service.provider.name.name.split('Service')[1].lower()
+
+    def producing(self, service):
+        """
+            read the provider and queue its data
+            :param service: service object to read
+        """
+        self.read.reading(service, store=self.handing)
+
+    def handing(self, service, data, stored):
+        """
+            queue the data read from a provider
+            :param service: service object read
+            :param data: the data read, not stored
+            :param stored: to call once they are published or in the outbox
+        """
+        if not data:
+            stored()
+            return
+        try:
+            self.queue.put((service, data, stored), timeout=self.put_timeout)
+        except queue.Full:
+            # spill : published by the next runs
+            stack_store().push(service.id, data)
+            SeenItems(service.id).add(data)
+            bump_version(service.id)
+            stored()
+            logger.info("{} - queue full, {} data put in the "
+                        "outbox".format(service, len(data)))
+
+    def publishing(self, service, data, stored=None):
+        """
+            publish the data of one trigger : the ones left in its outbox
+            by the previous runs first, then the ones just read
+            :param service: service object where we will publish
+            :param data: the data read from the provider, not stored
+            :param stored: to call once they are published or in the outbox
+        """
+        first_run = service.date_triggered is None
+        stack = self.cache_stack(service)
+        entries = PublishingLimit.get_data(stack, service.id)
+        limit = PublishingLimit.get_limit(stack)
+        read = data
+        if limit:
+            count = max(limit - len(entries), 0)
+            if data[count:]:
+                stack_store().push(service.id, data[count:])
+                bump_version(service.id)
+            data = data[:count]
+        # not in the outbox : put in it when they are not published
+        entries += [(None, d) for d in data]
+        self.pub.delivering(service, entries, first_run, first_run)
+        # published or in the outbox : not read again by the next runs
+        SeenItems(service.id).add(read)
+        if stored is not None:
+            stored()
+
+    def consuming(self):
+        """
+            publish what the providers queued until a None is received
+        """
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                try:
+                    self.publishing(*item)
+                except Exception as e:
+                    logger.error("{} - {}".format(item[0], e))
+        finally:
+            close_old_connections()
+
+    def run(self, triggers, concurrency=None):
+        """
+            stream the data of all the triggers from their provider
+            to their consumer
+            :param triggers: iterable of TriggerService
+            :param concurrency: number of providers read at the same time
+        """
+        threads = [threading.Thread(target=self.consuming)
+                   for _ in range(self.consumers)]
+        for thread in threads:
+            thread.start()
+        try:
+            run_async(self.producing, triggers, concurrency)
+        finally:
+            for _ in threads:
+                self.queue.put(None)
+            for thread in threads:
+                thread.join()
@@ -9,8 +9,11 @@ from django.conf import settings
 from logging import getLogger
 
 # trigger happy
+from django_th.blobs import BlobNotFound, resolve
 from django_th.services import default_provider
 from django_th.models import TriggerService, update_result
+from django_th.stack_store import stack_store
+from django_th.stacks import bump_version
 
 
 logger = getLogger('django_th.trigger_happy')
@@ -34,6 +37,7 @@ class Pub(object):
                                                             consumer_failed=0,
                                                             provider_failed=0,
                                                             )
+        bump_version(service.id)
 
     def log_update(self, service, to_update, status, count):
         """
@@ -61,9 +65,9 @@ class Pub(object):
 
     def provider(self, service):
         """
-            get the data from (the cache of) the service provider
+            get the data from (the outbox of) the service provider
             :param service:
-            :return: data
+            :return: the data and their id, (id, data)
         """
         service_provider = default_provider.get_service(
             str(service.provider.name.name))
@@ -76,34 +80,62 @@ class Pub(object):
 
     def consumer(self, service, data, to_update, status):
         """
-            call the consumer and handle the data
+            call the consumer and handle the data : each data published
+            is dropped from the outbox, the others are published again
+            next time
             :param service:
-            :param data:
+            :param data: the data and their id in the outbox, (id, data),
+                         None for the data not stored yet : the ones not
+                         published are put in the outbox
             :param to_update:
             :param status:
-            :return: status
+            :return: status, False when one of the data failed
         """
         # consumer - the service which uses the data
         service_consumer = default_provider.get_service(
             str(service.consumer.name.name))
         kwargs = {'user': service.user}
-        getattr(service_consumer, '__init__')(service.consumer.token,
-                                              **kwargs)
+        # a fresh instance per call : the async engine runs several
+        # triggers of the same service at the same time
+        service_consumer = type(service_consumer)(service.consumer.token,
+                                                  **kwargs)
         instance = getattr(service_consumer, 'save_data')
 
         # 2) for each one
-        for d in data:
-            d['userservice_id'] = service.consumer.id
-            # the consumer will save the data and return if success or not
-            status = instance(service.id, **d)
-
-            to_update = True
-
-        return to_update, status
+        published = set()
+        failed = 0
+        try:
+            for i, (entry_id, d) in enumerate(data):
+                d['userservice_id'] = service.consumer.id
+                # the consumer will save the data and return if success
+                # or not
+                if instance(service.id, **d):
+                    published.add(i)
+                else:
+                    failed += 1
+
+                to_update = True
+        finally:
+            # even when a consumer raises, what is published is not sent
+            # again, and what is not is kept
+            stack_store().ack(service.id, [
+                entry_id for i, (entry_id, _) in enumerate(data)
+                if i in published and entry_id is not None])
+            kept = [d for i, (entry_id, d) in enumerate(data)
+                    if i not in published and entry_id is None]
+            if kept:
+                stack_store().push(service.id, kept)
+            if published or kept:
+                bump_version(service.id)
+        if failed:
+            logger.warning("{} - {} data failed, published again next "
+                           "time".format(service, failed))
+
+        return to_update, failed == 0
 
     def publishing(self, service):
         """
-            the purpose of this tasks is to get the data from the cache
+            the purpose of this tasks is to get the data from the outbox
             then publish them
             :param service: service object where we will publish
             :type service: object
@@ -119,11 +151,45 @@ class Pub(object):
             logger.debug("first run {}".format(service))
             to_update = True
             status = True
+        # keep the data in the outbox until the budget of the API is back
+        service_consumer = default_provider.get_service(
+            str(service.consumer.name.name))
+        limiter = service_consumer.rate_limiter(service.consumer.token)
+        if limiter is not None and not limiter.available():
+            logger.info("{} - rate limit reached, nothing published".format(
+                service))
+            return
         # run run run
         data = self.provider(service)
+        self.delivering(service, data, to_update, status)
+
+    def delivering(self, service, data, to_update=False, status=False):
+        """
+            give the data to the consumer then log and update the trigger
+            :param service: service object where we will publish
+            :param data: the data coming from the outbox of the trigger,
+                         and their id, (id, data)
+            :param to_update: boolean to check if we have to update
+            :param status: is everything worked fine so far ?
+            :type service: object
+            :type data: list
+            :type to_update: boolean
+            :type status: boolean
+        """
         count_new_data = len(data) if data else 0
         if count_new_data > 0:
-            to_update, status = self.consumer(service, data, to_update, status)
+            # the long texts stored outside of the outbox are read only now ;
+            # the data whose text is lost stay in the outbox, failed
+            resolved = []
+            for entry_id, d in data:
+                try:
+                    resolved.append((entry_id, resolve(d)))
+                except BlobNotFound as e:
+                    logger.error("{} - text {} of the data {} lost".format(
+                        service, e, entry_id))
+            to_update, status = self.consumer(service, resolved, to_update,
+                                              status)
+            status = status and len(resolved) == count_new_data
             # let's log
         self.log_update(service, to_update, status, count_new_data)
         # let's update
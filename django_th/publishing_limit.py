@@ -1,7 +1,7 @@
 # coding: utf-8
 from django.conf import settings
-from django.core.cache import caches
 from django_th.my_services import MyService
+from django_th.stack_store import stack_store
 
 
 class PublishingLimit(object):
@@ -12,41 +12,37 @@ class PublishingLimit(object):
         if the limit does not exist, it returns everything
     """
     @staticmethod
-    def get_data(service, cache_data, trigger_id):
+    def get_limit(service):
         """
-            get the data from the cache
+            number of data published at each run
             :param service: the service name
-            :param cache_data: the data from the cache
-            :type trigger_id: integer
-            :return: Return the data from the cache
-            :rtype: object
+            :return: the limit, 0 for everything
+            :rtype: integer
         """
-
+        limit = 0
         # rebuild the string
         # th_<service>.my_<service>.Service<Service>
         if service.startswith('th_'):
             service_long = MyService.full_name(service)
             # ... and check it
             if service_long in settings.TH_SERVICES:
-
-                cache = caches['django_th']
-
                 limit = settings.DJANGO_TH.get('publishing_limit', 0)
+        return limit
 
-                # publishing of all the data
-                if limit == 0:
-                    return cache_data
-                # or just a set of them
-                if cache_data is not None and len(cache_data) > limit:
-                    for data in cache_data[limit:]:
-                        service_str = ''.join((service, '_',
-                                               str(trigger_id)))
-                        # put that data in a version 2 of the cache
-                        cache.set(service_str, data, version=2)
-                        # delete data from cache version=1
-                        # https://niwinz.github.io/django-redis/latest/#_scan_delete_keys_in_bulk
-                        cache.delete_pattern(service_str)
-                    # put in cache unpublished data
-                    cache_data = cache_data[:limit]
+    @staticmethod
+    def get_data(service, trigger_id):
+        """
+            get the data from the outbox of the trigger
+            :param service: the service name
+            :type trigger_id: integer
+            :return: the oldest data of the outbox and their id, (id, data),
+                     left in it until they are published
+            :rtype: list
+        """
+        limit = PublishingLimit.get_limit(service)
 
-        return cache_data
+        # what is still in the cache stack, eg the data recycled, goes to
+        # the end of the outbox ; then all the data, or just a set of them,
+        # the oldest ones first
+        stack = ''.join((service, '_', str(trigger_id)))
+        return stack_store().take(trigger_id, limit or None, stack)
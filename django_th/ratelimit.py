@@ -0,0 +1,204 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import hashlib
+import time
+
+import arrow
+
+# django
+from django.conf import settings
+from django.core.cache import caches
+from django_redis import get_redis_connection
+from logging import getLogger
+
+logger = getLogger('django_th.trigger_happy')
+
+# headers sent by the APIs, lowercased
+REMAINING_HEADERS = ('x-ratelimit-remaining', 'x-rate-limit-remaining')
+RESET_HEADERS = ('x-ratelimit-reset', 'x-rate-limit-reset')
+
+# refill the bucket until ARGV[1], at ARGV[2] tokens per second up to
+# ARGV[3], then take ARGV[4] tokens when there are enough
+TAKE = """
+local now = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local wanted = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'stamp', 'reset')
+local tokens = tonumber(state[1])
+local reset = tonumber(state[3]) or 0
+if tokens == nil then
+    tokens = capacity
+elseif reset > 0 then
+    -- the API told us to wait until reset
+    if now >= reset then
+        tokens = capacity
+        reset = 0
+    end
+else
+    tokens = math.min(capacity, tokens + (now - tonumber(state[2])) * rate)
+end
+local taken = 0
+if wanted > 0 and tokens >= wanted then
+    tokens = tokens - wanted
+    taken = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'stamp', ARGV[1],
+           'reset', tostring(reset))
+-- keep the bucket as long as it is useful
+redis.call('EXPIRE', KEYS[1],
+           math.ceil(math.max(capacity / rate, reset - now, 60)))
+return {taken, tostring(tokens), tostring(reset)}
+"""
+
+
+def _to_timestamp(value, now):
+    """
+        the reset header is either a timestamp, a number of seconds
+        or a date, depending on the API
+        :param value: value of the header
+        :param now: current timestamp
+        :return: timestamp
+    """
+    if value is None:
+        # no hint from the API, wait a minute
+        return now + 60
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        try:
+            return arrow.get(value).timestamp
+        except (TypeError, ValueError, arrow.parser.ParserError):
+            return now
+    # less than a year : this is a number of seconds to wait
+    return value if value > 31536000 else now + value
+
+
+class RateLimiter(object):
+    """
+        token bucket, one per API host and token, shared by all the
+        processes through the redis of the django_th cache : the bucket
+        is refilled and spent by one script, so that two processes never
+        spend the same tokens
+
+        the bucket refills at `rate` requests per second up to `capacity`
+        and learns the real budget from the headers of the responses
+        settings.DJANGO_TH['rate_limits'] can set them per host, eg
+        {'api.github.com': {'rate': 1.4, 'capacity': 5000}}
+    """
+
+    def __init__(self, host, token='', rate=None, capacity=None):
+        conf = settings.DJANGO_TH.get('rate_limits', {}).get(host, {})
+        self.host = host
+        self.rate = rate or conf.get('rate', 1.0)
+        self.capacity = capacity or conf.get('capacity', 60)
+        self.key = 'django_th_bucket_' + hashlib.sha1(
+            '{}_{}'.format(host, token or '').encode('utf-8')).hexdigest()
+        self.cache = caches['django_th']
+        self.connection = None
+        self._take = None
+        # set when the API stopped a request of this limiter
+        self.blocked_until = None
+
+    @property
+    def redis(self):
+        if self.connection is None:
+            self.connection = get_redis_connection('django_th')
+        return self.connection
+
+    def _state(self, now, tokens=0):
+        """
+            refill the bucket until now, then take some tokens from it
+            :param now: current timestamp
+            :param tokens: number of tokens to take, when there are enough
+            :return: dict with taken, tokens and reset
+        """
+        if self._take is None:
+            self._take = self.redis.register_script(TAKE)
+        taken, left, reset = self._take(
+            keys=[self.cache.make_key(self.key)],
+            args=[repr(now), self.rate, self.capacity, tokens])
+        return {'taken': bool(taken), 'tokens': float(left),
+                'reset': float(reset)}
+
+    def _save(self, now, tokens, reset):
+        """
+            set the budget given by the API
+        """
+        key = self.cache.make_key(self.key)
+        pipe = self.redis.pipeline()
+        pipe.hset(key, mapping={'tokens': repr(float(tokens)),
+                                'stamp': repr(now),
+                                'reset': repr(float(reset))})
+        # keep the bucket as long as it is useful
+        pipe.expire(key, int(max(self.capacity / self.rate, reset - now,
+                                 60)) + 1)
+        pipe.execute()
+
+    def acquire(self, tokens=1):
+        """
+            take some tokens from the bucket
+            :param tokens: number of requests about to be done
+            :return: False when the budget is exhausted
+            :rtype: boolean
+        """
+        return self._state(time.time(), tokens)['taken']
+
+    def available(self):
+        """
+            check that one request can be done, without taking the token
+            :rtype: boolean
+        """
+        return self._state(time.time())['tokens'] >= 1
+
+    def retry_at(self):
+        """
+            when one request will be allowed again
+            :return: timestamp
+        """
+        now = time.time()
+        state = self._state(now)
+        if state['tokens'] >= 1:
+            return now
+        if state['reset']:
+            return state['reset']
+        return now + (1 - state['tokens']) / self.rate
+
+    def block(self, reset):
+        """
+            no more requests until reset
+            :param reset: timestamp, seconds or date given by the API
+        """
+        now = time.time()
+        self.blocked_until = _to_timestamp(reset, now)
+        self._save(now, 0, self.blocked_until)
+        logger.warning("rate limit of {} reached".format(self.host))
+
+    def learn(self, headers):
+        """
+            set the budget from the headers of a response
+            :param headers: headers of the response
+            :type headers: dict
+        """
+        headers = {k.lower(): v for k, v in headers.items()}
+        remaining = next((headers[h] for h in REMAINING_HEADERS
+                          if h in headers), None)
+        reset = next((headers[h] for h in RESET_HEADERS if h in headers),
+                     None)
+        if remaining is None:
+            if 'retry-after' in headers:
+                self.block(headers['retry-after'])
+            return
+        now = time.time()
+        tokens = min(self.capacity, float(remaining))
+        self._save(now, tokens, _to_timestamp(reset, now)
+                   if tokens < 1 and reset is not None else 0)
+
+    def learn_response(self, response, *args, **kwargs):
+        """
+            'response' hook of a requests.Session
+        """
+        self.learn(response.headers)
+        return response
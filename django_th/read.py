@@ -3,14 +3,21 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 import arrow
+import datetime
+import functools
 # django
 from logging import getLogger
 from django.conf import settings
-from django.utils.timezone import now
+from django.utils.timezone import now, utc
 
 # trigger happy
 from django_th.services import default_provider
 from django_th.models import TriggerService
+from django_th.rules import compile_rules
+from django_th.scheduler import backoff, schedule_at, schedule_next
+from django_th.seen import SeenItems
+from django_th.stack_store import stack_store
+from django_th.stacks import bump_version
 from django_th.tools import warn_user_and_admin
 
 logger = getLogger('django_th.trigger_happy')
@@ -27,7 +34,6 @@ class Read(object):
             :param kwargs:
             :return:
         """
-        getattr(service_provider, '__init__')(kwargs.get('token'))
         return getattr(service_provider, 'read_data')(**kwargs)
 
     def is_ceil_reached(self, service):
@@ -41,23 +47,86 @@ class Read(object):
             TriggerService.objects.filter(id=service.id).\
                 update(date_result=now(), status=False)
         else:
+            # wait longer after each failure before trying again
             TriggerService.objects.filter(id=service.id).\
-                update(date_result=now(), provider_failed=failed)
+                update(date_result=now(), provider_failed=failed,
+                       next_run_at=backoff(failed))
 
         warn_user_and_admin('provider', service)
 
-    def reading(self, service):
+    def filtering(self, service, data):
         """
-           get the data from the service and put theme in cache
+            apply the match and does_not_match rules of the trigger
+            :param service: service object read
+            :param data: the data read from the provider
+            :return: the data to publish
+        """
+        rules = compile_rules(service.match, service.does_not_match)
+        if not rules or not data:
+            return data
+        kept = rules.filter(data)
+        if len(kept) < len(data):
+            logger.debug("{} - {} data filtered out".format(
+                service, len(data) - len(kept)))
+        return kept
+
+    def queuing(self, service, data):
+        """
+            put the data in the outbox of the trigger, where they wait until
+            they are published : the providers store nothing, the data
+            filtered out by the rules are never stored
+            :param service: service object read
+            :param data: the data to publish
+        """
+        module_name = 'th_' + \
+            service.provider.name.name.split('Service')[1].lower()
+        # the cache stack of the trigger only holds the data recycled, they
+        # go first ; without new data, "publish" will move them
+        if data and module_name not in settings.DJANGO_TH.get(
+                'services_wo_cache', []):
+            stack_store().push(service.id, data,
+                               '{}_{}'.format(module_name, service.id))
+            # not read again by the next runs, until they are published
+            SeenItems(service.id).add(data)
+            # the feed of the trigger changed
+            bump_version(service.id)
+
+    @staticmethod
+    def deferring(service, limiter):
+        """
+            do not read the trigger again before the budget of the API is
+            back
+            :param service: service object to read
+            :param limiter: RateLimiter of the provider
+            :return: no data
+        """
+        retry_at = datetime.datetime.fromtimestamp(limiter.retry_at(),
+                                                   tz=utc)
+        logger.info("{} - rate limit reached, deferred to {}".format(
+            service, retry_at))
+        schedule_at(service, retry_at)
+        return []
+
+    def reading(self, service, store=True):
+        """
+           get the data from the service and put them in the outbox
            :param service: service object to read
+           :param store: a function to hand the data straight to the
+                         caller instead, eg the pipeline, which puts them in
+                         the outbox only when it can not publish them ; it
+                         gets the service, the data, and a function to call
+                         once they are published or stored
            :type service: object
+           :return: the data read from the provider
         """
         now = arrow.utcnow().to(settings.TIME_ZONE).format(
             'YYYY-MM-DD HH:mm:ssZZ')
         # counting the new data to store to display them in the log
         # provider - the service that offer data
         provider_token = service.provider.token
-        default_provider.load_services()
+        # load the services once per process
+        if not default_provider:
+            default_provider.load_services()
         service_provider = default_provider.get_service(
             str(service.provider.name.name))
         # check if the service has already been triggered
@@ -65,6 +134,13 @@ class Read(object):
         # so it will be set to "now"
         date_triggered = service.date_triggered if service.date_triggered \
             else now
+        # a fresh instance per call : the async engine runs several
+        # triggers of the same service at the same time
+        service_provider = type(service_provider)(provider_token)
+        # do not waste a try when the budget of the API is exhausted
+        limiter = service_provider.rate_limiter(provider_token)
+        if limiter is not None and not limiter.acquire():
+            return self.deferring(service, limiter)
         # 1) get the data from the provider service
         # get a timestamp of the last triggered of the service
         kwargs = {'token': provider_token,
@@ -72,8 +148,26 @@ class Read(object):
                   'date_triggered': date_triggered}
         data = self.provider(service_provider, **kwargs)
 
-        if len(data) > 0:
-            logger.info("{} - {} new data".format(service, len(data)))
-        elif data is False:
+        if data is False:
             # if data is False, something went wrong
             self.is_ceil_reached(service)
+            return data
+        # the API stopped the read on the way : nothing was saved, the
+        # same data are read again once it allows it
+        if limiter is not None and limiter.blocked_until:
+            return self.deferring(service, limiter)
+        # 2) drop the data filtered out by the rules of the trigger
+        data = self.filtering(service, data)
+        # 3) they can not expire any more ; what tells the next read where
+        # to start is saved only then
+        stored = functools.partial(service_provider.data_stored, service.id)
+        if store is True:
+            self.queuing(service, data)
+            stored()
+        else:
+            store(service, data, stored)
+        # 4) do not read it again before its poll_interval
+        schedule_next(service)
+        if len(data) > 0:
+            logger.info("{} - {} new data".format(service, len(data)))
+        return data
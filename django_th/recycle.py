@@ -4,35 +4,25 @@ from __future__ import absolute_import
 
 # django
 from django.conf import settings
-from django.core.cache import caches
 from logging import getLogger
 
 # trigger happy
-from django_th.my_services import MyService
+from django_th.stack_store import BATCH_SIZE, stack_store
 
 logger = getLogger('django_th.trigger_happy')
 
 
-def recycle():
+def recycle(batch_size=BATCH_SIZE):
     """
         the purpose of this tasks is to recycle the data from the cache
         with version=2 in the main cache
+        the keyspace is scanned once, and the stacks are moved by batches
+        :param batch_size: number of keys moved with one round trip
+        :return: number of keys and of bytes moved
     """
-    logger = getLogger('django_th.trigger_happy')
-    all_packages = MyService.all_packages()
-    for package in all_packages:
-        if package in settings.DJANGO_TH.get('services_wo_cache'):
-            continue
-        cache = caches['django_th']
-        # http://niwinz.github.io/django-redis/latest/#_scan_delete_keys_in_bulk
-        for service in cache.iter_keys('th_*'):
-            try:
-                # get the value from the cache version=2
-                service_value = cache.get(service, version=2)
-                # put it in the version=1
-                cache.set(service, service_value)
-                # remote version=2
-                cache.delete_pattern(service, version=2)
-            except ValueError:
-                pass
-    logger.info('recycle of cache done!')
+    skipped = tuple(package + '_' for package in
+                    settings.DJANGO_TH.get('services_wo_cache', []))
+    moved, size = stack_store().recycle(skipped, batch_size)
+    logger.info('recycle of cache done! {} keys, {} bytes moved'.format(
+        moved, size))
+    return moved, size
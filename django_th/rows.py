@@ -0,0 +1,173 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import collections
+import copy
+import os
+import threading
+import time
+
+# django
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django_redis import get_redis_connection
+from logging import getLogger
+from redis.exceptions import RedisError
+
+logger = getLogger('django_th.trigger_happy')
+
+# the processes tell each other the models that changed on this channel
+CHANNEL = 'django_th_rows'
+
+
+class RowCache(object):
+    """
+        the configuration rows of the triggers (TriggerService,
+        UserService, the models of the services, ...) read by each
+        published data, kept in the memory of the process
+
+        least recently used rows dropped after `maxsize`, each row kept
+        `ttl` seconds at most ; all the rows of a model are dropped as
+        soon as one of them is saved or deleted, by any process
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.rows = collections.OrderedDict()
+        self.pid = None
+        self.pubsub = None
+
+    def _listen(self):
+        """
+            one thread per process listening for the models that changed
+        """
+        if self.pid == os.getpid():
+            return
+        # the rows and the thread of the parent are not the ones of a fork
+        self.rows.clear()
+        self.pid = os.getpid()
+        try:
+            pubsub = get_redis_connection('django_th').pubsub(
+                ignore_subscribe_messages=True)
+            pubsub.subscribe(**{CHANNEL: self._message})
+            self.pubsub = pubsub.run_in_thread(sleep_time=1, daemon=True)
+        except RedisError as e:
+            # the rows are still dropped after their ttl
+            logger.warning("rows of the other processes not followed "
+                           "- {}".format(e))
+
+    def _message(self, message):
+        self.invalidate(message['data'].decode('utf-8'))
+
+    def get(self, model, select_related=(), **lookup):
+        """
+            the same as model.objects.get(**lookup), read once per ttl
+            :param model: the model of the row
+            :param select_related: relations read with the row
+            :raise model.DoesNotExist: the missing rows are not cached
+        """
+        if not self.ttl:
+            return model.objects.select_related(*select_related).get(
+                **lookup)
+        labels = frozenset([model._meta.label] + [
+            _related(model, path)._meta.label for path in select_related])
+        key = (model._meta.label, tuple(select_related),
+               tuple(sorted(lookup.items())))
+        now = time.time()
+        with self.lock:
+            self._listen()
+            found = self.rows.get(key)
+            if found is not None and found[0] > now:
+                self.rows.move_to_end(key)
+                return copy.copy(found[2])
+        row = model.objects.select_related(*select_related).get(**lookup)
+        with self.lock:
+            self.rows[key] = (now + self.ttl, labels, row)
+            self.rows.move_to_end(key)
+            while len(self.rows) > self.maxsize:
+                self.rows.popitem(last=False)
+        return copy.copy(row)
+
+    def invalidate(self, label):
+        """
+            drop the rows of a model, and the ones read with them
+            :param label: label of the model, eg django_th.TriggerService
+        """
+        with self.lock:
+            for key in [key for key, (_, labels, _) in self.rows.items()
+                        if label in labels]:
+                del self.rows[key]
+
+    def clear(self):
+        with self.lock:
+            self.rows.clear()
+
+
+def _related(model, path):
+    """
+        the model at the end of a select_related path, eg provider__name
+    """
+    for name in path.split('__'):
+        model = model._meta.get_field(name).related_model
+    return model
+
+
+_rows = None
+
+
+def rows():
+    """
+        the cache of the process, sized by
+        settings.DJANGO_TH['row_cache_size'] and
+        settings.DJANGO_TH['row_cache_ttl'] (0 to read the database each
+        time)
+        :rtype: RowCache
+    """
+    global _rows
+    if _rows is None:
+        _rows = RowCache(settings.DJANGO_TH.get('row_cache_size', 1024),
+                         settings.DJANGO_TH.get('row_cache_ttl', 300))
+    return _rows
+
+
+def get_row(model, select_related=(), **lookup):
+    """
+        read a configuration row through the cache of the process
+    """
+    return rows().get(model, select_related, **lookup)
+
+
+def _cached(model):
+    from django_th.models import ServicesActivated, TriggerService, \
+        UserService
+    from django_th.models.services import Services
+    return issubclass(model, (Services, TriggerService, UserService,
+                              ServicesActivated))
+
+
+def invalidate(model):
+    """
+        drop the rows of the model in this process, then in the others ;
+        to call after a queryset update(), which sends no signal
+        :param model: the model of the rows changed
+    """
+    rows().invalidate(model._meta.label)
+    try:
+        get_redis_connection('django_th').publish(CHANNEL,
+                                                  model._meta.label)
+    except RedisError as e:
+        logger.warning("{} changed, not told to the other processes "
+                       "- {}".format(model._meta.label, e))
+
+
+@receiver([post_save, post_delete], dispatch_uid='django_th_row_changed')
+def row_changed(sender, **kwargs):
+    """
+        drop the rows of the model in this process, then in the others
+    """
+    if _cached(sender):
+        invalidate(sender)
@@ -0,0 +1,98 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import re
+from functools import lru_cache
+
+from logging import getLogger
+
+logger = getLogger('django_th.trigger_happy')
+
+# properties of the data the rules are applied to
+FIELDS = ('title', 'link', 'summary', 'description', 'content')
+
+
+def _combine(rules):
+    """
+        one regular expression for all the rules of a trigger,
+        one rule per line
+        :param rules: the rules as set in the trigger
+        :return: compiled pattern or None when there is no rule
+    """
+    rules = [rule.strip() for rule in (rules or '').splitlines()
+             if rule.strip()]
+    if not rules:
+        return None
+    return re.compile('|'.join('(?:{})'.format(rule) for rule in rules),
+                      re.IGNORECASE)
+
+
+def _text(value):
+    """
+        the text of a property, which can be the list of dict
+        of the 'content' of a feed
+    """
+    if isinstance(value, (list, tuple)):
+        return '\n'.join(_text(v) for v in value)
+    if isinstance(value, dict):
+        return _text(value.get('value', ''))
+    return '' if value is None else str(value)
+
+
+class Rules(object):
+    """
+        the match and does_not_match rules of a trigger, compiled once
+        an item is kept when one of its properties matches `match`
+        and none matches `does_not_match`
+    """
+
+    def __init__(self, match='', does_not_match='', fields=FIELDS):
+        self.match = _combine(match)
+        self.does_not_match = _combine(does_not_match)
+        self.fields = fields
+
+    def __bool__(self):
+        return self.match is not None or self.does_not_match is not None
+
+    def accept(self, item):
+        """
+            :param item: one item read from a provider
+            :rtype: boolean
+        """
+        if not hasattr(item, 'get'):
+            return True
+        text = '\n'.join(_text(item.get(field)) for field in self.fields
+                         if item.get(field))
+        if self.match is not None and not self.match.search(text):
+            return False
+        if self.does_not_match is not None and \
+                self.does_not_match.search(text):
+            return False
+        return True
+
+    def filter(self, items):
+        """
+            :param items: the data read from a provider
+            :return: the items to keep
+            :rtype: list
+        """
+        return [item for item in items if self.accept(item)]
+
+
+@lru_cache(maxsize=1024)
+def compile_rules(match='', does_not_match='', fields=FIELDS):
+    """
+        the same rules are compiled once per process
+        :param match: rules an item has to match, one per line
+        :param does_not_match: rules an item must not match, one per line
+        :param fields: properties of the items to check
+        :rtype: Rules
+    """
+    try:
+        return Rules(match, does_not_match, fields)
+    except re.error as e:
+        # an invalid rule filters nothing rather than stopping the trigger
+        logger.warning("invalid rule {!r} {!r} - {}".format(
+            match, does_not_match, e))
+        return Rules(fields=fields)
@@ -1,5 +1,19 @@
 from django.conf import settings
 from django.test.runner import DiscoverRunner
+from unittest import TextTestResult
+
+from django_th.rows import rows
+
+
+class TextTestResultTriggerHappy(TextTestResult):
+    """
+    Forget the rows cached by the previous test : the rollback of its
+    transaction does not send post_delete
+    """
+
+    def startTest(self, test):
+        rows().clear()
+        super(TextTestResultTriggerHappy, self).startTest(test)
 
 
 class DiscoverRunnerTriggerHappy(DiscoverRunner):
@@ -7,6 +21,10 @@ class DiscoverRunnerTriggerHappy(DiscoverRunner):
     A Django test runner that uses unittest2 test discovery.
     """
 
+    def get_resultclass(self):
+        return super(DiscoverRunnerTriggerHappy, self).get_resultclass() \
+            or TextTestResultTriggerHappy
+
     def run_tests(self, test_labels, extra_tests=None, **kwargs):
         """
         Run the unit tests for all the test labels in the provided list.
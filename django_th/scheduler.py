@@ -0,0 +1,119 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import datetime
+import random
+
+# django
+from django.conf import settings
+from django.db.models import F, Min, Q
+from django.utils.timezone import now as tz_now
+
+# trigger happy
+from django_th.models import TriggerService
+
+
+def active_triggers():
+    """
+        get all the triggers that can be handled
+        :return: queryset of TriggerService
+    """
+    failed_tries = settings.DJANGO_TH.get('failed_tries', 10)
+    return TriggerService.objects.filter(
+        Q(provider_failed__lte=failed_tries) |
+        Q(consumer_failed__lte=failed_tries),
+        status=True,
+        user__is_active=True,
+        provider__name__status=True,
+        consumer__name__status=True,
+    ).select_related('consumer__name', 'provider__name', 'user')
+
+
+def due_triggers(now=None):
+    """
+        get the triggers whose provider has to be read, the most late first
+        the index on next_run_at keeps this query proportional to the
+        number of due triggers
+        :param now: the current date
+        :return: queryset of TriggerService
+    """
+    now = now or tz_now()
+    return active_triggers().filter(
+        Q(next_run_at__isnull=True) | Q(next_run_at__lte=now)
+    ).order_by(F('next_run_at').asc(nulls_first=True), 'id')
+
+
+def claim_due_triggers(now=None):
+    """
+        take the due triggers for this run : their next run is moved
+        settings.DJANGO_TH['lease'] seconds later, only if it did not
+        change since they were read, so that the runs that overlap do not
+        read the same triggers ; reading them sets their next run
+        :param now: the current date
+        :return: list of TriggerService
+    """
+    now = now or tz_now()
+    lease = now + datetime.timedelta(
+        seconds=settings.DJANGO_TH.get('lease', 300))
+    claimed = []
+    for trigger in due_triggers(now).iterator():
+        if TriggerService.objects.filter(
+                id=trigger.id, next_run_at=trigger.next_run_at).update(
+                next_run_at=lease):
+            claimed.append(trigger)
+    return claimed
+
+
+def next_due(now=None):
+    """
+        get the date when the next trigger will be due
+        :param now: the current date
+        :return: datetime or None when no trigger is waiting
+    """
+    now = now or tz_now()
+    return active_triggers().filter(next_run_at__gt=now).aggregate(
+        next_run_at=Min('next_run_at'))['next_run_at']
+
+
+def schedule_next(service, now=None):
+    """
+        set the next run of the trigger according to its poll_interval
+        after a successful read, that also resets its failures
+        :param service: service object just read
+        :param now: the current date
+        :return: the date of the next run
+    """
+    now = now or tz_now()
+    next_run_at = now + datetime.timedelta(minutes=service.poll_interval)
+    TriggerService.objects.filter(id=service.id).update(
+        next_run_at=next_run_at, provider_failed=0)
+    return next_run_at
+
+
+def backoff(failed, now=None):
+    """
+        get the next run of a trigger that failed `failed` times in a row
+        the delay doubles at each failure, up to backoff_max seconds,
+        with a random part so that the triggers of a service that is
+        down do not all come back at the same time
+        :param failed: number of failures in a row
+        :param now: the current date
+        :return: the date of the next run
+    """
+    now = now or tz_now()
+    base = settings.DJANGO_TH.get('backoff_base', 60)
+    maximum = settings.DJANGO_TH.get('backoff_max', 86400)
+    delay = min(maximum, base * 2 ** max(0, failed - 1))
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    return now + datetime.timedelta(seconds=delay)
+
+
+def schedule_at(service, next_run_at):
+    """
+        do not read the trigger again before that date
+        :param service: service object
+        :param next_run_at: datetime
+    """
+    TriggerService.objects.filter(id=service.id).update(
+        next_run_at=next_run_at)
@@ -0,0 +1,161 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import hashlib
+import math
+
+# django
+from django.conf import settings
+from django_redis import get_redis_connection
+
+# fields identifying an item, the first one found is used
+KEY_FIELDS = ('id', 'guid', 'link', 'url')
+
+# ARGV[1] bits per item, then the bits of each item
+# return 1 for the items found in one of the filters, 0 otherwise
+CHECK = """
+local k = tonumber(ARGV[1])
+local seen = {}
+for i = 2, #ARGV, k do
+    local found = 0
+    for _, key in ipairs(KEYS) do
+        local all = 1
+        for j = i, i + k - 1 do
+            if redis.call('GETBIT', key, ARGV[j]) == 0 then
+                all = 0
+                break
+            end
+        end
+        if all == 1 then
+            found = 1
+            break
+        end
+    end
+    seen[#seen + 1] = found
+end
+return seen
+"""
+
+# ARGV[1] bits per item, ARGV[2] capacity of a filter, ARGV[3] ttl,
+# then the bits of each item ; the current filter becomes the previous
+# one when it is full, which forgets the oldest items
+ADD = """
+local k = tonumber(ARGV[1])
+local added = 0
+for i = 4, #ARGV, k do
+    local known = 1
+    for j = i, i + k - 1 do
+        if redis.call('SETBIT', KEYS[1], ARGV[j], 1) == 0 then
+            known = 0
+        end
+    end
+    added = added + 1 - known
+end
+local count = redis.call('INCRBY', KEYS[3], added)
+if count >= tonumber(ARGV[2]) and redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('RENAME', KEYS[1], KEYS[2])
+    redis.call('SET', KEYS[3], 0)
+end
+for _, key in ipairs(KEYS) do
+    redis.call('EXPIRE', key, ARGV[3])
+end
+return added
+"""
+
+
+def item_key(item):
+    """
+        what identifies an item of a provider
+        :param item: dict or feedparser entry
+        :return: the key of the item
+        :rtype: string
+    """
+    if hasattr(item, 'get'):
+        for field in KEY_FIELDS:
+            if item.get(field):
+                return '{}:{}'.format(field, item.get(field))
+        return 'content:{}:{}'.format(item.get('title'), item.get('content'))
+    return 'item:{}'.format(item)
+
+
+class SeenItems(object):
+    """
+        items already read by a trigger, remembered once they are in its
+        outbox or published
+
+        a pair of bloom filters stored in redis : the size of each one is
+        fixed by `capacity` items, and when the current one is full, it
+        replaces the previous one, so the memory stays bounded and the
+        oldest items are forgotten
+        settings.DJANGO_TH['seen_capacity'] set to 0 disables it
+    """
+
+    def __init__(self, trigger_id, capacity=None, error_rate=0.001,
+                 connection=None):
+        """
+            :param trigger_id: id of the trigger
+            :param capacity: number of items of each filter
+            :param error_rate: probability of a new item found in a filter
+            :param connection: redis connection, the one of the
+                               django_th cache by default
+        """
+        if capacity is None:
+            capacity = settings.DJANGO_TH.get('seen_capacity', 1000)
+        self.capacity = capacity
+        self.ttl = settings.DJANGO_TH.get('seen_ttl', 2592000)
+        if capacity:
+            self.bits = int(math.ceil(
+                -capacity * math.log(error_rate) / math.log(2) ** 2))
+            self.hashes = max(1, int(round(
+                self.bits / capacity * math.log(2))))
+        name = 'django_th_seen_{}'.format(trigger_id)
+        self.keys = [name + ':current', name + ':previous', name + ':count']
+        self.connection = connection
+
+    @property
+    def redis(self):
+        if self.connection is None:
+            self.connection = get_redis_connection('django_th')
+        return self.connection
+
+    def _bits(self, item):
+        """
+            offsets of the bits of an item, by double hashing
+        """
+        digest = hashlib.sha1(item_key(item).encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:16], 'big') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def _args(self, items):
+        args = [self.hashes]
+        for item in items:
+            args.extend(self._bits(item))
+        return args
+
+    def unseen(self, items):
+        """
+            drop the items already read
+            :param items: the data read from the provider
+            :return: the new items
+            :rtype: list
+        """
+        if not self.capacity or not items:
+            return items
+        script = self.redis.register_script(CHECK)
+        flags = script(keys=self.keys[:2], args=self._args(items))
+        return [item for item, seen in zip(items, flags) if not int(seen)]
+
+    def add(self, items):
+        """
+            remember the items stored in the outbox, or published
+            :param items: the data read from the provider
+            :return: number of items not known yet
+        """
+        if not self.capacity or not items:
+            return 0
+        script = self.redis.register_script(ADD)
+        args = self._args(items)
+        return script(keys=self.keys,
+                      args=args[:1] + [self.capacity, self.ttl] + args[1:])
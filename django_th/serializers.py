@@ -0,0 +1,172 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import datetime
+import pickle
+import time
+import uuid
+
+import arrow
+import msgpack
+import zstandard
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.encoding import force_bytes
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.base import BaseSerializer
+
+from django_th.blobs import Blob
+
+try:
+    from feedparser import FeedParserDict
+except ImportError:
+    FeedParserDict = None
+
+# the stacks of the providers are stored with msgpack instead of pickle,
+# a value pickle can not be replaced by is still pickled
+# MSGPACK is never the first byte of a msgpack document or of a pickle
+MSGPACK = b'\xc1'
+ZSTD = b'\x28\xb5\x2f\xfd'
+# properties of the feedparser entries duplicated in the other ones
+# and not read by the consumers
+TRIMMED = ('title_detail', 'author_detail', 'publisher_detail', 'links',
+           'guidislink')
+
+(EXT_FEEDPARSER, EXT_DATETIME, EXT_DATE, EXT_ARROW, EXT_STRUCT_TIME,
+ EXT_UUID, EXT_TUPLE, EXT_BLOB) = range(1, 9)
+
+
+def _trim(entry):
+    """
+        the properties of a feedparser entry worth storing
+    """
+    trimmed = {k: v for k, v in entry.items() if k not in TRIMMED}
+    detail = entry.get('summary_detail')
+    if isinstance(detail, dict) and \
+            detail.get('value') == entry.get('summary'):
+        # the same text : restored by _untrim
+        trimmed['summary_detail'] = {k: v for k, v in detail.items()
+                                     if k != 'value'}
+    return trimmed
+
+
+def _untrim(entry):
+    entry = FeedParserDict(entry)
+    detail = entry.get('summary_detail')
+    if detail is not None and 'value' not in detail:
+        entry['summary_detail'] = FeedParserDict(detail,
+                                                 value=entry.get('summary'))
+    return entry
+
+
+def _default(obj):
+    """
+        the types msgpack does not know
+        :raise TypeError: for the types that have to be pickled
+    """
+    if FeedParserDict is not None and isinstance(obj, FeedParserDict):
+        return msgpack.ExtType(EXT_FEEDPARSER, _pack(_trim(obj)))
+    if isinstance(obj, arrow.Arrow):
+        return msgpack.ExtType(EXT_ARROW, _pack(
+            [obj.float_timestamp, obj.utcoffset().total_seconds()]))
+    if isinstance(obj, datetime.datetime):
+        return msgpack.ExtType(EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, datetime.date):
+        return msgpack.ExtType(EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, time.struct_time):
+        return msgpack.ExtType(EXT_STRUCT_TIME, _pack(list(obj)))
+    if isinstance(obj, uuid.UUID):
+        return msgpack.ExtType(EXT_UUID, obj.bytes)
+    if isinstance(obj, tuple):
+        return msgpack.ExtType(EXT_TUPLE, _pack(list(obj)))
+    if isinstance(obj, Blob):
+        return msgpack.ExtType(EXT_BLOB, obj.digest.encode())
+    # subclasses of the builtin types, eg OrderedDict or SafeText
+    for base in (dict, list, str, bytes, bool, int, float):
+        if isinstance(obj, base):
+            return base(obj)
+    raise TypeError('unknown type {}'.format(type(obj)))
+
+
+def _ext_hook(code, data):
+    if code == EXT_FEEDPARSER:
+        return _untrim(_unpack(data))
+    if code == EXT_ARROW:
+        stamp, offset = _unpack(data)
+        return arrow.Arrow.fromdatetime(datetime.datetime.fromtimestamp(
+            stamp, datetime.timezone(datetime.timedelta(seconds=offset))))
+    if code == EXT_DATETIME:
+        return parse_datetime(data.decode())
+    if code == EXT_DATE:
+        return parse_date(data.decode())
+    if code == EXT_STRUCT_TIME:
+        return time.struct_time(_unpack(data))
+    if code == EXT_UUID:
+        return uuid.UUID(bytes=data)
+    if code == EXT_TUPLE:
+        return tuple(_unpack(data))
+    if code == EXT_BLOB:
+        return Blob(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _pack(value):
+    # strict_types gives the subclasses, eg FeedParserDict, to _default
+    return msgpack.packb(value, default=_default, use_bin_type=True,
+                         strict_types=True)
+
+
+def _unpack(data):
+    return msgpack.unpackb(data, ext_hook=_ext_hook, raw=False,
+                           strict_map_key=False)
+
+
+class StackSerializer(BaseSerializer):
+    """
+        serializer of the django_th cache, set in
+        CACHES['django_th']['OPTIONS']['SERIALIZER']
+    """
+
+    def dumps(self, value):
+        try:
+            return MSGPACK + _pack(value)
+        except (TypeError, ValueError, OverflowError):
+            return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, value):
+        value = force_bytes(value)
+        if value[:1] == MSGPACK:
+            return _unpack(value[1:])
+        # pickled before, or not supported by msgpack
+        return pickle.loads(value)
+
+
+class StackCompressor(BaseCompressor):
+    """
+        compressor of the django_th cache, set in
+        CACHES['django_th']['OPTIONS']['COMPRESSOR'] ; only the values
+        larger than OPTIONS['COMPRESS_MIN_LENGTH'] bytes are compressed
+    """
+    min_length = 1024
+    level = 3
+
+    def __init__(self, options):
+        super(StackCompressor, self).__init__(options)
+        self.min_length = int(options.get('COMPRESS_MIN_LENGTH',
+                                          self.min_length))
+        self.level = int(options.get('COMPRESS_LEVEL', self.level))
+
+    def compress(self, value):
+        if len(value) > self.min_length:
+            return zstandard.ZstdCompressor(level=self.level).compress(value)
+        return value
+
+    def decompress(self, value):
+        if value[:4] != ZSTD:
+            # small value, or stored before the compression
+            raise CompressorError('not compressed')
+        try:
+            return zstandard.ZstdDecompressor().decompress(value)
+        except zstandard.ZstdError as e:
+            raise CompressorError(e)
@@ -3,7 +3,6 @@
 from requests_oauthlib import OAuth1Session, OAuth2Session
 
 # django stuff
-from django.core.cache import caches
 from django.core.urlresolvers import reverse
 from django.conf import settings
 
@@ -16,7 +15,10 @@ except ImportError:
 # django_th stuff
 from django_th import signals
 from django_th.models import UserService, ServicesActivated, TriggerService
+from django_th.rows import get_row, invalidate
 from django_th.publishing_limit import PublishingLimit
+from django_th.ratelimit import RateLimiter
+from django_th.seen import SeenItems
 from django_th.html_entities import HtmlEntities
 
 
@@ -28,6 +30,8 @@ class ServicesMgr(object):
     title = ''
     body = ''
     data = {}
+    # host of the API, to share its rate limit between the triggers
+    rate_limit_host = ''
 
     class __ServicesMgr:  # NOQA
 
@@ -48,6 +52,7 @@ class ServicesMgr(object):
         self.token = ''
         self.service = ''
         self.scope = ''
+        self.rate_limiters = {}
         if not ServicesMgr.instance:
             ServicesMgr.instance = ServicesMgr.__ServicesMgr(arg)
         else:
@@ -113,6 +118,60 @@ class ServicesMgr(object):
 
         return content
 
+    def rate_limiter(self, token=None):
+        """
+            get the rate limiter of the API for this token
+            :param token: the token of the user
+            :type token: string
+            :return: RateLimiter or None if the service has no rate limit
+        """
+        if not self.rate_limit_host:
+            return None
+        # the same one for the life of the service object : the reader
+        # knows when the API stopped one of its requests
+        if token not in self.rate_limiters:
+            self.rate_limiters[token] = RateLimiter(self.rate_limit_host,
+                                                    token)
+        return self.rate_limiters[token]
+
+    @staticmethod
+    def request_timeout():
+        """
+            the requests to the API give up once the server is silent for
+            the deadline of the trigger
+            :return: seconds or None
+        """
+        return settings.DJANGO_TH.get('trigger_timeout', 60) or None
+
+    def timed(self, session):
+        """
+            give a timeout to the requests of the session of a SDK that
+            sets none
+            :param session: requests.Session of the SDK
+            :return: the session
+        """
+        request = session.request
+        timeout = self.request_timeout()
+
+        def timed_request(method, url, **kwargs):
+            if kwargs.get('timeout') is None:
+                kwargs['timeout'] = timeout
+            return request(method, url, **kwargs)
+        session.request = timed_request
+        return session
+
+    @staticmethod
+    def unseen(trigger_id, data):
+        """
+            drop the data already read by the trigger, eg the
+            items without a date that are read again at each run
+            :param trigger_id: trigger ID
+            :param data: the data read from the service
+            :type data: list
+            :rtype: list
+        """
+        return SeenItems(trigger_id).unseen(data)
+
     def read_data(self, **kwargs):
         """
             get the data from the service
@@ -125,17 +184,24 @@ class ServicesMgr(object):
 
         return model.objects.get(trigger_id=kwargs['trigger_id'])
 
+    def data_stored(self, trigger_id):
+        """
+            the data returned by read_data are stored in the outbox of the
+            trigger : what tells the next read where to start can be saved
+            :param trigger_id: trigger ID
+            :type trigger_id: int
+        """
+        pass
+
     def process_data(self, **kwargs):
         """
-             get the data from the cache
+             get the data from the outbox of the trigger
             :param kwargs: contain keyword args : trigger_id at least
             :type kwargs: dict
+            :return: the data and their id, (id, data)
+            :rtype: list
         """
-        cache = caches['django_th']
-        cache_data = cache.get(kwargs.get('cache_stack') + '_' +
-                               kwargs.get('trigger_id'))
         return PublishingLimit.get_data(kwargs.get('cache_stack'),
-                                        cache_data,
                                         int(kwargs.get('trigger_id')))
 
     def save_data(self, trigger_id, **data):
@@ -206,6 +272,8 @@ class ServicesMgr(object):
         UserService.objects.filter(user=request.user,
                                    name=service_name
                                    ).update(token=token)
+        # the processes reading the token read it again
+        invalidate(UserService)
         back = self.service.split('Service')[1].lower()
         back_to = '{back_to}/callback.html'.format(back_to=back)
         return back_to
@@ -322,7 +390,8 @@ class ServicesMgr(object):
         """
         if settings.DJANGO_TH.get('digest_event'):
 
-            t = TriggerService.objects.get(id=trigger_id)
+            t = get_row(TriggerService, ('provider__name', 'user'),
+                        id=trigger_id)
 
             if t.provider.duration != 'n':
 
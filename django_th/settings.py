@@ -242,6 +242,8 @@ CACHES = {
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "MAX_ENTRIES": 5000,
+            "SERIALIZER": "django_th.serializers.StackSerializer",
+            "COMPRESSOR": "django_th.serializers.StackCompressor",
         }
     },
 }
@@ -0,0 +1,444 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import collections
+import itertools
+import threading
+from functools import lru_cache
+
+# django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.encoding import smart_text
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+from logging import getLogger
+from redis.exceptions import WatchError
+
+# trigger happy
+from django_th.blobs import offload
+from django_th.outbox import Outbox
+from django_th.stacks import bump_versions
+
+logger = getLogger('django_th.trigger_happy')
+
+__all__ = ['StackStore', 'RedisStackStore', 'MemoryStackStore',
+           'shared_stack_store', 'single_process', 'stack_store']
+
+# number of keys moved with one round trip by recycle()
+BATCH_SIZE = 500
+
+# set by th_worker : the only process reading and publishing the data
+_single_process = False
+
+
+def _trigger_id(stack):
+    """
+        :param stack: name of a stack, eg th_rss_1
+        :return: the id of the trigger or None
+    """
+    trigger_id = stack.rsplit('_', 1)[-1]
+    return trigger_id if trigger_id.isdigit() else None
+
+
+def _merge(aside, current):
+    """
+        the data put aside, followed by the ones read since then
+        :param current: the data of the stack, None if it is empty
+    """
+    if isinstance(aside, list) and isinstance(current, list):
+        return aside + current
+    return aside
+
+
+class StackStore(object):
+    """
+        where the data of the triggers wait to be published :
+        - the stacks, eg th_rss_1, the data read from the provider
+        - the data put aside when the consumer failed, given back to
+          the stacks by recycle()
+        - the outbox of the triggers, the data read and not published
+          yet, each dropped once published
+    """
+    # the data are seen by all the processes
+    shared = True
+
+    def get(self, stack):
+        """
+            :param stack: name of the stack, th_<service>_<trigger id>
+            :return: the data of the stack or None
+        """
+        raise NotImplementedError
+
+    def set(self, stack, items):
+        raise NotImplementedError
+
+    def delete(self, stack):
+        raise NotImplementedError
+
+    def set_aside(self, stack, items):
+        """
+            keep the data the consumer failed to publish until recycle()
+        """
+        raise NotImplementedError
+
+    def aside(self):
+        """
+            :return: the names of the stacks put aside
+        """
+        raise NotImplementedError
+
+    def recycle(self, skipped=(), batch_size=BATCH_SIZE):
+        """
+            put back the data put aside in front of their stack
+            :param skipped: prefixes of the stacks to leave aside
+            :param batch_size: number of stacks moved at once
+            :return: number of stacks and of bytes moved
+        """
+        raise NotImplementedError
+
+    def pending(self, trigger_id):
+        """
+            :return: number of data in the outbox of the trigger
+        """
+        raise NotImplementedError
+
+    def push(self, trigger_id, items, stack=None):
+        """
+            put data at the end of the outbox of the trigger
+            :param stack: stack the data come from, dropped at the same
+                          time as they are added
+        """
+        raise NotImplementedError
+
+    def take(self, trigger_id, count=None, stack=None):
+        """
+            the oldest data of the outbox, left in it until ack() : the
+            ones that failed before come first
+            :param count: number of data to take, all of them by default
+            :param stack: stack to put at the end of the outbox first
+            :return: the data and their id, (id, data)
+            :rtype: list
+        """
+        raise NotImplementedError
+
+    def ack(self, trigger_id, entry_ids):
+        """
+            drop the data published from the outbox
+            :param entry_ids: the id given by take()
+        """
+        raise NotImplementedError
+
+    def peek(self, trigger_id, count=None):
+        """
+            the oldest data of the outbox, left in it
+            :rtype: list
+        """
+        raise NotImplementedError
+
+    def clear(self, trigger_id):
+        """
+            drop the outbox of the trigger
+        """
+        raise NotImplementedError
+
+    def stored(self):
+        """
+            everything stored : the stacks, the data put aside and the
+            data of the outboxes
+        """
+        raise NotImplementedError
+
+
+class RedisStackStore(StackStore):
+    """
+        the stacks in the django_th cache, the data put aside in its
+        version 2, and the outboxes in redis streams ; the texts longer
+        than settings.DJANGO_TH['blob_min_size'] are stored outside of
+        redis, see django_th.blobs
+    """
+
+    def __init__(self):
+        self.cache = caches['django_th']
+
+    @property
+    def redis(self):
+        return get_redis_connection('django_th')
+
+    def get(self, stack):
+        return self.cache.get(stack)
+
+    def set(self, stack, items):
+        self.cache.set(stack, offload(items))
+
+    def delete(self, stack):
+        self.cache.delete(stack)
+
+    def set_aside(self, stack, items):
+        self.cache.set(stack, offload(items), version=2)
+
+    def aside(self, batch_size=BATCH_SIZE):
+        pattern = self.cache.make_key('th_*', version=2)
+        for key in self.redis.scan_iter(match=pattern, count=batch_size):
+            yield self.cache.client.reverse_key(smart_text(key))
+
+    def _merge(self, aside, current):
+        """
+            the same as _merge, with the values as stored in redis
+        """
+        if current is None:
+            return aside
+        merged = _merge(self.cache.client.decode(aside),
+                        self.cache.client.decode(current))
+        return self.cache.client.encode(merged)
+
+    def _move(self, stacks):
+        """
+            move a batch of stacks from the version 2 to the version 1,
+            with one MGET of both versions then one MULTI ; both versions
+            are watched : the batch is read again when one of them is
+            written meanwhile, nothing written is overwritten
+            :return: number of stacks and of bytes moved
+        """
+        olds = [self.cache.make_key(stack, version=2) for stack in stacks]
+        news = [self.cache.make_key(stack) for stack in stacks]
+        with self.redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(*(olds + news))
+                    values = pipe.mget(olds)
+                    currents = pipe.mget(news)
+                    pipe.multi()
+                    moved = size = 0
+                    trigger_ids = []
+                    for stack, new, data, current in zip(stacks, news,
+                                                         values, currents):
+                        if data is None:
+                            continue
+                        pipe.set(new, self._merge(data, current),
+                                 ex=self.cache.default_timeout)
+                        moved += 1
+                        size += len(data)
+                        if _trigger_id(stack):
+                            trigger_ids.append(_trigger_id(stack))
+                    pipe.delete(*olds)
+                    pipe.execute()
+                    break
+                except WatchError:
+                    logger.debug("stacks written while recycled, read "
+                                 "again")
+        bump_versions(trigger_ids)
+        return moved, size
+
+    def recycle(self, skipped=(), batch_size=BATCH_SIZE):
+        moved = size = 0
+        stacks = []
+        for stack in self.aside(batch_size):
+            if stack.startswith(tuple(skipped)):
+                continue
+            stacks.append(stack)
+            if len(stacks) >= batch_size:
+                count, length = self._move(stacks)
+                moved, size, stacks = moved + count, size + length, []
+        if stacks:
+            count, length = self._move(stacks)
+            moved, size = moved + count, size + length
+        return moved, size
+
+    def pending(self, trigger_id):
+        return len(Outbox(trigger_id, self.redis))
+
+    def push(self, trigger_id, items, stack=None):
+        Outbox(trigger_id, self.redis).push(offload(items), stack)
+
+    def take(self, trigger_id, count=None, stack=None):
+        return Outbox(trigger_id, self.redis).take(count, stack)
+
+    def ack(self, trigger_id, entry_ids):
+        Outbox(trigger_id, self.redis).ack(entry_ids)
+
+    def peek(self, trigger_id, count=None):
+        return Outbox(trigger_id, self.redis).peek(count)
+
+    def clear(self, trigger_id):
+        Outbox(trigger_id, self.redis).clear()
+
+    def stored(self):
+        for version in (1, 2):
+            pattern = self.cache.make_key('th_*', version=version)
+            keys = list(self.redis.scan_iter(match=pattern,
+                                             count=BATCH_SIZE))
+            for start in range(0, len(keys), BATCH_SIZE):
+                for value in self.redis.mget(keys[start:start + BATCH_SIZE]):
+                    if value is not None:
+                        yield self.cache.client.decode(value)
+        # the outboxes and their dead letters
+        for key in self.redis.scan_iter(match=Outbox.pattern,
+                                        count=BATCH_SIZE):
+            yield [self.cache.client.decode(fields[b'data'])
+                   for _, fields in self.redis.xrange(key)]
+
+
+class MemoryStackStore(StackStore):
+    """
+        everything in the memory of the process, for th_worker only, and
+        for the benchmarks ; the data are lost when the process stops.
+        The seen items, the rate limits and the versions of the stacks
+        are still in the django_th cache
+    """
+    shared = False
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stacks = {}
+        self.stacks_aside = {}
+        self.outboxes = collections.defaultdict(collections.OrderedDict)
+        self.entry_ids = itertools.count(1)
+        # number of times each data has been taken
+        self.tries = collections.Counter()
+
+    def get(self, stack):
+        with self.lock:
+            return self.stacks.get(stack)
+
+    def set(self, stack, items):
+        with self.lock:
+            self.stacks[stack] = list(items) \
+                if isinstance(items, list) else items
+
+    def delete(self, stack):
+        with self.lock:
+            self.stacks.pop(stack, None)
+
+    def set_aside(self, stack, items):
+        with self.lock:
+            self.stacks_aside[stack] = items
+
+    def aside(self):
+        with self.lock:
+            return list(self.stacks_aside)
+
+    def recycle(self, skipped=(), batch_size=BATCH_SIZE):
+        moved = 0
+        trigger_ids = []
+        with self.lock:
+            for stack in list(self.stacks_aside):
+                if stack.startswith(tuple(skipped)):
+                    continue
+                self.stacks[stack] = _merge(self.stacks_aside.pop(stack),
+                                            self.stacks.get(stack))
+                moved += 1
+                if _trigger_id(stack):
+                    trigger_ids.append(_trigger_id(stack))
+        bump_versions(trigger_ids)
+        # nothing is serialized
+        return moved, 0
+
+    def pending(self, trigger_id):
+        with self.lock:
+            return len(self.outboxes.get(str(trigger_id), ()))
+
+    def _push(self, trigger_id, items, stack):
+        outbox = self.outboxes[str(trigger_id)]
+        for item in items or []:
+            outbox[next(self.entry_ids)] = item
+        if stack is not None:
+            self.stacks.pop(stack, None)
+
+    def push(self, trigger_id, items, stack=None):
+        with self.lock:
+            self._push(trigger_id, items, stack)
+
+    def take(self, trigger_id, count=None, stack=None):
+        with self.lock:
+            if stack is not None:
+                self._push(trigger_id, self.stacks.get(stack), stack)
+            outbox = self.outboxes[str(trigger_id)]
+            max_tries = settings.DJANGO_TH.get('outbox_max_tries', 5)
+            dead = [entry_id for entry_id in outbox
+                    if self.tries[entry_id] >= max_tries]
+            for entry_id in dead:
+                del outbox[entry_id], self.tries[entry_id]
+            if dead:
+                logger.error("trigger {} - {} data failed {} times, "
+                             "dropped".format(trigger_id, len(dead),
+                                              max_tries))
+            # the data given before come first, as in a redis stream
+            entries = list(itertools.islice(outbox.items(), count))
+            for entry_id, _ in entries:
+                self.tries[entry_id] += 1
+            return entries
+
+    def ack(self, trigger_id, entry_ids):
+        with self.lock:
+            outbox = self.outboxes.get(str(trigger_id), {})
+            for entry_id in entry_ids:
+                outbox.pop(entry_id, None)
+                self.tries.pop(entry_id, None)
+
+    def peek(self, trigger_id, count=None):
+        with self.lock:
+            return list(itertools.islice(
+                self.outboxes.get(str(trigger_id), {}).values(), count))
+
+    def clear(self, trigger_id):
+        with self.lock:
+            for entry_id in self.outboxes.pop(str(trigger_id), {}):
+                self.tries.pop(entry_id, None)
+
+    def stored(self):
+        with self.lock:
+            return list(itertools.chain(
+                self.stacks.values(), self.stacks_aside.values(),
+                (list(outbox.values()) for outbox in self.outboxes.values())))
+
+
+@lru_cache(maxsize=None)
+def _load(path):
+    return import_string(path)()
+
+
+def single_process():
+    """
+        this process is the only one reading and publishing the data, eg
+        th_worker : the store can keep them in its memory
+    """
+    global _single_process
+    _single_process = True
+
+
+def _path():
+    return settings.DJANGO_TH.get('stack_store',
+                                  'django_th.stack_store.RedisStackStore')
+
+
+def shared_stack_store():
+    """
+        the store set in settings.DJANGO_TH['stack_store'], when this
+        process sees the data it keeps, eg to drop the outbox of a trigger
+        deleted from the web pages
+        :return: the StackStore, None when the data are in the memory of
+                 another process, th_worker
+    """
+    store = _load(_path())
+    if not store.shared and not _single_process:
+        return None
+    return store
+
+
+def stack_store():
+    """
+        the store set in settings.DJANGO_TH['stack_store'], one per process
+        :rtype: StackStore
+        :raise ImproperlyConfigured: the store keeps the data in the memory
+                                     of the process, and other processes
+                                     read or publish them
+    """
+    store = shared_stack_store()
+    if store is None:
+        raise ImproperlyConfigured(
+            "{} keeps the data in the memory of the process : only "
+            "th_worker, without --distributed, can use it".format(_path()))
+    return store
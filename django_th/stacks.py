@@ -0,0 +1,58 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import time
+import uuid
+
+# django
+from django.core.cache import caches
+
+
+def _version_key(trigger_id):
+    return 'django_th_stack_version_{}'.format(trigger_id)
+
+
+def stack_version(trigger_id):
+    """
+        version of the data of a trigger, to know if what has been
+        built from them is still up to date
+        :param trigger_id: trigger ID
+        :return: the version or None if it has never changed
+    """
+    return caches['django_th'].get(_version_key(trigger_id))
+
+
+def _new_version():
+    """
+        a new version, starting with the time of the change
+    """
+    return '{}.{}'.format(int(time.time()), uuid.uuid4().hex)
+
+
+def version_time(version):
+    """
+        :param version: a version returned by stack_version
+        :return: timestamp of the change, None when it is unknown
+    """
+    stamp = (version or '').partition('.')[0]
+    return int(stamp) if stamp.isdigit() else None
+
+
+def bump_version(trigger_id):
+    """
+        to call each time the cache stack of a trigger changes
+        :param trigger_id: trigger ID
+    """
+    caches['django_th'].set(_version_key(trigger_id), _new_version(),
+                            timeout=None)
+
+
+def bump_versions(trigger_ids):
+    """
+        bump_version for several triggers, with one round trip
+        :param trigger_ids: trigger IDs
+    """
+    caches['django_th'].set_many({_version_key(trigger_id): _new_version()
+                                  for trigger_id in trigger_ids},
+                                 timeout=None)
@@ -0,0 +1,97 @@
+# coding: utf-8
+import os
+import shutil
+import tempfile
+import time
+
+import feedparser
+from django.conf import settings
+from django.test import TestCase
+
+from django_th.blobs import Blob, BlobNotFound, blob_storage, offload, \
+    resolve, sweep
+from django_th.serializers import StackSerializer
+from django_th.stack_store import RedisStackStore
+
+TEXT = '<p>{}</p>'.format('foo bar é ' * 100)
+
+
+class BlobsTestCase(TestCase):
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location)
+        settings_ = self.settings(DJANGO_TH=dict(
+            settings.DJANGO_TH, blob_min_size=100,
+            blob_location=self.location))
+        settings_.enable()
+        self.addCleanup(settings_.disable)
+
+    def files(self):
+        return [name for _, _, names in os.walk(self.location)
+                for name in names]
+
+    def test_offload(self):
+        data = [{'title': 'foo', 'content': TEXT},
+                {'title': 'bar', 'content': [{'value': TEXT}]}]
+        stored = offload(data)
+        self.assertEqual(stored[0]['title'], 'foo')
+        self.assertIsInstance(stored[0]['content'], Blob)
+        self.assertEqual(stored[1]['content'][0]['value'],
+                         stored[0]['content'])
+        # the same text is stored once, the data given are kept
+        self.assertEqual(len(self.files()), 1)
+        self.assertEqual(data[0]['content'], TEXT)
+        self.assertEqual(resolve(stored), data)
+        # nothing long : not copied
+        short = [{'title': 'foo', 'content': '<p>foo</p>'}]
+        self.assertIs(offload(short), short)
+        self.assertEqual(offload(data, min_size=0), data)
+
+    def test_feedparser(self):
+        entry = feedparser.FeedParserDict(
+            title='foo', summary=TEXT,
+            summary_detail={'type': 'text/html', 'value': TEXT})
+        serializer = StackSerializer({})
+        stored = serializer.loads(serializer.dumps([offload(entry)]))[0]
+        self.assertIsInstance(stored, feedparser.FeedParserDict)
+        self.assertIsInstance(stored['summary'], Blob)
+        entry = resolve(stored)
+        self.assertEqual(entry.description, TEXT)
+        self.assertEqual(entry['summary_detail']['value'], TEXT)
+
+    def test_store(self):
+        store = RedisStackStore()
+        store.clear(1)
+        self.addCleanup(store.clear, 1)
+        store.push(1, [{'title': 'foo', 'content': TEXT}])
+        # only the reference is in redis
+        self.assertIsInstance(store.peek(1)[0]['content'], Blob)
+        self.assertEqual(resolve(store.peek(1))[0]['content'], TEXT)
+
+    def test_sweep(self):
+        used, unused = offload([TEXT, TEXT + 'baz'])
+        self.assertEqual(sweep([[{'content': used}]]), 0)
+        # older than the grace period
+        old = time.time() - 7200
+        os.utime(blob_storage().path(unused.name), (old, old))
+        self.assertEqual(sweep([[{'content': used}]]), 1)
+        self.assertTrue(blob_storage().exists(used.name))
+        self.assertFalse(blob_storage().exists(unused.name))
+
+    def test_sweep_stored_again(self):
+        blob = offload(TEXT)
+        old = time.time() - 7200
+        os.utime(blob_storage().path(blob.name), (old, old))
+        # the same text stored again before its data are : kept
+        self.assertEqual(offload(TEXT), blob)
+        self.assertEqual(sweep([]), 0)
+        self.assertTrue(blob_storage().exists(blob.name))
+
+    def test_lost(self):
+        blob = offload(TEXT)
+        blob_storage().delete(blob.name)
+        with self.assertRaises(BlobNotFound):
+            resolve({'content': blob})
+        self.assertEqual(resolve({'content': blob}, strict=False),
+                         {'content': ''})
@@ -0,0 +1,119 @@
+# coding: utf-8
+import socket
+import threading
+import time
+
+from django.test import TestCase
+
+from django_th.engines import run, run_async, run_pool, _by_id, \
+    OK, ERROR, TIMEOUT
+from django_th.tests.test_main import MainTest
+
+
+class EnginesTestCase(TestCase):
+
+    def setUp(self):
+        self.handled = []
+        self.lock = threading.Lock()
+
+    def handle(self, trigger):
+        with self.lock:
+            self.handled.append(trigger)
+
+    def test_run_async(self):
+        statuses = run_async(self.handle, range(10), concurrency=3)
+        self.assertEqual(sorted(self.handled), list(range(10)))
+        self.assertEqual(statuses[OK], 10)
+
+    def test_run_async_failure(self):
+        def fail(trigger):
+            if trigger == 2:
+                raise ValueError('boom')
+            self.handle(trigger)
+        # one failing trigger does not stop the others
+        statuses = run_async(fail, range(4), concurrency=2)
+        self.assertEqual(sorted(self.handled), [0, 1, 3])
+        self.assertEqual(statuses[ERROR], 1)
+
+    def test_run_async_deadline(self):
+        def slow(trigger):
+            if trigger == 0:
+                time.sleep(0.5)
+            self.handle(trigger)
+        statuses = run_async(slow, range(3), concurrency=3, deadline=0.1)
+        self.assertEqual(statuses[TIMEOUT], 1)
+        self.assertEqual(statuses[OK], 2)
+
+    def test_run_async_hung(self):
+        def hung(trigger):
+            if trigger == 0:
+                time.sleep(1)
+            self.handle(trigger)
+        start = time.time()
+        statuses = run_async(hung, range(2), concurrency=2, deadline=0.1)
+        # the run does not wait for the thread
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(statuses[TIMEOUT], 1)
+
+    def test_run_async_queued(self):
+        def hung(trigger):
+            with self.lock:
+                first = not self.handled
+                self.handled.append(trigger)
+            if first:
+                time.sleep(0.8)
+        # the thread of the trigger that timed out is still busy : the
+        # other one waits for it, its deadline starts only when it runs
+        statuses = run_async(hung, range(2), concurrency=1, deadline=0.3)
+        self.assertEqual(statuses[TIMEOUT], 1)
+        self.assertEqual(statuses[OK], 1)
+
+    def test_run_async_socket(self):
+        timeout = socket.getdefaulttimeout()
+
+        def check(trigger):
+            # the clients of the other threads keep their own timeout
+            self.assertEqual(socket.getdefaulttimeout(), timeout)
+            self.handle(trigger)
+        statuses = run_async(check, range(2), concurrency=2, deadline=5)
+        self.assertEqual(statuses[OK], 2)
+
+    def test_run_async_engine(self):
+        run(self.handle, [1, 2], engine='async', concurrency=1)
+        self.assertEqual(sorted(self.handled), [1, 2])
+
+    def test_run_pool_nothing(self):
+        self.assertEqual(sum(run_pool(self.handle, []).values()), 0)
+
+
+class ByIdTestCase(MainTest):
+
+    def test_by_id(self):
+        t = self.create_triggerservice()
+        handled = []
+        trigger_id, status, elapsed = _by_id((handled.append, t.id, 1))
+        self.assertEqual((trigger_id, status), (t.id, OK))
+        self.assertEqual(handled, [t])
+
+    def test_by_id_unknown(self):
+        trigger_id, status, elapsed = _by_id((print, 404, 1))
+        self.assertEqual(status, ERROR)
+
+    def test_by_id_deadline_caught(self):
+        t = self.create_triggerservice()
+
+        def swallow(service):
+            try:
+                time.sleep(1)
+            except Exception:
+                pass
+        trigger_id, status, elapsed = _by_id((swallow, t.id, 0.1))
+        self.assertEqual(status, TIMEOUT)
+        self.assertLess(elapsed, 1)
+
+    def test_by_id_deadline(self):
+        t = self.create_triggerservice()
+        trigger_id, status, elapsed = _by_id(
+            (lambda service: time.sleep(1), t.id, 0.1))
+        self.assertEqual(status, TIMEOUT)
+        self.assertLess(elapsed, 1)
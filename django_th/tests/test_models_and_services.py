@@ -119,6 +119,12 @@ class TriggerServiceTest(MainTest):
         form = TriggerServiceForm(data=data)
         self.assertFalse(form.is_valid())
 
+    def test_invalid_rule_form(self):
+        data = {'description': 'My first Service', 'match': 'foo\n(bar'}
+        form = TriggerServiceForm(data=data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('match', form.errors)
+
     def test_update_result(self):
         t = self.create_triggerservice()
         self.assertTrue(isinstance(t, TriggerService))
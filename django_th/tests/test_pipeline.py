@@ -0,0 +1,109 @@
+# coding: utf-8
+from unittest.mock import Mock, patch
+
+from django.conf import settings
+
+from django_th.pipeline import Pipeline
+from django_th.publish import Pub
+from django_th.read import Read
+from django_th.stack_store import stack_store
+from django_th.tests.test_main import MainTest
+from th_wallabag.my_wallabag import ServiceWallabag
+
+
+class PipelineTestCase(MainTest):
+
+    def test_cache_stack(self):
+        service = self.create_triggerservice()
+        self.assertEqual(Pipeline.cache_stack(service), 'th_rss')
+
+    def test_producing(self):
+        service = self.create_triggerservice()
+        with patch.object(Read, 'reading') as mock_read:
+            pipeline = Pipeline(queue_size=1, consumers=1)
+            pipeline.producing(service)
+        mock_read.assert_called_once_with(service, store=pipeline.handing)
+
+    def test_handing(self):
+        service = self.create_triggerservice()
+        data = [{'title': 'foo', 'link': 'https://foo.bar'}]
+        stored = Mock()
+        pipeline = Pipeline(queue_size=1, consumers=1)
+        pipeline.handing(service, data, stored)
+        self.assertEqual(pipeline.queue.get_nowait(), (service, data, stored))
+        # neither published nor stored yet
+        stored.assert_not_called()
+
+    def test_handing_spill(self):
+        service = self.create_triggerservice()
+        data = [{'title': 'foo', 'link': 'https://foo.bar'}]
+        stack_store().clear(service.id)
+        self.addCleanup(stack_store().clear, service.id)
+        stored = Mock()
+        pipeline = Pipeline(queue_size=1, consumers=1, put_timeout=0)
+        pipeline.handing(service, data, Mock())
+        self.assertEqual(stack_store().pending(service.id), 0)
+        # the queue is full, the data go to the outbox
+        pipeline.handing(service, data, stored)
+        self.assertEqual(pipeline.queue.qsize(), 1)
+        self.assertEqual(stack_store().peek(service.id), data)
+        stored.assert_called_once_with()
+
+    def test_handing_nothing(self):
+        service = self.create_triggerservice()
+        stored = Mock()
+        pipeline = Pipeline(queue_size=1, consumers=1)
+        pipeline.handing(service, [], stored)
+        self.assertTrue(pipeline.queue.empty())
+        stored.assert_called_once_with()
+
+    def test_consuming(self):
+        service = self.create_triggerservice()
+        left = [{'title': 'bar', 'link': 'https://foo.bar/1'}]
+        data = [{'title': 'foo', 'link': 'https://foo.bar'}]
+        # left in the outbox by a previous run
+        stack_store().clear(service.id)
+        self.addCleanup(stack_store().clear, service.id)
+        stack_store().push(service.id, left)
+        stored = Mock()
+        pipeline = Pipeline(queue_size=2, consumers=1)
+        pipeline.queue.put((service, data, stored))
+        pipeline.queue.put(None)
+        with patch.object(Pub, 'delivering') as mock_pub:
+            pipeline.consuming()
+        stored.assert_called_once_with()
+        # first run of the trigger : it will be updated anyway
+        args = mock_pub.call_args[0]
+        self.assertEqual(args[0], service)
+        self.assertEqual([d for _, d in args[1]], left + data)
+        # the data read are not stored
+        self.assertIsNone(args[1][1][0])
+        self.assertEqual(args[2:], (True, True))
+
+    def test_publishing_failed(self):
+        service = self.create_triggerservice()
+        data = [{'title': 'foo {}'.format(i), 'link': 'https://foo.bar'}
+                for i in range(2)]
+        stack_store().clear(service.id)
+        self.addCleanup(stack_store().clear, service.id)
+        with patch.object(ServiceWallabag, 'save_data',
+                          side_effect=[True, False]), \
+                self.settings(DJANGO_TH=dict(settings.DJANGO_TH,
+                                             publishing_limit=0)):
+            Pipeline(queue_size=1, consumers=1).publishing(service, data)
+        # only the data that failed is stored, to be published again
+        self.assertEqual([d['title'] for d in stack_store().peek(
+            service.id)], ['foo 1'])
+
+    def test_publishing_limit(self):
+        service = self.create_triggerservice()
+        data = [{'title': 'foo {}'.format(i), 'link': 'https://foo.bar'}
+                for i in range(3)]
+        stack_store().clear(service.id)
+        self.addCleanup(stack_store().clear, service.id)
+        with patch.object(Pub, 'delivering') as mock_pub, \
+                self.settings(DJANGO_TH=dict(settings.DJANGO_TH,
+                                             publishing_limit=2)):
+            Pipeline(queue_size=1, consumers=1).publishing(service, data)
+        self.assertEqual([d for _, d in mock_pub.call_args[0][1]], data[:2])
+        self.assertEqual(stack_store().peek(service.id), data[2:])
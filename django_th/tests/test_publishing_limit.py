@@ -2,29 +2,38 @@
 from django.test import TestCase
 
 from django.conf import settings
+from django.core.cache import caches
 from django_th.publishing_limit import PublishingLimit
+from django_th.stack_store import stack_store
 
 
 class PublishingLimitTestCase(TestCase):
 
+    def setUp(self):
+        self.store = stack_store()
+        self.store.clear(1)
+        self.store.delete('th_rss_1')
+
+    def tearDown(self):
+        self.setUp()
+
     def test_settings(self):
         self.assertTrue('publishing_limit' in settings.DJANGO_TH)
 
     def test_get_data(self):
 
         cache_stack = "th_rss"
-        cache_data = {}
         trigger_id = 1
 
-        services = PublishingLimit.get_data(cache_stack, cache_data, trigger_id)
+        services = PublishingLimit.get_data(cache_stack, trigger_id)
         self.assertTrue(len(services) == 0)
 
     def test_get_data2(self):
         cache_stack = "th_rss"
-        cache_data = {'th_rss_1': 'foobar'}
+        self.store.set('th_rss_1', [{'th_rss_1': 'foobar'}])
         trigger_id = 1
 
-        services = PublishingLimit.get_data(cache_stack, cache_data, trigger_id)
+        services = PublishingLimit.get_data(cache_stack, trigger_id)
         self.assertTrue(len(services) > 0)
 
     def test_get_data3(self):
@@ -36,7 +45,31 @@ class PublishingLimitTestCase(TestCase):
         cache_data.append({'th_rss_4': 'foobar'})
         cache_data.append({'th_rss_5': 'foobar'})
         cache_data.append({'th_rss_6': 'foobar'})
+        self.store.push(1, cache_data)
         trigger_id = 1
 
-        services = PublishingLimit.get_data(cache_stack, cache_data, trigger_id)
+        services = PublishingLimit.get_data(cache_stack, trigger_id)
         self.assertTrue(len(services) > 0)
+
+    def test_outbox(self):
+        cache = caches['django_th']
+        data = [{'title': 'foo {}'.format(i)} for i in range(5)]
+        self.store.push(1, data[:3])
+        # recycled in the stack
+        cache.set('th_rss_1', data[3:])
+        with self.settings(DJANGO_TH=dict(settings.DJANGO_TH,
+                                          publishing_limit=2)):
+            entries = PublishingLimit.get_data('th_rss', 1)
+            self.assertEqual([d for _, d in entries], data[:2])
+            # the stack moved to the outbox
+            self.assertIsNone(cache.get('th_rss_1'))
+            self.assertEqual(self.store.pending(1), 5)
+            # the first one is published, not the second one
+            self.store.ack(1, [entries[0][0]])
+            entries = PublishingLimit.get_data('th_rss', 1)
+            self.assertEqual([d for _, d in entries], data[1:3])
+            self.store.ack(1, [entry_id for entry_id, _ in entries])
+            entries = PublishingLimit.get_data('th_rss', 1)
+            self.assertEqual([d for _, d in entries], data[3:])
+        # without limit, everything
+        self.assertEqual(len(PublishingLimit.get_data('th_rss', 1)), 2)
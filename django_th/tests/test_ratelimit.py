@@ -0,0 +1,86 @@
+# coding: utf-8
+import threading
+import time
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from django_th.ratelimit import RateLimiter
+
+
+class RateLimiterTestCase(TestCase):
+
+    def setUp(self):
+        self.limiter = RateLimiter('api.test.local', 'AZERTY', rate=1,
+                                   capacity=2)
+        caches['django_th'].delete(self.limiter.key)
+
+    def tearDown(self):
+        caches['django_th'].delete(self.limiter.key)
+
+    def test_acquire(self):
+        self.assertTrue(self.limiter.acquire())
+        self.assertTrue(self.limiter.acquire())
+        self.assertFalse(self.limiter.acquire())
+        self.assertFalse(self.limiter.available())
+        self.assertGreater(self.limiter.retry_at(), time.time())
+
+    def test_shared(self):
+        # same host and token : same bucket
+        other = RateLimiter('api.test.local', 'AZERTY', rate=1, capacity=2)
+        self.assertTrue(other.acquire())
+        self.assertTrue(other.acquire())
+        self.assertFalse(self.limiter.acquire())
+        # another token has its own bucket
+        another = RateLimiter('api.test.local', 'QWERTY', rate=1,
+                              capacity=2)
+        caches['django_th'].delete(another.key)
+        self.assertTrue(another.acquire())
+        caches['django_th'].delete(another.key)
+
+    def test_learn(self):
+        reset = int(time.time()) + 600
+        self.limiter.learn({'X-RateLimit-Remaining': '0',
+                            'X-RateLimit-Reset': str(reset)})
+        self.assertFalse(self.limiter.acquire())
+        self.assertEqual(self.limiter.retry_at(), reset)
+        self.limiter.learn({'x-rate-limit-remaining': '5'})
+        self.assertTrue(self.limiter.acquire())
+
+    def test_retry_after(self):
+        self.limiter.learn({'Retry-After': '120'})
+        self.assertFalse(self.limiter.available())
+        self.assertAlmostEqual(self.limiter.retry_at(), time.time() + 120,
+                               delta=5)
+
+    def test_lazy(self):
+        with patch('django_th.ratelimit.get_redis_connection') as mock_redis:
+            limiter = RateLimiter('api.test.local', 'AZERTY')
+            # nothing asked to redis yet
+            mock_redis.assert_not_called()
+            limiter.block(60)
+            mock_redis.assert_called_once_with('django_th')
+        self.assertAlmostEqual(limiter.blocked_until, time.time() + 60,
+                               delta=5)
+
+    def test_block_expired(self):
+        self.limiter.block(time.time() - 1)
+        self.assertTrue(self.limiter.acquire())
+
+    def test_concurrent(self):
+        limiter = RateLimiter('api.test.local', 'AZERTY', rate=0.001,
+                              capacity=20)
+        taken = []
+
+        def spend():
+            for _ in range(10):
+                if limiter.acquire():
+                    taken.append(1)
+        threads = [threading.Thread(target=spend) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # never more than the capacity
+        self.assertEqual(len(taken), 20)
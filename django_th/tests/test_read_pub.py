@@ -1,16 +1,34 @@
 # coding: utf-8
 from unittest.mock import patch
 import arrow
+import datetime
+import time
 from django.conf import settings
+from django.core.cache import caches
+from django.utils.timezone import now
 
+from django_th.blobs import Blob
+from django_th.models import TriggerService
 from django_th.service_provider import ServiceProvider
+from django_th.services.services import ServicesMgr
 from django_th.read import Read
 from django_th.publish import Pub
+from django_th.ratelimit import RateLimiter
+from django_th.stack_store import stack_store
+from django_th.stacks import stack_version
 from django_th.tests.test_main import MainTest
+from th_wallabag.my_wallabag import ServiceWallabag
 
 
 class PublishTestCase(MainTest):
 
+    def setUp(self):
+        super(PublishTestCase, self).setUp()
+        stack_store().clear(1)
+
+    def tearDown(self):
+        stack_store().clear(1)
+
     def test_publishing(self):
         service = self.create_triggerservice()
         with patch.object(Pub, 'provider') as mock_pub:
@@ -18,11 +36,57 @@ class PublishTestCase(MainTest):
             se.publishing(service)
         mock_pub.assert_called_once_with(service)
 
+    def test_consumer(self):
+        service = self.create_triggerservice()
+        data = [{'title': 'foo {}'.format(i), 'link': 'https://foo.bar'}
+                for i in range(3)]
+        stack_store().push(service.id, data)
+        with self.settings(DJANGO_TH=dict(settings.DJANGO_TH,
+                                          publishing_limit=0)):
+            entries = Pub().provider(service)
+            with patch.object(ServiceWallabag, 'save_data',
+                              side_effect=[True, False, True]):
+                to_update, status = Pub().consumer(service, entries, False,
+                                                   True)
+            self.assertTrue(to_update)
+            self.assertFalse(status)
+            # only the data that failed is published again
+            entries = Pub().provider(service)
+        self.assertEqual([d['title'] for _, d in entries], ['foo 1'])
+
+    def test_consumer_raises(self):
+        service = self.create_triggerservice()
+        data = [{'title': 'foo {}'.format(i), 'link': 'https://foo.bar'}
+                for i in range(2)]
+        stack_store().push(service.id, data)
+        entries = Pub().provider(service)
+        with patch.object(ServiceWallabag, 'save_data',
+                          side_effect=[True, ValueError]):
+            with self.assertRaises(ValueError):
+                Pub().consumer(service, entries, False, True)
+        # what was published is not sent again
+        self.assertEqual([d['title'] for d in stack_store().peek(service.id)],
+                         ['foo 1'])
+
+    def test_delivering_lost_text(self):
+        service = self.create_triggerservice()
+        data = [{'title': 'foo', 'content': Blob('0' * 64)},
+                {'title': 'bar', 'content': 'bar'}]
+        stack_store().push(service.id, data)
+        entries = Pub().provider(service)
+        with patch.object(ServiceWallabag, 'save_data',
+                          return_value=True) as save_data:
+            Pub().delivering(service, entries)
+        self.assertEqual(save_data.call_count, 1)
+        # the data whose text is lost is not dropped
+        self.assertEqual([d['title'] for d in stack_store().peek(service.id)],
+                         ['foo'])
+
 
 class ReadTestCase(MainTest):
 
     def test_reading(self):
-        from django_th.services import default_provider
+        from th_rss.my_rss import ServiceRss
         now = arrow.utcnow().to(settings.TIME_ZONE).format(
             'YYYY-MM-DD HH:mm:ssZZ')
         service = self.create_triggerservice()
@@ -34,10 +98,88 @@ class ReadTestCase(MainTest):
                   'date_triggered': date_triggered}
 
         with patch.object(ServiceProvider, 'get_service') as mock_it:
-            mock_it.return_value = default_provider.get_service(
-                str(service.provider.name.name))
-            with patch.object(Read, 'provider') as mock_read:
+            mock_it.return_value = ServiceRss()
+            with patch.object(Read, 'provider') as mock_read, \
+                    patch.object(ServiceRss, 'data_stored') as mock_stored:
                 se = Read()
                 se.reading(service)
-            mock_read.assert_called_once_with(mock_it.return_value, **kwargs)
+            # a fresh instance, which saves what it read once it is stored
+            self.assertIsInstance(mock_read.call_args[0][0], ServiceRss)
+            self.assertIsNot(mock_read.call_args[0][0], mock_it.return_value)
+            self.assertEqual(mock_read.call_args[1], kwargs)
+            mock_stored.assert_called_once_with(service.id)
         mock_it.assert_called_with(service.provider.name.name)
+
+    def test_reading_rate_limit(self):
+        service = self.create_triggerservice()
+        with patch.object(ServicesMgr, 'rate_limiter') as mock_limiter:
+            mock_limiter.return_value.acquire.return_value = False
+            mock_limiter.return_value.retry_at.return_value = \
+                time.time() + 60
+            with patch.object(Read, 'provider') as mock_read:
+                self.assertEqual(Read().reading(service), [])
+            mock_read.assert_not_called()
+        # deferred without counting a failure
+        service = TriggerService.objects.get(id=service.id)
+        self.assertGreater(service.next_run_at, now())
+        self.assertEqual(service.provider_failed, 0)
+
+    def test_reading_rate_limited(self):
+        service = self.create_triggerservice()
+        limiter = RateLimiter('api.test.local', 'AZERTY')
+        caches['django_th'].delete(limiter.key)
+        self.addCleanup(caches['django_th'].delete, limiter.key)
+
+        def blocked(service_provider, **kwargs):
+            # the API stops the read on the way, eg twitter
+            limiter.block(60)
+            return []
+        with patch.object(ServicesMgr, 'rate_limiter',
+                          return_value=limiter), \
+                patch.object(Read, 'provider', side_effect=blocked), \
+                patch.object(ServicesMgr, 'data_stored') as mock_stored:
+            self.assertEqual(Read().reading(service), [])
+        # nothing saved, read again when the API allows it
+        mock_stored.assert_not_called()
+        service = TriggerService.objects.get(id=service.id)
+        self.assertGreater(service.next_run_at,
+                           now() + datetime.timedelta(seconds=30))
+
+    def test_reading_rules(self):
+        service = self.create_triggerservice()
+        service.match = 'django'
+        service.does_not_match = 'flask'
+        data = [{'title': 'Django 2.0', 'link': 'https://foo.bar/1'},
+                {'title': 'Django vs Flask', 'link': 'https://foo.bar/2'},
+                {'title': 'Pyramid', 'link': 'https://foo.bar/3'}]
+        stack_store().clear(service.id)
+        with patch.object(Read, 'provider', return_value=data):
+            self.assertEqual(Read().reading(service), data[:1])
+        # the filtered data are not published
+        self.assertEqual(stack_store().peek(service.id), data[:1])
+        self.assertIsNone(
+            caches['django_th'].get('th_rss_{}'.format(service.id)))
+        stack_store().clear(service.id)
+
+    def test_reading_version(self):
+        service = self.create_triggerservice()
+        stack_store().clear(service.id)
+        self.addCleanup(stack_store().clear, service.id)
+        version = stack_version(service.id)
+        # nothing new : the feed of the trigger is still up to date
+        with patch.object(Read, 'provider', return_value=[]):
+            Read().reading(service)
+        self.assertEqual(stack_version(service.id), version)
+        with patch.object(Read, 'provider', return_value=[
+                {'title': 'foo', 'link': 'https://foo.bar'}]):
+            Read().reading(service)
+        self.assertNotEqual(stack_version(service.id), version)
+
+    def test_reading_failed(self):
+        service = self.create_triggerservice()
+        with patch.object(Read, 'provider', return_value=False):
+            self.assertFalse(Read().reading(service))
+        # not read again before the backoff
+        service = TriggerService.objects.get(id=service.id)
+        self.assertEqual(service.provider_failed, 1)
+        self.assertGreater(service.next_run_at, now())
@@ -0,0 +1,35 @@
+# coding: utf-8
+from django.core.cache import caches
+from django.test import TestCase
+
+from django_th.recycle import recycle
+from django_th.stacks import bump_version, stack_version
+
+
+class RecycleTestCase(TestCase):
+
+    def setUp(self):
+        self.cache = caches['django_th']
+        self.cache.delete_pattern('th_*', version=2)
+
+    def test_recycle(self):
+        bump_version(1)
+        version = stack_version(1)
+        self.cache.set('th_github_1', [{'title': 'foo'}], version=2)
+        self.cache.set('th_github_1', [{'title': 'bar'}])
+        self.cache.set('th_evernote_2', [{'title': 'baz'}], version=2)
+        # not recycled
+        self.cache.set('th_instapush_3', [{'title': 'foo'}], version=2)
+        moved, size = recycle(batch_size=1)
+        self.assertEqual(moved, 2)
+        self.assertGreater(size, 0)
+        # the data put aside come first, the new ones are kept
+        self.assertEqual(self.cache.get('th_github_1'),
+                         [{'title': 'foo'}, {'title': 'bar'}])
+        self.assertEqual(self.cache.get('th_evernote_2'), [{'title': 'baz'}])
+        self.assertIsNone(self.cache.get('th_github_1', version=2))
+        self.assertIsNone(self.cache.get('th_instapush_3'))
+        self.assertNotEqual(stack_version(1), version)
+        self.assertEqual(recycle(), (0, 0))
+        self.cache.delete_many(['th_github_1', 'th_evernote_2'])
+        self.cache.delete('th_instapush_3', version=2)
@@ -0,0 +1,90 @@
+# coding: utf-8
+import time
+from unittest.mock import patch
+
+from django_th.models import TriggerService
+from django_th.rows import CHANNEL, RowCache, get_row, invalidate, rows
+from django_th.tests.test_main import MainTest
+from th_wallabag.models import Wallabag
+
+
+class RowCacheTestCase(MainTest):
+
+    def setUp(self):
+        super(RowCacheTestCase, self).setUp()
+        self.trigger = self.create_triggerservice()
+        self.wallabag = Wallabag.objects.get(trigger=self.trigger)
+
+    def test_get_row(self):
+        trigger = get_row(TriggerService, ('provider__name', 'user'),
+                          id=self.trigger.id)
+        with self.assertNumQueries(0):
+            again = get_row(TriggerService, ('provider__name', 'user'),
+                            id=self.trigger.id)
+            self.assertEqual(again.provider.name.name, 'ServiceRss')
+        self.assertEqual(again, trigger)
+        # each reader has its own copy
+        self.assertIsNot(again, trigger)
+
+    def test_missing(self):
+        Wallabag.objects.filter(trigger=self.trigger).delete()
+        with self.assertRaises(Wallabag.DoesNotExist):
+            get_row(Wallabag, trigger_id=self.trigger.id)
+        # not cached
+        Wallabag.objects.bulk_create([Wallabag(trigger=self.trigger,
+                                               tag='new')])
+        self.assertEqual(get_row(Wallabag, trigger_id=self.trigger.id).tag,
+                         'new')
+
+    def test_saved(self):
+        get_row(Wallabag, trigger_id=self.trigger.id)
+        trigger = get_row(TriggerService, ('provider',), id=self.trigger.id)
+        self.wallabag.tag = 'changed'
+        self.wallabag.save()
+        self.assertEqual(get_row(Wallabag, trigger_id=self.trigger.id).tag,
+                         'changed')
+        # the rows read with a changed row are dropped too
+        provider = trigger.provider
+        provider.token = 'changed'
+        provider.save()
+        with self.assertNumQueries(1):
+            trigger = get_row(TriggerService, ('provider',),
+                              id=self.trigger.id)
+        self.assertEqual(trigger.provider.token, 'changed')
+
+    def test_deleted(self):
+        get_row(Wallabag, trigger_id=self.trigger.id)
+        self.wallabag.delete()
+        with self.assertRaises(Wallabag.DoesNotExist):
+            get_row(Wallabag, trigger_id=self.trigger.id)
+
+    def test_other_process(self):
+        get_row(Wallabag, trigger_id=self.trigger.id)
+        Wallabag.objects.filter(id=self.wallabag.id).update(tag='changed')
+        # told by another process
+        rows()._message({'channel': CHANNEL.encode(),
+                         'data': b'th_wallabag.Wallabag'})
+        self.assertEqual(get_row(Wallabag, trigger_id=self.trigger.id).tag,
+                         'changed')
+
+    def test_updated(self):
+        get_row(Wallabag, trigger_id=self.trigger.id)
+        Wallabag.objects.filter(id=self.wallabag.id).update(tag='changed')
+        with patch('django_th.rows.get_redis_connection') as mock_redis:
+            invalidate(Wallabag)
+        # dropped here, then told to the other processes
+        mock_redis.return_value.publish.assert_called_once_with(
+            CHANNEL, 'th_wallabag.Wallabag')
+        self.assertEqual(get_row(Wallabag, trigger_id=self.trigger.id).tag,
+                         'changed')
+
+    def test_lru_ttl(self):
+        cache = RowCache(maxsize=1, ttl=60)
+        cache.get(Wallabag, trigger_id=self.trigger.id)
+        cache.get(TriggerService, id=self.trigger.id)
+        self.assertEqual(len(cache.rows), 1)
+        cache = RowCache(ttl=0.01)
+        cache.get(Wallabag, trigger_id=self.trigger.id)
+        time.sleep(0.02)
+        with self.assertNumQueries(1):
+            cache.get(Wallabag, trigger_id=self.trigger.id)
@@ -0,0 +1,41 @@
+# coding: utf-8
+import feedparser
+from django.test import TestCase
+
+from django_th.rules import compile_rules
+
+
+class RulesTestCase(TestCase):
+
+    def setUp(self):
+        self.items = [{'title': 'Django 2.0 released'},
+                      {'title': 'Flask', 'summary': 'not django'},
+                      {'title': 'Pyramid',
+                       'content': [{'value': 'a django app'}]}]
+
+    def test_no_rule(self):
+        rules = compile_rules('', '')
+        self.assertFalse(rules)
+        self.assertEqual(rules.filter(self.items), self.items)
+
+    def test_match(self):
+        rules = compile_rules('django\nflask', '')
+        self.assertEqual(rules.filter(self.items), self.items)
+        rules = compile_rules('released\n^flask', '')
+        self.assertEqual(rules.filter(self.items), self.items[:2])
+
+    def test_does_not_match(self):
+        rules = compile_rules('django', 'flask\npyramid')
+        self.assertEqual(rules.filter(self.items), self.items[:1])
+
+    def test_feedparser_entry(self):
+        entry = feedparser.FeedParserDict(title='foo', link='https://bar')
+        self.assertEqual(compile_rules('bar', '').filter([entry]), [entry])
+
+    def test_compiled_once(self):
+        self.assertIs(compile_rules('django', ''), compile_rules('django', ''))
+
+    def test_invalid_rule(self):
+        # filters nothing instead of failing
+        self.assertEqual(compile_rules('(django', '').filter(self.items),
+                         self.items)
@@ -0,0 +1,91 @@
+# coding: utf-8
+import datetime
+from unittest.mock import patch
+
+from django.conf import settings
+from django.utils.timezone import now
+
+from django_th.models import TriggerService
+from django_th.scheduler import active_triggers, backoff, \
+    claim_due_triggers, due_triggers, next_due, schedule_next
+from django_th.tests.test_main import MainTest
+
+
+class SchedulerTestCase(MainTest):
+
+    def test_active_triggers(self):
+        t = self.create_triggerservice()
+        self.assertIn(t, active_triggers())
+        TriggerService.objects.filter(id=t.id).update(status=False)
+        self.assertNotIn(t, active_triggers())
+
+    def test_due_triggers(self):
+        t = self.create_triggerservice()
+        # never read : due
+        self.assertIn(t, due_triggers())
+        TriggerService.objects.filter(id=t.id).update(
+            next_run_at=now() + datetime.timedelta(minutes=5))
+        self.assertNotIn(t, due_triggers())
+        TriggerService.objects.filter(id=t.id).update(
+            next_run_at=now() - datetime.timedelta(minutes=5))
+        self.assertIn(t, due_triggers())
+
+    def test_claim_due_triggers(self):
+        t = self.create_triggerservice()
+        current = now()
+        self.assertEqual(claim_due_triggers(current), [t])
+        # a run started meanwhile does not read it again
+        self.assertEqual(claim_due_triggers(current), [])
+        self.assertEqual(next_due(current), current + datetime.timedelta(
+            seconds=settings.DJANGO_TH.get('lease', 300)))
+        # read : due again after its poll_interval
+        schedule_next(t, current)
+        self.assertEqual(claim_due_triggers(current), [t])
+
+    def test_claim_due_triggers_taken(self):
+        t = self.create_triggerservice()
+        due = list(due_triggers())
+        # another run takes it between the read and the claim
+        later = now() + datetime.timedelta(minutes=5)
+        TriggerService.objects.filter(id=t.id).update(next_run_at=later)
+        with patch('django_th.scheduler.due_triggers') as mock_due:
+            mock_due.return_value.iterator.return_value = due
+            self.assertEqual(claim_due_triggers(), [])
+        self.assertEqual(TriggerService.objects.get(id=t.id).next_run_at,
+                         later)
+
+    def test_schedule_next(self):
+        t = self.create_triggerservice()
+        t.poll_interval = 60
+        t.save()
+        current = now()
+        next_run_at = schedule_next(t, current)
+        self.assertEqual(next_run_at, current + datetime.timedelta(hours=1))
+        self.assertEqual(TriggerService.objects.get(id=t.id).next_run_at,
+                         next_run_at)
+        self.assertNotIn(t, due_triggers(current))
+        self.assertEqual(next_due(current), next_run_at)
+
+    def test_schedule_next_each_run(self):
+        t = self.create_triggerservice()
+        current = now()
+        schedule_next(t, current)
+        self.assertIn(t, due_triggers(current))
+        self.assertIsNone(next_due(current))
+
+    def test_schedule_next_resets_failures(self):
+        t = self.create_triggerservice()
+        TriggerService.objects.filter(id=t.id).update(provider_failed=2)
+        schedule_next(t)
+        self.assertEqual(TriggerService.objects.get(id=t.id).provider_failed,
+                         0)
+
+    def test_backoff(self):
+        current = now()
+        with self.settings(DJANGO_TH={'backoff_base': 60,
+                                      'backoff_max': 600}):
+            for failed, low, high in ((1, 30, 60), (2, 60, 120),
+                                      (3, 120, 240), (10, 300, 600)):
+                delay = (backoff(failed, current) - current).total_seconds()
+                self.assertGreaterEqual(delay, low)
+                self.assertLessEqual(delay, high)
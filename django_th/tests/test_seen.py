@@ -0,0 +1,83 @@
+# coding: utf-8
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from django_th.pipeline import Pipeline
+from django_th.publish import Pub
+from django_th.read import Read
+from django_th.seen import SeenItems, item_key
+from django_th.stack_store import stack_store
+from django_th.tests.test_main import MainTest
+
+
+class SeenItemsTestCase(TestCase):
+
+    def setUp(self):
+        self.seen = SeenItems('test', capacity=10)
+        self.clear()
+
+    def tearDown(self):
+        self.clear()
+
+    def clear(self):
+        self.seen.redis.delete(*self.seen.keys)
+
+    def test_item_key(self):
+        self.assertEqual(item_key({'id': 1, 'link': 'https://foo.bar'}),
+                         'id:1')
+        self.assertEqual(item_key({'title': 'foo', 'content': 'bar'}),
+                         'content:foo:bar')
+
+    def test_unseen(self):
+        items = [{'link': 'https://foo.bar/{}'.format(i)} for i in range(3)]
+        self.assertEqual(self.seen.unseen(items), items)
+        self.assertEqual(self.seen.add(items[:2]), 2)
+        self.assertEqual(self.seen.unseen(items), items[2:])
+        # already known
+        self.assertEqual(self.seen.add(items[:2]), 0)
+
+    def test_rotation(self):
+        old = [{'link': 'https://old/{}'.format(i)} for i in range(10)]
+        new = [{'link': 'https://new/{}'.format(i)} for i in range(10)]
+        self.seen.add(old)
+        # the previous filter still knows the old items
+        self.assertEqual(self.seen.unseen(old), [])
+        self.seen.add(new)
+        # then they are forgotten
+        self.assertEqual(self.seen.unseen(old), old)
+        self.assertEqual(self.seen.unseen(new), [])
+
+    def test_disabled(self):
+        seen = SeenItems('test', capacity=0)
+        items = [{'link': 'https://foo.bar'}]
+        self.assertEqual(seen.add(items), 0)
+        self.assertEqual(seen.unseen(items), items)
+
+
+class ReadSeenTestCase(MainTest):
+
+    def test_queuing(self):
+        service = self.create_triggerservice()
+        seen = SeenItems(service.id)
+        seen.redis.delete(*seen.keys)
+        self.addCleanup(seen.redis.delete, *seen.keys)
+        stack_store().clear(service.id)
+        self.addCleanup(stack_store().clear, service.id)
+        data = [{'title': 'foo', 'link': 'https://foo.bar'}]
+        Read().queuing(service, data)
+        # not published yet, not queued again by the next read
+        self.assertEqual(stack_store().pending(service.id), 1)
+        self.assertEqual(seen.unseen(data), [])
+
+    def test_pipeline(self):
+        service = self.create_triggerservice()
+        seen = SeenItems(service.id)
+        seen.redis.delete(*seen.keys)
+        self.addCleanup(seen.redis.delete, *seen.keys)
+        stack_store().clear(service.id)
+        self.addCleanup(stack_store().clear, service.id)
+        data = [{'title': 'foo', 'link': 'https://foo.bar'}]
+        with patch.object(Pub, 'consumer', return_value=(True, True)):
+            Pipeline(queue_size=1, consumers=1).publishing(service, data)
+        self.assertEqual(seen.unseen(data), [])
@@ -0,0 +1,88 @@
+# coding: utf-8
+import datetime
+import decimal
+import pickle
+import time
+import uuid
+
+import arrow
+import feedparser
+import pytz
+from django.core.cache import caches
+from django.test import TestCase
+
+from django_th.serializers import MSGPACK, StackCompressor, StackSerializer
+
+STAMP = 1508493600  # 2017-10-20 10:00:00 UTC
+
+
+def entry(i=0):
+    return feedparser.FeedParserDict(
+        title='entry {}'.format(i),
+        title_detail={'type': 'text/plain', 'value': 'entry {}'.format(i)},
+        link='https://foo.bar/{}'.format(i),
+        links=[{'rel': 'alternate', 'href': 'https://foo.bar/{}'.format(i)}],
+        summary='<p>foo</p>',
+        summary_detail={'type': 'text/html', 'value': '<p>foo</p>'},
+        content=[{'type': 'text/html', 'value': '<p>foo bar</p>'}],
+        published_parsed=time.gmtime(STAMP),
+        my_date=arrow.get(STAMP))
+
+
+class StackSerializerTestCase(TestCase):
+
+    def setUp(self):
+        self.serializer = StackSerializer({})
+
+    def test_feedparser(self):
+        data = self.serializer.dumps([entry()])
+        self.assertEqual(data[:1], MSGPACK)
+        item = self.serializer.loads(data)[0]
+        self.assertIsInstance(item, feedparser.FeedParserDict)
+        # the properties not used by the consumers are dropped
+        self.assertNotIn('title_detail', item)
+        self.assertNotIn('links', item)
+        self.assertEqual(item['summary_detail']['value'], '<p>foo</p>')
+        self.assertEqual(item.description, '<p>foo</p>')
+        self.assertEqual(item.published_parsed, time.gmtime(STAMP))
+        self.assertEqual(item['my_date'], arrow.get(STAMP))
+
+    def test_types(self):
+        paris = pytz.timezone('Europe/Paris')
+        value = {'when': datetime.datetime(2017, 10, 20, 10, 0),
+                 'aware': paris.localize(datetime.datetime(2017, 10, 20, 12)),
+                 'day': datetime.date(2017, 10, 20),
+                 'uuid': uuid.uuid4(),
+                 'tuple': (1, 'a'),
+                 'bytes': b'\x80foo',
+                 1: None}
+        self.assertEqual(self.serializer.loads(self.serializer.dumps(value)),
+                         value)
+
+    def test_pickle(self):
+        # not supported by msgpack : pickled
+        data = self.serializer.dumps([decimal.Decimal('1.5')])
+        self.assertNotEqual(data[:1], MSGPACK)
+        self.assertEqual(self.serializer.loads(data), [decimal.Decimal('1.5')])
+        # stored before the serializer
+        data = pickle.dumps([entry()], -1)
+        self.assertEqual(self.serializer.loads(data)[0]['title'], 'entry 0')
+
+
+class StackCompressorTestCase(TestCase):
+
+    def test_compress(self):
+        compressor = StackCompressor({'COMPRESS_MIN_LENGTH': 100})
+        self.assertEqual(compressor.compress(b'foo'), b'foo')
+        value = b'foo bar ' * 100
+        compressed = compressor.compress(value)
+        self.assertLess(len(compressed), len(value))
+        self.assertEqual(compressor.decompress(compressed), value)
+
+    def test_cache(self):
+        cache = caches['django_th']
+        cache.set('th_rss_1', [entry(i) for i in range(50)])
+        data = cache.get('th_rss_1')
+        self.assertEqual(len(data), 50)
+        self.assertEqual(data[49]['title'], 'entry 49')
+        cache.delete('th_rss_1')
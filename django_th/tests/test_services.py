@@ -1,4 +1,7 @@
 # coding: utf-8
+from unittest.mock import Mock
+
+from django.conf import settings
 from django.test import Client
 
 try:
@@ -60,6 +63,22 @@ class ServicesMgrTestCase(MainTest):
         self.assertTrue(title)
         self.assertTrue(content)
 
+    def test_timed(self):
+        session = Mock()
+        request = session.request
+        with self.settings(DJANGO_TH=dict(settings.DJANGO_TH,
+                                          trigger_timeout=30)):
+            self.assertIs(self.service.timed(session), session)
+
+        def get(url, **kwargs):
+            return session.request('GET', url, **kwargs)
+        session.get = get
+        session.get('https://foo.bar/')
+        request.assert_called_with('GET', 'https://foo.bar/', timeout=30)
+        # the timeout set by the SDK is kept
+        session.get('https://foo.bar/', timeout=5)
+        request.assert_called_with('GET', 'https://foo.bar/', timeout=5)
+
     # def test_auth(self):
     #    request_token = self.service.auth(self.request)
     #    self.assertTrue(type(request_token) is str)
@@ -0,0 +1,176 @@
+# coding: utf-8
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+
+from django_th.outbox import Outbox
+from django_th.models import TriggerService
+from django_th.stack_store import MemoryStackStore, RedisStackStore, \
+    shared_stack_store, stack_store
+from django_th.stacks import stack_version
+from django_th.tests.test_main import MainTest
+
+
+class StackStoreMixin(object):
+
+    def setUp(self):
+        self.store.clear(1)
+        self.store.delete('th_rss_1')
+
+    def tearDown(self):
+        self.setUp()
+
+    def test_stack(self):
+        self.assertIsNone(self.store.get('th_rss_1'))
+        self.store.set('th_rss_1', [{'title': 'foo'}])
+        self.assertEqual(self.store.get('th_rss_1'), [{'title': 'foo'}])
+        self.store.delete('th_rss_1')
+        self.assertIsNone(self.store.get('th_rss_1'))
+
+    def test_outbox(self):
+        data = [{'title': 'foo {}'.format(i)} for i in range(5)]
+        self.store.set('th_rss_1', data[:2])
+        self.store.push(1, data[:2], 'th_rss_1')
+        self.assertIsNone(self.store.get('th_rss_1'))
+        self.store.set('th_rss_1', data[2:])
+        self.assertEqual(self.store.pending(1), 2)
+        self.assertEqual(self.store.peek(1, 1), data[:1])
+        entries = self.store.take(1, 3, 'th_rss_1')
+        self.assertEqual([d for _, d in entries], data[:3])
+        self.assertIsNone(self.store.get('th_rss_1'))
+        # the second one failed
+        self.store.ack(1, [entries[0][0], entries[2][0]])
+        self.assertEqual(self.store.pending(1), 3)
+        entries = self.store.take(1)
+        self.assertEqual([d for _, d in entries], [data[1]] + data[3:])
+        self.store.ack(1, [entry_id for entry_id, _ in entries])
+        self.assertEqual(self.store.pending(1), 0)
+        self.assertEqual(self.store.take(1), [])
+
+    def test_recycle(self):
+        version = stack_version(1)
+        self.store.set_aside('th_rss_1', [{'title': 'foo'}])
+        self.store.set('th_rss_1', [{'title': 'bar'}])
+        self.assertIn('th_rss_1', list(self.store.aside()))
+        moved, size = self.store.recycle()
+        self.assertEqual(moved, 1)
+        self.assertEqual(self.store.get('th_rss_1'),
+                         [{'title': 'foo'}, {'title': 'bar'}])
+        self.assertNotIn('th_rss_1', list(self.store.aside()))
+        self.assertNotEqual(stack_version(1), version)
+
+
+class RedisStackStoreTestCase(StackStoreMixin, TestCase):
+
+    store = RedisStackStore()
+
+    def setUp(self):
+        super(RedisStackStoreTestCase, self).setUp()
+        # put aside by the other tests
+        self.store.cache.delete_pattern('th_*', version=2)
+
+    def outbox(self, consumer, **kwargs):
+        with self.settings(DJANGO_TH=dict(settings.DJANGO_TH, **kwargs)):
+            outbox = Outbox(1)
+        outbox.consumer = consumer
+        return outbox
+
+    def test_recycle_written(self):
+        self.store.delete('th_rss_1')
+        self.addCleanup(self.store.delete, 'th_rss_1')
+        self.store.set_aside('th_rss_1', [{'title': 'foo'}])
+        merge = self.store._merge
+        written = []
+
+        def writing(aside, current):
+            # a provider writes the stack while it is recycled
+            if not written:
+                written.append(1)
+                self.store.set('th_rss_1', [{'title': 'bar'}])
+            return merge(aside, current)
+        with patch.object(self.store, '_merge', side_effect=writing):
+            self.assertEqual(self.store.recycle()[0], 1)
+        self.assertEqual(self.store.get('th_rss_1'),
+                         [{'title': 'foo'}, {'title': 'bar'}])
+
+    def test_consumers(self):
+        data = [{'title': 'foo {}'.format(i)} for i in range(3)]
+        self.store.push(1, data)
+        first = self.outbox('first')
+        self.assertEqual([d for _, d in first.take(2)], data[:2])
+        # another run at the same time does not publish them again
+        second = self.outbox('second')
+        self.assertEqual([d for _, d in second.take()], data[2:])
+        # not published : given back to the same process only
+        self.assertEqual([d for _, d in second.take()], data[2:])
+        # unless the first one left them long enough
+        second = self.outbox('second', outbox_claim_after=0)
+        self.assertEqual([d for _, d in second.take()], data)
+
+    def test_dead_letters(self):
+        self.store.push(1, [{'title': 'foo'}, {'title': 'bar'}])
+        outbox = self.outbox('first', outbox_max_tries=2)
+        entries = outbox.take(1)
+        self.assertEqual(outbox.take(1), entries)
+        # tried twice : the next data are published
+        self.assertEqual([d for _, d in outbox.take(1)], [{'title': 'bar'}])
+        self.assertEqual(outbox.dead(), [{'title': 'foo'}])
+        self.assertEqual(self.store.pending(1), 1)
+        # kept for blobs.sweep
+        self.assertIn([{'title': 'foo'}], list(self.store.stored()))
+
+
+class MemoryStackStoreTestCase(StackStoreMixin, TestCase):
+
+    store = MemoryStackStore()
+
+    def test_max_tries(self):
+        self.store.push(1, [{'title': 'foo'}, {'title': 'bar'}])
+        with self.settings(DJANGO_TH=dict(settings.DJANGO_TH,
+                                          outbox_max_tries=2)):
+            entries = self.store.take(1, 1)
+            self.assertEqual(self.store.take(1, 1), entries)
+            self.assertEqual([d for _, d in self.store.take(1, 1)],
+                             [{'title': 'bar'}])
+
+    def test_settings(self):
+        with self.settings(DJANGO_TH=dict(
+                settings.DJANGO_TH,
+                stack_store='django_th.stack_store.MemoryStackStore')), \
+                patch('django_th.stack_store._single_process', True):
+            self.assertIsInstance(stack_store(), MemoryStackStore)
+            # one per process
+            self.assertIs(stack_store(), stack_store())
+        self.assertIsInstance(stack_store(), RedisStackStore)
+
+    def test_settings_shared(self):
+        with self.settings(DJANGO_TH=dict(
+                settings.DJANGO_TH,
+                stack_store='django_th.stack_store.MemoryStackStore')), \
+                patch('django_th.stack_store._single_process', False):
+            # read, publish, ... do not see the data of the others
+            with self.assertRaises(ImproperlyConfigured):
+                stack_store()
+            self.assertIsNone(shared_stack_store())
+
+
+class TriggerDeletedTestCase(MainTest):
+
+    def test_outbox_dropped(self):
+        trigger = self.create_triggerservice()
+        stack_store().push(trigger.id, [{'title': 'foo'}])
+        self.addCleanup(stack_store().clear, trigger.id)
+        trigger.delete()
+        self.assertEqual(stack_store().pending(trigger.id), 0)
+
+    def test_memory(self):
+        trigger = self.create_triggerservice()
+        with self.settings(DJANGO_TH=dict(
+                settings.DJANGO_TH,
+                stack_store='django_th.stack_store.MemoryStackStore')), \
+                patch('django_th.stack_store._single_process', False):
+            # eg from the web pages : the data are in th_worker
+            trigger.delete()
+        self.assertFalse(TriggerService.objects.filter(id=trigger.id))
@@ -0,0 +1,45 @@
+# coding: utf-8
+import datetime
+import time
+
+import arrow
+import pytz
+from django.test import TestCase
+
+from django_th.timestamps import to_epoch, entry_epoch, newer
+
+STAMP = 1508493600  # 2017-10-20 10:00:00 UTC
+
+
+class TimestampsTestCase(TestCase):
+
+    def test_to_epoch(self):
+        paris = pytz.timezone('Europe/Paris')
+        for value in (STAMP, float(STAMP), time.gmtime(STAMP),
+                      arrow.get(STAMP),
+                      datetime.datetime(2017, 10, 20, 10, 0),
+                      paris.localize(datetime.datetime(2017, 10, 20, 12, 0)),
+                      '2017-10-20T10:00:00Z',
+                      '2017-10-20 12:00:00+02:00',
+                      '2017-10-20T10:00:00.123456+0000',
+                      'Fri, 20 Oct 2017 10:00:00 GMT',
+                      'Fri Oct 20 10:00:00 +0000 2017',
+                      'Fri 20 Oct 2017 12:00:00 +0200'):
+            self.assertEqual(to_epoch(value), STAMP, value)
+        self.assertIsNone(to_epoch(None))
+        self.assertIsNone(to_epoch(''))
+
+    def test_entry_epoch(self):
+        self.assertEqual(entry_epoch({'updated_parsed': time.gmtime(STAMP)}),
+                         STAMP)
+        self.assertEqual(entry_epoch({'my_date': arrow.get(STAMP)}), STAMP)
+        self.assertIsNone(entry_epoch({'title': 'no date'}))
+
+    def test_newer(self):
+        items = [{'published_parsed': time.gmtime(STAMP + delta)}
+                 for delta in (-60, 0, 60, 120)]
+        undated = {'title': 'no date'}
+        kept = newer(items + [undated], STAMP, until=STAMP + 60)
+        # the items without date are published now
+        self.assertEqual(kept, items[1:3] + [undated])
+        self.assertEqual(newer(items, None), [])
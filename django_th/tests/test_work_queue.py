@@ -0,0 +1,88 @@
+# coding: utf-8
+import time
+
+from django_th.models import TriggerService
+from django_th.scheduler import due_triggers
+from django_th.tests.test_main import MainTest
+from django_th.work_queue import WorkQueue, run_distributed
+
+
+class WorkQueueTestCase(MainTest):
+
+    def setUp(self):
+        super(WorkQueueTestCase, self).setUp()
+        self.queue = WorkQueue(name='django_th_test_queue', lease=60)
+        self.clear()
+
+    def tearDown(self):
+        self.clear()
+
+    def clear(self):
+        self.queue.redis.delete(self.queue.queued_key,
+                                self.queue.pending_key,
+                                self.queue.leases_key)
+
+    def test_enqueue_once(self):
+        self.assertEqual(self.queue.enqueue([1, 2, 3]), 3)
+        # an overlapping run does not add them again
+        self.assertEqual(self.queue.enqueue([2, 3, 4]), 1)
+        self.assertEqual(self.queue.pending(), 4)
+
+    def test_claim_ack(self):
+        self.queue.enqueue([1, 2, 3])
+        self.assertEqual(self.queue.claim(2), [1, 2])
+        self.assertEqual(self.queue.claim(2), [3])
+        self.assertEqual(self.queue.claim(2), [])
+        # leased : not enqueued again
+        self.assertEqual(self.queue.enqueue([1]), 0)
+        self.queue.ack([1, 2, 3])
+        self.assertEqual(self.queue.enqueue([1]), 1)
+
+    def test_reclaim(self):
+        self.queue.enqueue([1, 2])
+        self.queue.lease = -1
+        self.assertEqual(self.queue.claim(2), [1, 2])
+        # the node died : its leases expired
+        self.assertEqual(self.queue.reclaim(), 2)
+        self.queue.lease = 60
+        self.assertEqual(sorted(self.queue.claim(2)), [1, 2])
+        self.assertEqual(self.queue.reclaim(), 0)
+
+    def test_run_distributed(self):
+        t = self.create_triggerservice()
+        handled = []
+        count = run_distributed(handled.extend, due_triggers(),
+                                batch_size=10, queue=self.queue)
+        self.assertEqual(count, 1)
+        self.assertEqual(handled, [t])
+        self.assertEqual(self.queue.pending(), 0)
+        # nothing left in the queue for another node
+        TriggerService.objects.filter(id=t.id).update(status=False)
+        self.assertEqual(run_distributed(handled.extend, due_triggers(),
+                                         queue=self.queue), 0)
+
+    def test_renew(self):
+        self.queue.enqueue([1, 2])
+        self.queue.lease = -1
+        self.assertEqual(self.queue.claim(2), [1, 2])
+        self.queue.lease = 60
+        self.assertEqual(self.queue.renew([1]), 1)
+        # only the lease of 2 expired
+        self.assertEqual(self.queue.reclaim(), 1)
+        # reclaimed : not leased again by a late renewal
+        self.assertEqual(self.queue.renew([2]), 0)
+        self.assertEqual(self.queue.claim(2), [2])
+
+    def test_run_distributed_heartbeat(self):
+        self.create_triggerservice()
+        self.queue.lease = 0.3
+        other = WorkQueue(name='django_th_test_queue', lease=60)
+        reclaimed = []
+
+        def slow(triggers):
+            # longer than the lease : still renewed
+            time.sleep(0.6)
+            reclaimed.append(other.reclaim())
+        self.assertEqual(run_distributed(slow, due_triggers(),
+                                         queue=self.queue), 1)
+        self.assertEqual(reclaimed, [0])
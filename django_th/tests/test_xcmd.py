@@ -1,4 +1,6 @@
 # coding: utf-8
+import signal
+
 from django.core import management
 
 
@@ -11,3 +13,27 @@ class TestCmdMgt(TestCase):
         management.call_command('recycle', verbosity=0, interactive=False)
         management.call_command('read', verbosity=0, interactive=False)
         management.call_command('publish', verbosity=0, interactive=False)
+
+    def test_run_async(self):
+        management.call_command('read', engine='async', concurrency=2,
+                                verbosity=0, interactive=False)
+        management.call_command('publish', engine='async', concurrency=2,
+                                verbosity=0, interactive=False)
+
+    def test_run_distributed(self):
+        management.call_command('read', engine='async', distributed=True,
+                                verbosity=0, interactive=False)
+        management.call_command('publish', engine='async', distributed=True,
+                                verbosity=0, interactive=False)
+
+    def test_worker(self):
+        management.call_command('th_worker', once=True,
+                                verbosity=0, interactive=False)
+
+    def test_worker_stop(self):
+        from django_th.management.commands.th_worker import Command
+        worker = Command()
+        worker.stop(signal.SIGTERM, None)
+        self.assertTrue(worker.stopping.is_set())
+        # stopped before the first run
+        worker.handle(interval=1)
@@ -14,16 +14,74 @@ DJANGO_TH = {
 
     # this permits to avoid "flood" effect when publishing
     # to the target service - when limit is reached
-    # the cache is kept until next time
+    # the data left wait in the outbox of the trigger until next time
     # set it to 0 to drop that limit
     'publishing_limit': env.int('DJANGO_TH_PUBLISHING_LIMIT', 2),
     # number of process to spawn from multiprocessing.Pool
     'processes': env.int('DJANGO_TH_PROCESSES', 1),
+    # engine used by the read and publish commands :
+    # 'pool' spawns 'processes' processes, one trigger at a time each
+    # 'async' runs 'concurrency' triggers at a time in one process
+    'engine': env.str('DJANGO_TH_ENGINE', 'pool'),
+    'concurrency': env.int('DJANGO_TH_CONCURRENCY', 50),
+    # seconds allowed to each trigger before it is stopped
+    'trigger_timeout': env.int('DJANGO_TH_TRIGGER_TIMEOUT', 60),
+    # number of trigger ids sent at once to each process of the pool
+    'chunksize': env.int('DJANGO_TH_CHUNKSIZE', 10),
+    # run_pipeline : number of triggers waiting to be published
+    # and number of threads publishing them
+    'pipeline_queue_size': env.int('DJANGO_TH_PIPELINE_QUEUE_SIZE', 100),
+    'pipeline_consumers': env.int('DJANGO_TH_PIPELINE_CONSUMERS', 4),
+    # th_worker : seconds to wait between two runs
+    'worker_interval': env.int('DJANGO_TH_WORKER_INTERVAL', 60),
+    # share the triggers between several nodes through redis : each node
+    # claims batch_size triggers for lease seconds at a time ; on a single
+    # node, a run keeps the triggers it took for lease seconds
+    'distributed': env.bool('DJANGO_TH_DISTRIBUTED', False),
+    'batch_size': env.int('DJANGO_TH_BATCH_SIZE', 50),
+    'lease': env.int('DJANGO_TH_LEASE', 300),
+    # seconds a parsed RSS feed is shared between the triggers reading it
+    'feed_ttl': env.int('DJANGO_TH_FEED_TTL', 120),
+    # seconds allowed to download a RSS feed, and its size at most
+    'feed_timeout': env.int('DJANGO_TH_FEED_TIMEOUT', 30),
+    'feed_max_bytes': env.int('DJANGO_TH_FEED_MAX_BYTES', 5242880),
+    # read the RSS feeds while they are downloaded, until the entries
+    # already read, and at most feed_max_entries
+    'feed_streaming': env.bool('DJANGO_TH_FEED_STREAMING', False),
+    'feed_max_entries': env.int('DJANGO_TH_FEED_MAX_ENTRIES', 500),
+    # entries published by a trigger kept in the feed it generates
+    'feed_output_length': env.int('DJANGO_TH_FEED_OUTPUT_LENGTH', 100),
+    # items published by each trigger that are not read again, 0 to
+    # read them as long as their date is newer than the last run
+    'seen_capacity': env.int('DJANGO_TH_SEEN_CAPACITY', 1000),
     'services_wo_cache': ['th_instapush', ],
+    # where the data wait to be published : django_th.stack_store.
+    # RedisStackStore, or MemoryStackStore for th_worker on a single node
+    # (redis is still required, for the rest)
+    'stack_store': env.str('DJANGO_TH_STACK_STORE',
+                           'django_th.stack_store.RedisStackStore'),
+    # seconds before another process publishes the data a process failed
+    # to publish, and number of tries before they move to the dead letters
+    'outbox_claim_after': env.int('DJANGO_TH_OUTBOX_CLAIM_AFTER', 600),
+    'outbox_max_tries': env.int('DJANGO_TH_OUTBOX_MAX_TRIES', 5),
+    # seconds the configuration rows of the triggers are kept in the
+    # memory of each process, 0 to read them from the database each time
+    'row_cache_ttl': env.int('DJANGO_TH_ROW_CACHE_TTL', 300),
+    'row_cache_size': env.int('DJANGO_TH_ROW_CACHE_SIZE', 1024),
+    # the texts of the data longer than blob_min_size bytes, eg the content
+    # of the articles, are stored once in blob_location instead of redis,
+    # 0 to keep them in redis ; every node has to share blob_location
+    'blob_min_size': env.int('DJANGO_TH_BLOB_MIN_SIZE', 0),
+    'blob_location': env.str('DJANGO_TH_BLOB_LOCATION',
+                             str((ROOT_DIR - 1).path('blobs'))),
     # number of tries before disabling a trigger
     # when management commands run each 15min
     # with 4 'tries' this permit to try on 1 hour
     'failed_tries': env.int('DJANGO_TH_FAILED_TRIES', 2),  # can exceed 99 - when
+    # seconds to wait after the first failure of a provider, doubled at
+    # each new failure until backoff_max
+    'backoff_base': env.int('DJANGO_TH_BACKOFF_BASE', 60),
+    'backoff_max': env.int('DJANGO_TH_BACKOFF_MAX', 86400),
     # if you want to authorize the fire button for EACH trigger
     'fire': env.bool('DJANGO_TH_FIRE', True),
     # if you want to allow the digest feature
@@ -0,0 +1,108 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import calendar
+import datetime
+import re
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+import arrow
+
+# the dates of the providers are compared as UTC timestamps instead of
+# building arrow objects for each item
+
+# dates already parsed by feedparser, as UTC 9-tuples
+PARSED_KEYS = ('published_parsed', 'created_parsed', 'updated_parsed')
+
+ISO_8601 = re.compile(r'(\d{4})-(\d\d)-(\d\d)(?:[T ](\d\d):(\d\d)(?::(\d\d))?'
+                      r'(?:\.\d+)?)?\s*(Z|[+-]\d\d:?\d\d)?$')
+
+
+def _iso_8601(value):
+    """
+        the dates of the APIs and the one of the triggers, eg
+        2017-10-20T10:00:00Z or 2017-10-20 12:00:00+02:00
+        :return: timestamp or None if it is not such a date
+    """
+    match = ISO_8601.match(value)
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, zone = match.groups()
+    stamp = calendar.timegm((int(year), int(month), int(day),
+                             int(hour or 0), int(minute or 0),
+                             int(second or 0), 0, 0, 0))
+    if zone and zone != 'Z':
+        offset = int(zone[1:3]) * 3600 + int(zone[-2:]) * 60
+        stamp -= offset if zone[0] == '+' else -offset
+    return stamp
+
+
+def to_epoch(value):
+    """
+        convert a date given by a provider or a trigger to a timestamp
+        :param value: timestamp, 9-tuple in UTC, datetime (UTC when
+                      naive), arrow, or string (ISO 8601, RFC 2822 as
+                      used by the feeds, Twitter or Todoist, ...)
+        :return: UTC timestamp or None
+        :rtype: int
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, arrow.Arrow):
+        return value.timestamp
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            return calendar.timegm(value.timetuple())
+        return int(value.timestamp())
+    if isinstance(value, (time.struct_time, tuple)):
+        return calendar.timegm(value)
+    value = str(value).strip()
+    stamp = _iso_8601(value)
+    if stamp is not None:
+        return stamp
+    parsed = parsedate_tz(value)
+    if parsed is not None:
+        return mktime_tz(parsed)
+    # the slow path, for the other formats
+    return arrow.get(value).timestamp
+
+
+def entry_epoch(entry):
+    """
+        the date of an item read from a provider
+        :param entry: feedparser entry or dict
+        :return: UTC timestamp or None if the item has no date
+    """
+    for key in PARSED_KEYS:
+        value = entry.get(key)
+        if value:
+            return calendar.timegm(value)
+    return to_epoch(entry.get('my_date'))
+
+
+def newer(items, since, until=None, key=entry_epoch):
+    """
+        keep the items published between two dates, the items without
+        date are considered as published now
+        :param items: the items read from a provider
+        :param since: date of the last run of the trigger
+        :param until: now by default
+        :param key: function giving the timestamp of an item
+        :rtype: list
+    """
+    since = to_epoch(since)
+    until = int(time.time()) if until is None else to_epoch(until)
+    if since is None:
+        return []
+    kept = []
+    for item in items:
+        stamp = key(item)
+        if stamp is None:
+            stamp = until
+        if since <= stamp <= until:
+            kept.append(item)
+    return kept
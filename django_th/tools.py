@@ -2,11 +2,12 @@
 import arrow
 import importlib
 import datetime
-import time
 
 from django.conf import settings
 from django.core.mail import send_mail, mail_admins
 
+from django_th.timestamps import PARSED_KEYS, entry_epoch
+
 
 """
     Simple utility functions
@@ -72,15 +73,8 @@ def to_datetime(data):
     """
     my_date_time = None
 
-    if 'published_parsed' in data:
-        my_date_time = datetime.datetime.utcfromtimestamp(
-            time.mktime(data.get('published_parsed')))
-    elif 'created_parsed' in data:
-        my_date_time = datetime.datetime.utcfromtimestamp(
-            time.mktime(data.get('created_parsed')))
-    elif 'updated_parsed' in data:
-        my_date_time = datetime.datetime.utcfromtimestamp(
-            time.mktime(data.get('updated_parsed')))
+    if any(data.get(key) for key in PARSED_KEYS):
+        my_date_time = datetime.datetime.utcfromtimestamp(entry_epoch(data))
     elif 'my_date' in data:
         my_date_time = arrow.get(data['my_date'])
 
@@ -19,6 +19,7 @@ except ImportError:  # Django 1.9 and earlier
 # django_th
 from django_th.tools import get_service
 from django_th.models import TriggerService, ServicesActivated
+from django_th.rows import invalidate
 
 cache = caches['django_th']
 
@@ -138,6 +139,7 @@ def service_related_triggers_switch_to(request, user_service_id, switch):
         status=status)
     TriggerService.objects.filter(consumer__id=user_service_id).update(
         status=status)
+    invalidate(TriggerService)
 
     return HttpResponseRedirect(reverse('user_services'))
 
@@ -159,6 +161,7 @@ def trigger_switch_all_to(request, switch):
             status=status, date_triggered=now)
     else:
         TriggerService.objects.filter(user=request.user).update(status=status)
+    invalidate(TriggerService)
 
     return HttpResponseRedirect(reverse('base'))
 
@@ -0,0 +1,190 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+import threading
+import time
+
+# django
+from django.conf import settings
+from django_redis import get_redis_connection
+from logging import getLogger
+
+logger = getLogger('django_th.trigger_happy')
+
+# add the ids that are neither pending nor leased
+ENQUEUE = """
+local count = 0
+for _, id in ipairs(ARGV) do
+    if redis.call('SADD', KEYS[1], id) == 1 then
+        redis.call('RPUSH', KEYS[2], id)
+        count = count + 1
+    end
+end
+return count
+"""
+
+# pop at most ARGV[1] ids and lease them until ARGV[2]
+CLAIM = """
+local ids = {}
+for i = 1, tonumber(ARGV[1]) do
+    local id = redis.call('LPOP', KEYS[1])
+    if not id then
+        break
+    end
+    redis.call('ZADD', KEYS[2], ARGV[2], id)
+    ids[#ids + 1] = id
+end
+return ids
+"""
+
+# put back in the queue the ids whose lease expired before ARGV[1]
+RECLAIM = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('RPUSH', KEYS[2], id)
+end
+return #ids
+"""
+
+# forget the ids that have been handled
+ACK = """
+for _, id in ipairs(ARGV) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('SREM', KEYS[2], id)
+end
+return #ARGV
+"""
+
+
+class WorkQueue(object):
+    """
+        queue of trigger ids shared by all the nodes through redis
+
+        an id is enqueued once until it is acknowledged, a node claims
+        the ids for `lease` seconds and renews them while it handles them,
+        and the ids of a node that died are given back to the others when
+        their lease expires
+    """
+
+    def __init__(self, name='django_th_queue', lease=None, connection=None):
+        """
+            :param name: prefix of the redis keys
+            :param lease: seconds a node has to handle the claimed ids
+            :param connection: redis connection, the one of the
+                               django_th cache by default
+        """
+        self.redis = connection or get_redis_connection('django_th')
+        self.lease = lease or settings.DJANGO_TH.get('lease', 300)
+        self.queued_key = name + ':queued'
+        self.pending_key = name + ':pending'
+        self.leases_key = name + ':leases'
+        self._enqueue = self.redis.register_script(ENQUEUE)
+        self._claim = self.redis.register_script(CLAIM)
+        self._reclaim = self.redis.register_script(RECLAIM)
+        self._ack = self.redis.register_script(ACK)
+
+    def enqueue(self, ids):
+        """
+            :param ids: ids of the triggers to handle
+            :return: number of ids really added
+        """
+        ids = list(ids)
+        if not ids:
+            return 0
+        return self._enqueue(keys=[self.queued_key, self.pending_key],
+                             args=ids)
+
+    def claim(self, count=1):
+        """
+            :param count: maximum number of ids to take
+            :return: ids of the triggers to handle now
+        """
+        expire = time.time() + self.lease
+        return [int(i) for i in self._claim(
+            keys=[self.pending_key, self.leases_key], args=[count, expire])]
+
+    def reclaim(self):
+        """
+            :return: number of expired leases put back in the queue
+        """
+        count = self._reclaim(keys=[self.leases_key, self.pending_key],
+                              args=[time.time()])
+        if count:
+            logger.warning("{} triggers reclaimed".format(count))
+        return count
+
+    def renew(self, ids):
+        """
+            extend the lease of the ids still leased, for `lease` seconds
+            :param ids: ids of the triggers being handled
+            :return: number of leases renewed
+        """
+        expire = time.time() + self.lease
+        # the ids reclaimed meanwhile are not leased again
+        return self.redis.zadd(self.leases_key,
+                               {i: expire for i in ids}, xx=True, ch=True)
+
+    def ack(self, ids):
+        """
+            :param ids: ids of the triggers that have been handled
+        """
+        ids = list(ids)
+        if ids:
+            self._ack(keys=[self.leases_key, self.queued_key], args=ids)
+
+    def pending(self):
+        """
+            :return: number of ids waiting to be claimed
+        """
+        return self.redis.llen(self.pending_key)
+
+
+def _renewing(queue, ids, stop):
+    """
+        renew the leases of a batch three times per lease until stop is set
+    """
+    while not stop.wait(queue.lease / 3):
+        try:
+            queue.renew(ids)
+        except Exception as e:
+            logger.warning("leases not renewed - {}".format(e))
+
+
+def run_distributed(handle, triggers, batch_size=None, queue=None):
+    """
+        enqueue the triggers then handle them, batch by batch, with the
+        other nodes until the queue is empty ; the leases of the batch
+        are renewed while it is handled, a slow batch is not given to
+        another node
+        :param handle: function receiving a list of TriggerService
+        :param triggers: queryset of the triggers to handle
+        :param batch_size: number of triggers claimed at once
+        :param queue: WorkQueue
+        :return: number of triggers handled by this node
+    """
+    if batch_size is None:
+        batch_size = settings.DJANGO_TH.get('batch_size', 50)
+    queue = queue or WorkQueue()
+    queue.reclaim()
+    queue.enqueue(triggers.values_list('id', flat=True).iterator())
+    handled = 0
+    while True:
+        ids = queue.claim(batch_size)
+        if not ids:
+            break
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_renewing,
+                                     args=(queue, ids, stop), daemon=True)
+        heartbeat.start()
+        try:
+            # still to handle since it has been enqueued ?
+            handle(list(triggers.filter(id__in=ids)))
+        finally:
+            stop.set()
+            heartbeat.join()
+            # the triggers have been read even if some of them failed
+            queue.ack(ids)
+        handled += len(ids)
+    return handled
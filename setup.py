@@ -8,6 +8,8 @@ install_requires = [
     'arrow==0.10.0',
     'django-js-reverse==0.7.3',
     'django-redis==4.7.0',
+    'msgpack==1.0.2',
+    'zstandard==0.15.2',
     'requests-oauthlib==0.8.0',
     'pypandoc==1.3.3',
     'flake8==3.3.0',
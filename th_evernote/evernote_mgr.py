@@ -6,12 +6,10 @@ from evernote.edam.notestore import NoteStore
 
 from django.utils.translation import ugettext as _
 from logging import getLogger
-from django.core.cache import caches
 
 from django_th.models import update_result
 
 logger = getLogger('django_th.trigger_happy')
-cache = caches['django_th']
 
 
 class EvernoteMgr(object):
@@ -123,11 +121,10 @@ class EvernoteMgr(object):
                            "Retry your request in {msg} seconds".format(
                             code=e.errorCode, msg=e.rateLimitDuration)
                 logger.warn(sentence)
-                # put again in cache the data that could not be
-                # published in Evernote yet
-                cache.set('th_evernote_' + str(trigger_id), data, version=2)
+                # not published : the data stay in the outbox, published
+                # again at the next run
                 update_result(trigger_id, msg=sentence, status=True)
-                return True
+                return False
             else:
                 logger.critical(e)
                 return False
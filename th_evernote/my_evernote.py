@@ -11,10 +11,10 @@ from evernote.edam.error.ttypes import EDAMErrorCode
 # django classes
 from django.conf import settings
 from logging import getLogger
-from django.core.cache import caches
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 from django_th.models import UserService, ServicesActivated, update_result
 from th_evernote.models import Evernote
 from th_evernote.evernote_mgr import EvernoteMgr
@@ -40,8 +40,6 @@ from th_evernote.sanitize import sanitize
 
 logger = getLogger('django_th.trigger_happy')
 
-cache = caches['django_th']
-
 
 class ServiceEvernote(ServicesMgr):
     """
@@ -80,7 +78,6 @@ class ServiceEvernote(ServicesMgr):
             :rtype: list
         """
         date_triggered = kwargs.get('date_triggered')
-        trigger_id = kwargs.get('trigger_id')
 
         kwargs['model_name'] = 'Evernote'
         kwargs['app_label'] = 'th_evernote'
@@ -90,9 +87,6 @@ class ServiceEvernote(ServicesMgr):
         filter_string = self.set_evernote_filter(date_triggered, trigger)
         evernote_filter = self.set_note_filter(filter_string)
         data = self.get_evernote_notes(evernote_filter)
-        if len(data):
-            cache.set('th_evernote_' + str(trigger_id), data)
-
         return data
 
     def set_evernote_filter(self, date_triggered, trigger):
@@ -155,7 +149,7 @@ class ServiceEvernote(ServicesMgr):
                                                                 **data)
 
         # get the evernote data of this trigger
-        trigger = Evernote.objects.get(trigger_id=trigger_id)
+        trigger = get_row(Evernote, trigger_id=trigger_id)
         # initialize notestore process
         note_store = self._notestore(trigger_id, data)
         if isinstance(note_store, evernote.api.client.Store):
@@ -185,15 +179,14 @@ class ServiceEvernote(ServicesMgr):
             if e.errorCode == EDAMErrorCode.RATE_LIMIT_REACHED:
                 sentence = "Rate limit reached {code}\n" \
                             "Retry your request in {msg} seconds\n" \
-                            "Data set to cache again until" \
-                            " limit reached".format(code=e.errorCode,
-                                                    msg=e.rateLimitDuration)
+                            "Data kept in the outbox until " \
+                            "then".format(code=e.errorCode,
+                                          msg=e.rateLimitDuration)
                 logger.warning(sentence)
-                cache.set('th_evernote_' + str(trigger_id),
-                          data,
-                          version=2)
+                # not published : the data stay in the outbox, published
+                # again at the next run
                 update_result(trigger_id, msg=sentence, status=True)
-                return True
+                return False
             else:
                 logger.critical(e)
                 update_result(trigger_id, msg=e, status=False)
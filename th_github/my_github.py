@@ -5,11 +5,11 @@ from github3 import GitHub
 # django classes
 from django.conf import settings
 from logging import getLogger
-from django.core.cache import caches
 from django.utils.translation import ugettext as _
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 from django_th.models import update_result
 from th_github.models import Github
 
@@ -35,13 +35,13 @@ from th_github.models import Github
 
 logger = getLogger('django_th.trigger_happy')
 
-cache = caches['django_th']
-
 
 class ServiceGithub(ServicesMgr):
     """
         Service Github
     """
+    rate_limit_host = 'api.github.com'
+
     def __init__(self, token=None, **kwargs):
         super(ServiceGithub, self).__init__(token, **kwargs)
         self.scope = ['public_repo']
@@ -60,6 +60,10 @@ class ServiceGithub(ServicesMgr):
             self.gh = GitHub(token=token_key)
         else:
             self.gh = GitHub(username=self.username, password=self.password)
+        self.timed(self.gh.session)
+        # learn the remaining budget from each response of the API
+        self.limiter = self.rate_limiter(self.token)
+        self.gh.session.hooks['response'].append(self.limiter.learn_response)
 
     def gh_footer(self, trigger, issue):
 
@@ -84,33 +88,24 @@ class ServiceGithub(ServicesMgr):
         date_triggered = str(kwargs.get('date_triggered')).replace(' ', 'T')
         data = list()
         if self.token:
-            # check if it remains more than 1 access
-            # then we can create an issue
-            if self.gh.ratelimit_remaining > 1:
-
-                import pypandoc
+            # the rate limit has been checked before reading the trigger
+            import pypandoc
 
-                trigger = Github.objects.get(trigger_id=trigger_id)
-                issues = self.gh.issues_on(trigger.repo,
-                                           trigger.project,
-                                           since=date_triggered)
+            trigger = Github.objects.get(trigger_id=trigger_id)
+            issues = self.gh.issues_on(trigger.repo,
+                                       trigger.project,
+                                       since=date_triggered)
 
-                for issue in issues:
+            for issue in issues:
 
-                    content = pypandoc.convert(issue.body, 'md', format='html')
-                    content += self.gh_footer(trigger, issue)
+                content = pypandoc.convert(issue.body, 'md', format='html')
+                content += self.gh_footer(trigger, issue)
 
-                    data.append({'title': issue.title, 'content': content})
-                    # digester
-                    self.send_digest_event(trigger_id,
-                                           issue.title,
-                                           '')
-                cache.set('th_github_' + str(trigger_id), data)
-            else:
-                # rate limit reach, do nothing right now
-                logger.warn("Rate limit reached")
-                update_result(trigger_id, msg="Rate limit reached",
-                              status=True)
+                data.append({'title': issue.title, 'content': content})
+                # digester
+                self.send_digest_event(trigger_id,
+                                       issue.title,
+                                       '')
         else:
             logger.critical("no token provided")
             update_result(trigger_id, msg="No token provided", status=True)
@@ -130,12 +125,11 @@ class ServiceGithub(ServicesMgr):
             title = self.set_title(data)
             body = self.set_content(data)
             # get the details of this trigger
-            trigger = Github.objects.get(trigger_id=trigger_id)
+            trigger = get_row(Github, trigger_id=trigger_id)
 
             # check if it remains more than 1 access
             # then we can create an issue
-            limit = self.gh.ratelimit_remaining
-            if limit > 1:
+            if self.limiter.acquire():
                 # repo goes to "owner"
                 # project goes to "repository"
                 r = self.gh.create_issue(trigger.repo,
@@ -147,10 +141,9 @@ class ServiceGithub(ServicesMgr):
                 logger.warn("Rate limit reached")
                 update_result(trigger_id, msg="Rate limit reached",
                               status=True)
-                # put again in cache the data that could not be
-                # published in Github yet
-                cache.set('th_github_' + str(trigger_id), data, version=2)
-                return True
+                # not published : the data stay in the outbox, published
+                # again at the next run
+                return False
             sentence = str('github {} created').format(r)
             logger.debug(sentence)
             status = True
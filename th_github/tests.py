@@ -8,6 +8,7 @@ from django.core.cache import caches
 from th_github.models import Github
 from th_github.forms import GithubProviderForm, GithubConsumerForm
 from th_github.my_github import ServiceGithub
+from django_th.stack_store import stack_store
 from django_th.tests.test_main import MainTest
 
 cache = caches['django_th']
@@ -119,12 +120,12 @@ class ServiceGithubTest(GithubTest):
 
         with patch('github3.GitHub.ratelimit_remaining',
                    new_callable=PropertyMock) as mock_read_data:
-            mock_read_data.return_value = 2
             with patch.object(GitHub, 'issues_on') as mock_read_data2:
                 se = ServiceGithub(self.token)
                 se.read_data(**kwargs)
                 mock_read_data2.assert_called_once()
-        mock_read_data.assert_called_once()
+        # the budget comes from the headers, not from an extra request
+        mock_read_data.assert_not_called()
 
     def test_save_data(self):
         g = self.create_github()
@@ -141,7 +142,6 @@ class ServiceGithubTest(GithubTest):
 
         with patch('github3.GitHub.ratelimit_remaining',
                    new_callable=PropertyMock) as mock_save_data:
-            mock_save_data.return_value = 2
             with patch.object(GitHub, 'create_issue') as mock_save_data2:
                 se = ServiceGithub(self.token)
                 se.save_data(self.trigger_id, **self.data)
@@ -149,4 +149,16 @@ class ServiceGithubTest(GithubTest):
                                                     g.project,
                                                     self.data['title'],
                                                     self.data['content'])
-        mock_save_data.assert_called_once_with()
+        mock_save_data.assert_not_called()
+
+    def test_save_data_rate_limit(self):
+        self.create_github()
+        se = ServiceGithub(self.token)
+        se.limiter.block(3600)
+        with patch.object(GitHub, 'create_issue') as mock_save_data:
+            # not published : kept in the outbox, not put aside
+            self.assertFalse(se.save_data(self.trigger_id, **self.data))
+        mock_save_data.assert_not_called()
+        self.assertNotIn('th_github_{}'.format(self.trigger_id),
+                         list(stack_store().aside()))
+        cache.delete(se.limiter.key)
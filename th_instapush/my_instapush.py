@@ -6,6 +6,7 @@ from logging import getLogger
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 from th_instapush.models import Instapush as InstapushModel
 
 """
@@ -58,7 +59,7 @@ class ServiceInstapush(ServicesMgr):
         """
         title, content = super(ServiceInstapush, self).save_data(trigger_id,
                                                                  **data)
-        instance = InstapushModel.objects.get(trigger_id=trigger_id)
+        instance = get_row(InstapushModel, trigger_id=trigger_id)
         Instapush(user_token=self.token)
         app = App(appid=instance.app_id, secret=instance.app_secret)
         trackers = {instance.tracker_name: content}
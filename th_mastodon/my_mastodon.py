@@ -1,26 +1,25 @@
 # coding: utf-8
 import arrow
+import time
 from logging import getLogger
 
 from mastodon import Mastodon as MastodonAPI
 
 # django classes
-from django.conf import settings
-from django.core.cache import caches
 from django.shortcuts import reverse
 from django.utils import html
 from django.utils.translation import ugettext as _
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
+from django_th.timestamps import to_epoch
 from django_th.models import update_result, UserService
 from th_mastodon.models import Mastodon
 
 
 logger = getLogger('django_th.trigger_happy')
 
-cache = caches['django_th']
-
 
 class ServiceMastodon(ServicesMgr):
     """
@@ -41,12 +40,12 @@ class ServiceMastodon(ServicesMgr):
             :type kwargs: dict
             :rtype: list
         """
-        now = arrow.utcnow().to(settings.TIME_ZONE)
+        now = int(time.time())
         my_toots = []
         search = {}
         since_id = None
         trigger_id = kwargs['trigger_id']
-        date_triggered = arrow.get(kwargs['date_triggered'])
+        date_triggered = to_epoch(kwargs['date_triggered'])
 
         def _get_toots(toot_api, toot_obj, search):
             """
@@ -102,9 +101,8 @@ class ServiceMastodon(ServicesMgr):
                   'trigger_id': trigger_id}
             toot_obj = super(ServiceMastodon, self).read_data(**kw)
 
-            us = UserService.objects.get(user=self.user,
-                                         token=self.token,
-                                         name='ServiceMastodon')
+            us = get_row(UserService, user=self.user, token=self.token,
+                         name='ServiceMastodon')
             try:
                 toot_api = MastodonAPI(
                     client_id=us.client_id,
@@ -154,19 +152,17 @@ class ServiceMastodon(ServicesMgr):
                                 self.api_base_url, s['id'])
                             title = _('Toot from @{}'.format(toot_name))
                         # Wed Aug 29 17:12:58 +0000 2012
-                        my_date = arrow.get(s['created_at'],
-                                            'ddd MMM DD HH:mm:ss Z YYYY')
-                        published = arrow.get(my_date).to(settings.TIME_ZONE)
+                        published = to_epoch(s['created_at'])
                         if date_triggered is not None and \
                            published is not None and \
                            now >= published >= date_triggered:
                             my_toots.append({'title': title,
                                              'content': s['content'],
                                              'link': url,
-                                             'my_date': my_date})
+                                             'my_date': arrow.get(published)})
                             # digester
                             self.send_digest_event(trigger_id, title, url)
-                    cache.set('th_mastodon_' + str(trigger_id), my_toots)
+                    my_toots = self.unseen(trigger_id, my_toots)
                     Mastodon.objects.filter(trigger_id=trigger_id).update(
                         since_id=since_id,
                         max_id=max_id,
@@ -193,9 +189,8 @@ class ServiceMastodon(ServicesMgr):
 
         content = self.set_mastodon_content(content)
 
-        us = UserService.objects.get(user=self.user,
-                                     token=self.token,
-                                     name='ServiceMastodon')
+        us = get_row(UserService, user=self.user, token=self.token,
+                     name='ServiceMastodon')
 
         try:
             toot_api = MastodonAPI(
@@ -226,7 +221,7 @@ class ServiceMastodon(ServicesMgr):
         """
 
         # get the Mastodon data of this trigger
-        trigger = Mastodon.objects.get(trigger_id=trigger_id)
+        trigger = get_row(Mastodon, trigger_id=trigger_id)
 
         tags = ''
 
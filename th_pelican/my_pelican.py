@@ -9,6 +9,7 @@ from logging import getLogger
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 from django_th.tools import to_datetime
 
 """
@@ -216,7 +217,7 @@ class ServicePelican(ServicesMgr):
         title, content = super(ServicePelican, self).save_data(
             trigger_id, **data)
 
-        trigger = Pelican.objects.get(trigger_id=trigger_id)
+        trigger = get_row(Pelican, trigger_id=trigger_id)
 
         params = {'tags': trigger.tags.lower(),
                   'category': trigger.category.lower()}
@@ -7,11 +7,11 @@ from pocket import Pocket, AuthException, RateLimitException
 # django classes
 from django.conf import settings
 from logging import getLogger
-from django.core.cache import caches
 
 # django_th classes
 from django_th.models import update_result, UserService
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 from django_th.html_entities import HtmlEntities
 
 """
@@ -32,8 +32,6 @@ from django_th.html_entities import HtmlEntities
 
 logger = getLogger('django_th.trigger_happy')
 
-cache = caches['django_th']
-
 
 class ServicePocket(ServicesMgr):
     """
@@ -116,7 +114,6 @@ class ServicePocket(ServicesMgr):
                     self.send_digest_event(trigger_id,
                                            my_pocket['given_title'],
                                            my_pocket['given_url'])
-                cache.set('th_pocket_' + str(trigger_id), data)
 
         return data
 
@@ -135,7 +132,7 @@ class ServicePocket(ServicesMgr):
             if len(data.get('link')) > 0:
                 # get the pocket data of this trigger
                 from th_pocket.models import Pocket as PocketModel
-                trigger = PocketModel.objects.get(trigger_id=trigger_id)
+                trigger = get_row(PocketModel, trigger_id=trigger_id)
 
                 title = self.set_title(data)
                 # convert htmlentities
@@ -6,10 +6,10 @@ from pushbullet import Pushbullet as Pushb
 # django classes
 from django.conf import settings
 from logging import getLogger
-from django.core.cache import caches
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 from django_th.models import update_result
 from th_pushbullet.models import Pushbullet
 
@@ -31,8 +31,6 @@ from th_pushbullet.models import Pushbullet
 
 logger = getLogger('django_th.trigger_happy')
 
-cache = caches['django_th']
-
 
 class ServicePushbullet(ServicesMgr):
     """
@@ -89,7 +87,7 @@ class ServicePushbullet(ServicesMgr):
                                        title,
                                        '')
 
-        cache.set('th_pushbullet_' + str(trigger_id), data)
+        data = self.unseen(trigger_id, data)
         return data
 
     def save_data(self, trigger_id, **data):
@@ -106,7 +104,7 @@ class ServicePushbullet(ServicesMgr):
                                                                   **data)
 
         if self.token:
-            trigger = Pushbullet.objects.get(trigger_id=trigger_id)
+            trigger = get_row(Pushbullet, trigger_id=trigger_id)
             if trigger.type == 'note':
                 status = self.pushb.push_note(title=title, body=content)
             elif trigger.type == 'link':
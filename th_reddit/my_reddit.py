@@ -4,12 +4,12 @@ import arrow
 from praw import Reddit as RedditApi
 # django classes
 from django.conf import settings
-from django.core.cache import caches
 from django.core.urlresolvers import reverse
 from logging import getLogger
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row, invalidate
 from django_th.models import update_result, UserService
 from th_reddit.models import Reddit
 
@@ -31,8 +31,6 @@ TH_SERVICES = (
 
 logger = getLogger('django_th.trigger_happy')
 
-cache = caches['django_th']
-
 
 class ServiceReddit(ServicesMgr):
     """
@@ -80,7 +78,7 @@ class ServiceReddit(ServicesMgr):
                 data.append({'title': title, 'content': body})
                 self.send_digest_event(trigger_id, title, '')
 
-        cache.set('th_reddit_' + str(trigger_id), data)
+        data = self.unseen(trigger_id, data)
         return data
 
     def save_data(self, trigger_id, **data):
@@ -100,7 +98,7 @@ class ServiceReddit(ServicesMgr):
                                                               **data)
         if self.token:
 
-            trigger = Reddit.objects.get(trigger_id=trigger_id)
+            trigger = get_row(Reddit, trigger_id=trigger_id)
             if trigger.share_link:
                 status = self.reddit.subreddit(trigger.subreddit)\
                     .submit(title=title, url=content)
@@ -155,5 +153,7 @@ class ServiceReddit(ServicesMgr):
         UserService.objects.filter(user=request.user,
                                    name='ServiceReddit'
                                    ).update(token=token)
+        # the processes reading the token read it again
+        invalidate(UserService)
 
         return 'reddit/callback.html'
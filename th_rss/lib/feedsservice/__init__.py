@@ -1 +1,2 @@
-from .feedsservice import Feeds
+from .feedsservice import Feeds, normalize_url
+from .streaming import StreamingFeeds
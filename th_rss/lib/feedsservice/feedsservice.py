@@ -1,7 +1,35 @@
 # -*- coding: utf-8 -*-
 import feedparser
+import requests
+from urllib.parse import urlsplit, urlunsplit
 
-__all__ = ['Feeds']
+from .fetcher import FeedTooLarge, fetch
+
+__all__ = ['Feeds', 'normalize_url']
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """
+        the same feed can be written in several ways by the users
+        eg HTTP://Example.com:80/feed#top is http://example.com/feed
+        :param url: url of the feed
+        :return: the normalized url
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    if not parts.netloc:
+        # a local file
+        return url
+    scheme = parts.scheme.lower()
+    host = parts.hostname or ''
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = '{}:{}'.format(host, parts.port)
+    if parts.username:
+        host = '{}@{}'.format(parts.username if parts.password is None else
+                              parts.username + ':' + parts.password, host)
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
 
 
 class Feeds(object):
@@ -17,12 +45,46 @@ class Feeds(object):
             raise KeyError('Missing argument "url_to_parse" eg.'
                            ' url_to_parse="/path/to/local/file.rss" or'
                            ' url_to_parse="http://domain.com/file.rss"')
+        # validators of the previous response, if any
+        self.etag = kwargs.get('etag') or None
+        self.modified = kwargs.get('modified') or None
+        # seconds allowed to get the feed, and its size at most
+        self.timeout = kwargs.get('timeout', 30)
+        self.max_bytes = kwargs.get('max_bytes', 5242880)
+
+    def _parse(self):
+        """
+            get the feed with the pooled session then parse it
+        """
+        if not self.URL_TO_PARSE.startswith(('http://', 'https://')):
+            return feedparser.parse(self.URL_TO_PARSE)
+        try:
+            response = fetch(self.URL_TO_PARSE, self.etag, self.modified,
+                             self.timeout, self.max_bytes, self.USER_AGENT)
+        except (requests.RequestException, FeedTooLarge) as e:
+            # not read at all, unlike a broken feed
+            return feedparser.FeedParserDict(bozo=1, bozo_exception=e,
+                                             entries=[], failed=True)
+        if response.status == 304:
+            data = feedparser.FeedParserDict(bozo=0, entries=[])
+        else:
+            data = feedparser.parse(response.body,
+                                    response_headers=dict(response.headers))
+        data['status'] = response.status
+        data['href'] = response.url
+        if response.headers.get('etag'):
+            data['etag'] = response.headers['etag']
+        if response.headers.get('last-modified'):
+            data['modified'] = response.headers['last-modified']
+        return data
 
     def datas(self):
         """
             read the data from a given URL or path to a local file
+            when the feed did not change since etag/modified, the server
+            answers 304 and the data contain no entries
         """
-        data = feedparser.parse(self.URL_TO_PARSE, agent=self.USER_AGENT)
+        data = self._parse()
 
         # when chardet says
         # >>> chardet.detect(data)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import os
+import threading
+import time
+from collections import namedtuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+__all__ = ['FeedTooLarge', 'Response', 'fetch', 'open_feed', 'read_feed']
+
+Response = namedtuple('Response', 'status headers body url')
+
+USER_AGENT = 'TriggerHappy/1.0 +http://trigger-happy.eu/'
+# connections kept per host, and number of hosts kept
+POOL_MAXSIZE = 10
+POOL_CONNECTIONS = 100
+CONNECT_TIMEOUT = 5
+
+_lock = threading.Lock()
+_session = None
+_pid = None
+
+
+class FeedTooLarge(ValueError):
+    pass
+
+
+def session():
+    """
+        one session per process : the connections to each host are kept
+        and reused by the next reads, by all the threads of the process
+    """
+    global _session, _pid
+    with _lock:
+        if _session is None or _pid != os.getpid():
+            # the connections of the parent can not be used after a fork
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS,
+                                  pool_maxsize=POOL_MAXSIZE)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+            # gzip and deflate, and br when brotli is installed
+            _session.headers.update({'User-Agent': USER_AGENT,
+                                     'Accept-Encoding': ACCEPT_ENCODING})
+            _pid = os.getpid()
+        return _session
+
+
+def open_feed(url, etag=None, modified=None, timeout=30, agent=None):
+    """
+        send the request, without reading the body
+        :param url: url of the feed
+        :param etag: ETag of the previous response
+        :param modified: Last-Modified of the previous response
+        :param timeout: seconds to wait for the server
+        :param agent: User-Agent, the one of the session by default
+        :return: requests.Response to read with read_feed
+        :raise requests.HTTPError: the server answered an error, 4xx or 5xx
+    """
+    headers = {}
+    if agent:
+        headers['User-Agent'] = agent
+    if etag:
+        headers['If-None-Match'] = etag
+    if modified:
+        headers['If-Modified-Since'] = modified
+    response = session().get(url, headers=headers, stream=True,
+                             timeout=(min(CONNECT_TIMEOUT, timeout), timeout))
+    if response.status_code >= 400:
+        # not a feed : a failure of the server, not a feed without news
+        response.close()
+        raise requests.HTTPError('{} : {} {}'.format(
+            url, response.status_code, response.reason), response=response)
+    return response
+
+
+def read_feed(response, max_bytes=5242880, timeout=30, chunk_size=16384):
+    """
+        read the body of the feed, chunk by chunk, uncompressed
+        :param response: requests.Response returned by open_feed
+        :param max_bytes: size of the body read at most
+        :param timeout: seconds allowed to read the whole body
+        :raise FeedTooLarge: when the body is larger than max_bytes
+        :raise requests.Timeout: when the server sends it too slowly
+    """
+    deadline = time.time() + timeout
+    size = 0
+    with response:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            size += len(chunk)
+            if size > max_bytes:
+                raise FeedTooLarge('{} : more than {} bytes'.format(
+                    response.url, max_bytes))
+            if time.time() > deadline:
+                raise requests.Timeout('{} : read for more than {}s'.format(
+                    response.url, timeout))
+            yield chunk
+
+
+def fetch(url, etag=None, modified=None, timeout=30, max_bytes=5242880,
+          agent=None):
+    """
+        get a feed with the pooled session
+        :return: status, headers, body and final url of the response
+        :rtype: Response
+        :raise requests.HTTPError: see open_feed
+    """
+    response = open_feed(url, etag, modified, timeout, agent)
+    body = b''
+    if response.status_code != 304:
+        body = b''.join(read_feed(response, max_bytes, timeout))
+    else:
+        response.close()
+    return Response(response.status_code, response.headers, body,
+                    response.url)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+import calendar
+from logging import getLogger
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+import feedparser
+import requests
+
+from .feedsservice import Feeds
+from .fetcher import open_feed, read_feed
+
+__all__ = ['StreamingFeeds']
+
+logger = getLogger('django_th.trigger_happy')
+
+# tags of the entries of RSS 0.9x/1.0/2.0 and Atom feeds
+ENTRY_TAGS = ('item', 'entry')
+DATE_TAGS = {'pubDate': 'published', 'published': 'published',
+             'issued': 'published', 'date': 'published',
+             'created': 'created', 'updated': 'updated',
+             'modified': 'updated'}
+TEXT_TAGS = {'title': 'title', 'description': 'summary',
+             'summary': 'summary', 'guid': 'id', 'id': 'id',
+             'encoded': 'content', 'content': 'content',
+             'creator': 'author', 'author': 'author'}
+# dates of the feed and of the trigger may not use the same time zone
+MARGIN = 86400
+
+
+def _local(tag):
+    """
+        the name of a tag without its namespace
+    """
+    return tag.rsplit('}', 1)[-1]
+
+
+def _entry(elem):
+    """
+        build a feedparser like entry from an <item> or an <entry>
+        :param elem: the element of the entry
+        :rtype: feedparser.FeedParserDict
+    """
+    entry = feedparser.FeedParserDict()
+    for child in elem:
+        tag = _local(child.tag)
+        text = (child.text or '').strip()
+        if tag == 'link':
+            # atom gives the link in href, rss in the text
+            if child.get('rel', 'alternate') == 'alternate':
+                entry.setdefault('link', child.get('href') or text)
+        elif tag in DATE_TAGS:
+            key = DATE_TAGS[tag]
+            if key not in entry and text:
+                entry[key] = text
+                entry[key + '_parsed'] = feedparser._parse_date(text)
+        elif tag in TEXT_TAGS:
+            key = TEXT_TAGS[tag]
+            if tag == 'author' and len(child):
+                # atom : <author><name>
+                text = next((n.text or '' for n in child
+                             if _local(n.tag) == 'name'), text)
+            if key == 'content':
+                entry.setdefault('content', [{'value': text}])
+            else:
+                entry.setdefault(key, text)
+    if 'id' not in entry and 'link' in entry:
+        entry['id'] = entry['link']
+    return entry
+
+
+def _timestamp(entry):
+    """
+        :return: the timestamp of the date of the entry or None
+    """
+    for key in ('published_parsed', 'created_parsed', 'updated_parsed'):
+        if entry.get(key):
+            return calendar.timegm(entry[key])
+    return None
+
+
+class StreamingFeeds(Feeds):
+    """
+        read the entries of a feed while it is downloaded, instead of
+        building the whole document ; for a feed sorted from the newest
+        entry to the oldest, stop at the first entry older than `since`
+    """
+
+    def __init__(self, **kwargs):
+        """
+            :param since: timestamp of the last read of the trigger
+            :param max_entries: number of entries read at most
+        """
+        super(StreamingFeeds, self).__init__(**kwargs)
+        self.since = kwargs.get('since')
+        self.max_entries = kwargs.get('max_entries', 500)
+
+    def _chunks(self, data):
+        """
+            the body of the feed, chunk by chunk
+        """
+        if self.URL_TO_PARSE.startswith(('http://', 'https://')):
+            response = open_feed(self.URL_TO_PARSE, self.etag, self.modified,
+                                 self.timeout, self.USER_AGENT)
+            data['status'] = response.status_code
+            data['href'] = response.url
+            if response.headers.get('etag'):
+                data['etag'] = response.headers['etag']
+            if response.headers.get('last-modified'):
+                data['modified'] = response.headers['last-modified']
+            if response.status_code != 200:
+                response.close()
+                return
+            # the size is checked by entries() to stop without error
+            yield from read_feed(response, float('inf'), self.timeout)
+        else:
+            with open(self.URL_TO_PARSE, 'rb') as f:
+                yield from iter(lambda: f.read(16384), b'')
+
+    def entries(self, data):
+        """
+            yield the entries as soon as they are parsed
+            :param data: dict receiving the status and the validators
+                         of the response, and 'truncated' when the feed
+                         has not been read until its end
+        """
+        parser = XMLPullParser(events=('end',))
+        size = count = 0
+        previous = None
+        ordered = True
+        for chunk in self._chunks(data):
+            size += len(chunk)
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if _local(elem.tag) not in ENTRY_TAGS:
+                    continue
+                entry = _entry(elem)
+                # free the memory of the entry
+                elem.clear()
+                stamp = _timestamp(entry)
+                if stamp is None or (previous is not None and
+                                     stamp > previous):
+                    ordered = False
+                if ordered and previous is not None and \
+                        self.since is not None and \
+                        stamp < self.since - MARGIN:
+                    # the following entries are older : already read
+                    data.update(truncated=True, since=self.since)
+                    return
+                previous = stamp
+                yield entry
+                count += 1
+                if count >= self.max_entries:
+                    data['truncated'] = True
+                    return
+            if size >= self.max_bytes:
+                logger.warning("{} : more than {} bytes, stop reading".format(
+                    self.URL_TO_PARSE, self.max_bytes))
+                data['truncated'] = True
+                return
+        parser.close()
+
+    def datas(self):
+        """
+            read the data from a given URL or path to a local file
+            :return: the same data as feedparser, with only the entries
+        """
+        data = feedparser.FeedParserDict(bozo=0, entries=[],
+                                         truncated=False)
+        try:
+            data['entries'] = list(self.entries(data))
+        except ParseError as e:
+            # feedparser knows how to read the broken feeds
+            logger.info("{} : {}, parsed again".format(self.URL_TO_PARSE, e))
+            return super(StreamingFeeds, self).datas()
+        except requests.RequestException as e:
+            logger.warning("{} : {}".format(self.URL_TO_PARSE, e))
+            return feedparser.FeedParserDict(bozo=1, bozo_exception=e,
+                                             entries=[], failed=True)
+        return data
@@ -0,0 +1,3 @@
+from .feedswriter import entries, json_feed, rss_feed
+
+__all__ = ['entries', 'json_feed', 'rss_feed']
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+from email.utils import formatdate
+from xml.sax.saxutils import escape, quoteattr
+
+from django_th.timestamps import entry_epoch
+
+__all__ = ['entries', 'json_feed', 'rss_feed']
+
+RSS_HEAD = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+<channel>
+    <title>{title}</title>
+    <atom:link href={self_url} rel="self" type="application/rss+xml" />
+{next_link}    <link>{home_url}</link>
+    <description>{description}</description>
+    <lastBuildDate>{last_build_date}</lastBuildDate>
+    <language>{lang}</language>
+    <generator>TriggerHappy {version}</generator>
+'''
+RSS_NEXT = '''    <atom:link href={} rel="next" type="application/rss+xml" />
+'''
+RSS_ITEM = '''    <item>
+        <title>{title}</title>
+        <link>{link}</link>
+        <guid isPermaLink="false">{id}</guid>
+{published}        <description>{content}</description>
+    </item>
+'''
+RSS_TAIL = '''</channel>
+</rss>
+'''
+
+
+def _content(entry):
+    """
+        the html of an entry, wherever the provider put it
+    """
+    content = entry.get('content')
+    if isinstance(content, (list, tuple)) and content:
+        content = content[0].get('value')
+    if isinstance(content, dict):
+        content = content.get('value')
+    return content or entry.get('description') or entry.get('summary') or ''
+
+
+def entries(data):
+    """
+        the entries published by a trigger, as a simple dict used by all
+        the formats
+        :param data: the data of the trigger
+    """
+    for entry in data or []:
+        if not hasattr(entry, 'get'):
+            continue
+        link = entry.get('link') or ''
+        yield {'id': str(entry.get('id') or link or entry.get('title')),
+               'title': entry.get('title') or '',
+               'link': link,
+               'published': entry_epoch(entry),
+               'content': str(_content(entry))}
+
+
+def rss_feed(meta, items):
+    """
+        write a RSS 2.0 feed item by item
+        :param meta: title, description, home_url, self_url, next_url,
+                     last_build_date, lang and version of the feed
+        :param items: the entries to write
+    """
+    yield RSS_HEAD.format(
+        title=escape(meta['title']),
+        self_url=quoteattr(meta['self_url']),
+        next_link=RSS_NEXT.format(quoteattr(meta['next_url']))
+        if meta.get('next_url') else '',
+        home_url=escape(meta['home_url']),
+        description=escape(meta['description']),
+        last_build_date=escape(str(meta.get('last_build_date') or '')),
+        lang=escape(meta['lang']),
+        version=escape(meta['version']))
+    for item in items:
+        published = ''
+        if item['published'] is not None:
+            published = '        <pubDate>{}</pubDate>\n'.format(
+                formatdate(item['published'], usegmt=True))
+        yield RSS_ITEM.format(title=escape(item['title']),
+                              link=escape(item['link']),
+                              id=escape(item['id']),
+                              published=published,
+                              content=escape(item['content']))
+    yield RSS_TAIL
+
+
+def json_feed(meta, items):
+    """
+        write a JSON Feed, https://jsonfeed.org/version/1, item by item
+        :param meta: same as rss_feed
+        :param items: the entries to write
+    """
+    head = {'version': 'https://jsonfeed.org/version/1',
+            'title': meta['title'],
+            'description': meta['description'],
+            'home_page_url': meta['home_url'],
+            'feed_url': meta['self_url']}
+    if meta.get('next_url'):
+        head['next_url'] = meta['next_url']
+    # the items are written before the closing brace of the head
+    yield json.dumps(head)[:-1] + ', "items": ['
+    for i, item in enumerate(items):
+        entry = {'id': item['id'],
+                 'url': item['link'],
+                 'title': item['title'],
+                 'content_html': item['content']}
+        if item['published'] is not None:
+            entry['date_published'] = datetime.datetime.utcfromtimestamp(
+                item['published']).strftime('%Y-%m-%dT%H:%M:%SZ')
+        yield (', ' if i else '') + json.dumps(entry)
+    yield ']}'
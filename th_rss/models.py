@@ -1,5 +1,8 @@
 # coding: utf-8
+from django.core.cache import caches
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django_th.models.services import Services
 from django_th.models import TriggerService
 import uuid
@@ -12,6 +15,9 @@ class Rss(Services):
     uuid = models.UUIDField(unique=True, default=uuid.uuid4, editable=False)
     url = models.URLField(max_length=255)
     trigger = models.ForeignKey(TriggerService)
+    # validators of the last response, sent back at the next read
+    etag = models.CharField(max_length=255, blank=True, default='')
+    modified = models.CharField(max_length=255, blank=True, default='')
 
     class Meta:
         app_label = 'django_th'
@@ -26,3 +32,37 @@ class Rss(Services):
 
     def __str__(self):
         return "%s" % self.url
+
+
+def feeds_key(user_id):
+    """
+        cache key of the list of the RSS feeds generated for a user
+    """
+    return 'django_th_rss_feeds_{}'.format(user_id)
+
+
+@receiver([post_save, post_delete], sender=TriggerService,
+          dispatch_uid='th_rss_trigger_changed')
+def trigger_changed(sender, instance, **kwargs):
+    """
+        the consumer of the trigger may have changed to or from RSS
+    """
+    caches['django_th'].delete(feeds_key(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=Rss,
+          dispatch_uid='th_rss_rss_changed')
+def rss_changed(sender, instance, **kwargs):
+    user_id = TriggerService.objects.filter(
+        id=instance.trigger_id).values_list('user_id', flat=True).first()
+    if user_id is not None:
+        caches['django_th'].delete(feeds_key(user_id))
+
+
+@receiver(post_delete, sender=Rss, dispatch_uid='th_rss_rss_deleted')
+def rss_deleted(sender, instance, **kwargs):
+    """
+        the feed generated by the trigger is not served any more
+    """
+    from th_rss.published import PublishedFeed
+    PublishedFeed(instance.trigger_id).clear()
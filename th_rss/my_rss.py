@@ -1,6 +1,5 @@
 # coding: utf-8
-import arrow
-import datetime
+import hashlib
 import time
 from logging import getLogger
 
@@ -10,13 +9,19 @@ from django.core.cache import caches
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.timestamps import newer, to_epoch
 # th_rss classes
-from th_rss.lib.feedsservice import Feeds
+from th_rss.lib.feedsservice import Feeds, StreamingFeeds, normalize_url
+from th_rss.models import Rss
+from th_rss.published import PublishedFeed
 
 logger = getLogger('django_th.trigger_happy')
 
 cache = caches['django_th']
 
+# seconds a trigger waits for the feed being fetched by another one
+FETCH_WAIT = 10
+
 
 class ServiceRss(ServicesMgr):
     """
@@ -24,27 +29,100 @@ class ServiceRss(ServicesMgr):
     """
     def __init__(self, token=None, **kwargs):
         super(ServiceRss, self).__init__(token, **kwargs)
+        # the feed and the validators of the response read by this
+        # instance, saved once the data are stored
+        self.validators = None
+
+    @staticmethod
+    def set_validators(rss, feeds):
+        """
+            keep the ETag and Last-Modified of the response for the next read
+            :param rss: Rss object
+            :param feeds: the data returned by fetch
+        """
+        etag = feeds.get('etag', '') or ''
+        modified = feeds.get('modified', '') or ''
+        if etag != rss.etag or modified != rss.modified:
+            Rss.objects.filter(id=rss.id).update(etag=etag[:255],
+                                                 modified=modified[:255])
 
-    def _get_published(self, entry):
+    def data_stored(self, trigger_id):
+        """
+            the entries read are stored : the next read can ask for the
+            ones published since this response only
         """
-        get the 'published' attribute
-        :param entry:
-        :return:
+        if self.validators is not None:
+            self.set_validators(*self.validators)
+            self.validators = None
+
+    @staticmethod
+    def _usable(feeds, since):
+        """
+            a feed read until the last read of another trigger can not be
+            used by a trigger that has not been read since a longer time
+        """
+        return feeds is not None and (
+            not feeds.get('since') or
+            (since is not None and since >= feeds['since']))
+
+    def fetch(self, rss, since=None):
+        """
+            fetch and parse a feed once for all the triggers reading it
+            with the same validators ; while one trigger fetches it,
+            the others wait for its result instead of fetching it again
+            :param rss: Rss object
+            :param since: timestamp of the last read of the trigger
+            :return: status, etag, modified and entries of the feed, bozo
+                     when it is broken, and failed when it could not be
+                     read (timeout, too large, error of the server)
+            :rtype: dict
         """
-        published = ''
-        if hasattr(entry, 'published_parsed'):
-            if entry.published_parsed is not None:
-                published = datetime.datetime.utcfromtimestamp(
-                    time.mktime(entry.published_parsed))
-        elif hasattr(entry, 'created_parsed'):
-            if entry.created_parsed is not None:
-                published = datetime.datetime.utcfromtimestamp(
-                    time.mktime(entry.created_parsed))
-        elif hasattr(entry, 'updated_parsed'):
-            if entry.updated_parsed is not None:
-                published = datetime.datetime.utcfromtimestamp(
-                    time.mktime(entry.updated_parsed))
-        return published
+        url = normalize_url(rss.url)
+        key = 'django_th_rss_feed_' + hashlib.sha1('{} {} {}'.format(
+            url, rss.etag, rss.modified).encode('utf-8')).hexdigest()
+        feeds = cache.get(key)
+        if self._usable(feeds, since):
+            return feeds
+        locked = cache.add(key + '_lock', 1, timeout=FETCH_WAIT)
+        if not locked:
+            end = time.time() + FETCH_WAIT
+            while time.time() < end:
+                time.sleep(0.2)
+                feeds = cache.get(key)
+                if self._usable(feeds, since):
+                    return feeds
+        try:
+            kwargs = {'url_to_parse': url,
+                      'etag': rss.etag,
+                      'modified': rss.modified,
+                      'timeout': settings.DJANGO_TH.get('feed_timeout', 30),
+                      'max_bytes': settings.DJANGO_TH.get('feed_max_bytes',
+                                                          5242880)}
+            if settings.DJANGO_TH.get('feed_streaming'):
+                # stop reading at the entries older than the last read
+                kwargs.update(
+                    since=since,
+                    max_entries=settings.DJANGO_TH.get('feed_max_entries',
+                                                       500))
+                data = StreamingFeeds(**kwargs).datas()
+            else:
+                data = Feeds(**kwargs).datas()
+            feeds = {'status': data.get('status'),
+                     'failed': data.get('failed', False),
+                     'bozo': data.get('bozo', 0),
+                     'etag': data.get('etag', ''),
+                     'modified': data.get('modified', ''),
+                     'since': data.get('since'),
+                     'entries': list(data.entries)}
+            # the feed that could not be read is fetched again next time
+            if not feeds['failed']:
+                cache.set(key, feeds,
+                          timeout=settings.DJANGO_TH.get('feed_ttl', 120))
+        finally:
+            # the lock of another process is left to it
+            if locked:
+                cache.delete(key + '_lock')
+        return feeds
 
     def read_data(self, **kwargs):
         """
@@ -56,6 +134,7 @@ class ServiceRss(ServicesMgr):
         """
         date_triggered = kwargs.get('date_triggered')
         trigger_id = kwargs.get('trigger_id')
+        self.validators = None
         kwargs['model_name'] = 'Rss'
         kwargs['app_label'] = 'django_th'
         # get the URL from the trigger id
@@ -63,34 +142,44 @@ class ServiceRss(ServicesMgr):
 
         logger.debug("RSS Feeds from %s : url %s", rss.name, rss.url)
 
-        now = arrow.utcnow().to(settings.TIME_ZONE)
         my_feeds = []
 
-        # retrieve the data
-        feeds = Feeds(**{'url_to_parse': rss.url}).datas()
-
-        for entry in feeds.entries:
-            # entry.*_parsed may be None when the date in a RSS Feed is invalid
-            # so will have the "now" date as default
-            published = self._get_published(entry)
-
-            if published == '':
-                published = now
-            else:
-                published = arrow.get(str(published)).to(settings.TIME_ZONE)
-
-            date_triggered = arrow.get(
-                str(date_triggered)).to(settings.TIME_ZONE)
-
-            if date_triggered is not None and\
-               published is not None and\
-               now >= published >= date_triggered:
-                my_feeds.append(entry)
-
-                # digester
-                self.send_digest_event(trigger_id, entry.title, entry.link)
-
-        cache.set('th_rss_' + str(trigger_id), my_feeds)
-        cache.set('th_rss_uuid_{}'.format(rss.uuid), my_feeds)
+        # retrieve the data, unless they did not change since the last time
+        since = to_epoch(date_triggered)
+        feeds = self.fetch(rss, since)
+        if feeds.get('failed'):
+            logger.warning("RSS Feeds from %s : not read", rss.name)
+            # the validators are kept, the provider failed
+            return False
+        if feeds['status'] == 304:
+            logger.debug("RSS Feeds from %s : not modified", rss.name)
+            # what has not been published yet is still in the cache
+            return my_feeds
+        # a broken feed is read again entirely next time
+        if feeds['status'] == 200 and not feeds['bozo']:
+            self.validators = (rss, feeds)
+
+        # entry.*_parsed may be None when the date in a RSS Feed is invalid
+        # so will have the "now" date as default
+        my_feeds = newer(feeds['entries'], since)
+        for entry in my_feeds:
+            # digester
+            self.send_digest_event(trigger_id, entry.title, entry.link)
+
+        my_feeds = self.unseen(trigger_id, my_feeds)
         # return the data
         return my_feeds
+
+    def save_data(self, trigger_id, **data):
+        """
+            add the data to the feed generated by the trigger
+
+            :param trigger_id: trigger ID from which to save data
+            :param data: the data to check to be used and save
+            :type trigger_id: int
+            :type data:  dict
+            :return: the status of the save statement
+            :rtype: boolean
+        """
+        PublishedFeed(trigger_id).add([data])
+        return True
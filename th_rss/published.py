@@ -0,0 +1,95 @@
+# coding: utf-8
+from __future__ import unicode_literals
+from __future__ import absolute_import
+
+# django
+from django.conf import settings
+from django.core.cache import caches
+from django_redis import get_redis_connection
+
+# trigger happy
+from django_th.stacks import bump_version
+from th_rss.lib.feedswriter import entries
+
+__all__ = ['PublishedFeed']
+
+
+class PublishedFeed(object):
+    """
+        the entries published by a trigger to the feed it generates, the
+        last settings.DJANGO_TH['feed_output_length'] of them, oldest
+        first, in a redis stream : the feed is served from them whatever
+        the data of the trigger still waiting in its outbox
+    """
+
+    def __init__(self, trigger_id, connection=None):
+        """
+            :param trigger_id: id of the trigger
+            :param connection: redis connection, the one of the
+                               django_th cache by default
+        """
+        self.trigger_id = trigger_id
+        self.key = 'django_th_rss_published_{}'.format(trigger_id)
+        self.cache = caches['django_th']
+        self.connection = connection
+        self.length = settings.DJANGO_TH.get('feed_output_length', 100)
+
+    @property
+    def redis(self):
+        if self.connection is None:
+            self.connection = get_redis_connection('django_th')
+        return self.connection
+
+    def __len__(self):
+        return self.redis.xlen(self.key)
+
+    def add(self, items):
+        """
+            put entries at the end of the feed, the oldest ones beyond its
+            length are dropped
+            :param items: the data published, eg read from a provider
+        """
+        pipe = self.redis.pipeline()
+        # only what the feed shows : no feedparser object, no blob
+        for entry in entries(items):
+            pipe.xadd(self.key, {'data': self.cache.client.encode({
+                'id': entry['id'],
+                'title': entry['title'],
+                'link': entry['link'],
+                'description': entry['content'],
+                'my_date': entry['published']})},
+                maxlen=self.length, approximate=False)
+        pipe.execute()
+        bump_version(self.trigger_id)
+
+    def scan(self, after=None, count=None, chunk_size=100):
+        """
+            the entries of the feed from the oldest, read chunk by chunk
+            :param after: id of the entry to start after, from the first
+                          one by default
+            :param count: number of entries, all of them by default
+            :return: the entries and their id, (id, entry)
+            :rtype: generator
+        """
+        start = '-' if after is None else '(' + after
+        while count is None or count > 0:
+            size = chunk_size if count is None else min(chunk_size, count)
+            chunk = self.redis.xrange(self.key, start, '+', count=size)
+            for entry_id, fields in chunk:
+                yield (entry_id.decode(),
+                       self.cache.client.decode(fields[b'data']))
+            if len(chunk) < size:
+                return
+            start = '(' + chunk[-1][0].decode()
+            if count is not None:
+                count -= len(chunk)
+
+    def all(self):
+        """
+            :return: all the entries of the feed, the oldest first
+            :rtype: list
+        """
+        return [entry for _, entry in self.scan()]
+
+    def clear(self):
+        self.redis.delete(self.key)
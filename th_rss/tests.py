@@ -1,20 +1,55 @@
 # coding: utf-8
+import json
+import os
+import tempfile
 import uuid
 import arrow
+from unittest.mock import Mock, patch
+
+import feedparser
+import requests
 
 from django.conf import settings
-from django.test import RequestFactory
+from django.core.cache import caches
+from django.http import Http404
+from django.test import RequestFactory, TestCase
 
-from th_rss.models import Rss
+from th_rss.models import Rss, feeds_key
+from th_rss.published import PublishedFeed
 from th_rss.forms import RssProviderForm
-from th_rss.views import MyRssFeed
+from th_rss.lib.feedsservice import Feeds, StreamingFeeds
+from th_rss.lib.feedsservice.fetcher import FeedTooLarge, Response, \
+    open_feed, read_feed
+from th_rss.views import MyRssFeed, MyRssFeeds
 
 import django_th
+from django_th.stack_store import stack_store
+from django_th.stacks import bump_version, stack_version, version_time
 from django_th.tests.test_main import MainTest, setup_view
 
 
+FETCH = 'th_rss.lib.feedsservice.feedsservice.fetch'
+
+
+def rss_body(*dates):
+    items = ''.join('<item><title>foo</title><link>https://foo.bar/{}</link>'
+                    '<pubDate>{}</pubDate></item>'.format(
+                        i, date.format('ddd, DD MMM YYYY HH:mm:ss') + ' GMT')
+                    for i, date in enumerate(dates))
+    return '<?xml version="1.0" encoding="utf-8"?><rss version="2.0">' \
+           '<channel><title>foo</title>{}</channel></rss>'.format(
+               items).encode('utf-8')
+
+
 class RssTest(MainTest):
 
+    def setUp(self):
+        super(RssTest, self).setUp()
+        caches['django_th'].delete_pattern('django_th_rss_feed_*')
+        caches['django_th'].delete_pattern('django_th_seen_*')
+        caches['django_th'].delete_pattern('django_th_rss_output_*')
+        caches['django_th'].delete_pattern('django_th_rss_feeds_*')
+
     def create_rss(self):
         trigger = self.create_triggerservice(consumer_name='ServiceRss',
                                              provider_name='ServiceEvernote')
@@ -77,9 +112,247 @@ class RssFormTest(RssTest):
         self.assertEqual(kwargs['model_name'], 'Rss')
 
         s = ServiceRss()
-        data = s.read_data(**kwargs)
+        response = Response(200, {}, rss_body(arrow.utcnow()), r.url)
+        with patch(FETCH, return_value=response):
+            data = s.read_data(**kwargs)
 
         self.assertTrue(type(data) is list)
+        # stored by Read.reading, once filtered by the rules
+        self.assertIsNone(stack_store().get('th_rss_{}'.format(r.trigger_id)))
+
+    def test_read_data_not_modified(self):
+        r = self.create_rss()
+        r.etag = '"abc"'
+        r.save()
+        from th_rss.my_rss import ServiceRss
+        kwargs = {'date_triggered': arrow.get('2013-05-11T21:23:58+00:00'),
+                  'trigger_id': r.trigger_id}
+        cache = caches['django_th']
+        cache.set('th_rss_{}'.format(r.trigger_id), ['not published yet'])
+        self.addCleanup(cache.delete, 'th_rss_{}'.format(r.trigger_id))
+        response = Response(304, {}, b'', r.url)
+        with patch(FETCH, return_value=response) as mock_fetch:
+            data = ServiceRss().read_data(**kwargs)
+        self.assertEqual(data, [])
+        self.assertEqual(mock_fetch.call_args[0][1], '"abc"')
+        # what is still in the cache is kept for the next publishing
+        self.assertEqual(cache.get('th_rss_{}'.format(r.trigger_id)),
+                         ['not published yet'])
+
+    def test_read_data_validators(self):
+        r = self.create_rss()
+        from th_rss.my_rss import ServiceRss
+        kwargs = {'date_triggered': arrow.get('2013-05-11T21:23:58+00:00'),
+                  'trigger_id': r.trigger_id}
+        response = Response(
+            200, {'content-type': 'application/rss+xml', 'etag': '"abc"',
+                  'last-modified': 'Sat, 07 Sep 2002 00:00:01 GMT'},
+            rss_body(), r.url)
+        se = ServiceRss()
+        with patch(FETCH, return_value=response):
+            se.read_data(**kwargs)
+        # saved once the data are stored only
+        r.refresh_from_db()
+        self.assertEqual(r.etag, '')
+        # by the instance that read them
+        ServiceRss().data_stored(r.trigger_id)
+        r.refresh_from_db()
+        self.assertEqual(r.etag, '')
+        se.data_stored(r.trigger_id)
+        r.refresh_from_db()
+        self.assertEqual(r.etag, '"abc"')
+        self.assertEqual(r.modified, 'Sat, 07 Sep 2002 00:00:01 GMT')
+
+    def test_read_data_validators_bozo(self):
+        r = self.create_rss()
+        from th_rss.my_rss import ServiceRss
+        kwargs = {'date_triggered': arrow.get('2013-05-11T21:23:58+00:00'),
+                  'trigger_id': r.trigger_id}
+        response = Response(200, {'etag': '"abc"'}, b'<rss><channel>',
+                            r.url)
+        se = ServiceRss()
+        with patch(FETCH, return_value=response):
+            se.read_data(**kwargs)
+        se.data_stored(r.trigger_id)
+        # a broken feed is read again entirely
+        r.refresh_from_db()
+        self.assertEqual(r.etag, '')
+
+    def test_read_data_failed(self):
+        r = self.create_rss()
+        r.etag = '"abc"'
+        r.save()
+        from th_rss.my_rss import ServiceRss
+        kwargs = {'date_triggered': arrow.get('2013-05-11T21:23:58+00:00'),
+                  'trigger_id': r.trigger_id}
+        with patch(FETCH, side_effect=FeedTooLarge('too large')) as mock_fetch:
+            self.assertFalse(ServiceRss().read_data(**kwargs))
+            self.assertFalse(ServiceRss().read_data(**kwargs))
+        # not cached, the validators are kept
+        self.assertEqual(mock_fetch.call_count, 2)
+        r.refresh_from_db()
+        self.assertEqual(r.etag, '"abc"')
+
+    def test_read_data_shared(self):
+        from th_rss.my_rss import ServiceRss
+        r1 = self.create_rss()
+        trigger = r1.trigger
+        trigger.pk = 2
+        trigger.save()
+        r2 = Rss.objects.create(
+            url='HTTPS://Blog.Trigger-Happy.eu/feeds/all.rss.xml#latest',
+            name=r1.name, trigger=trigger, status=True)
+        response = Response(200, {}, rss_body(arrow.utcnow()), r1.url)
+        with patch(FETCH, return_value=response) as mock_fetch:
+            data1 = ServiceRss().read_data(
+                date_triggered=arrow.get('2013-05-11T21:23:58+00:00'),
+                trigger_id=r1.trigger_id)
+            data2 = ServiceRss().read_data(
+                date_triggered=arrow.utcnow().shift(days=1),
+                trigger_id=r2.trigger_id)
+        # one fetch, filtered by the date of each trigger
+        mock_fetch.assert_called_once()
+        self.assertEqual(len(data1), 1)
+        self.assertEqual(data2, [])
+
+    def test_fetch_locked(self):
+        from th_rss.my_rss import ServiceRss, cache
+        r = self.create_rss()
+        response = Response(200, {}, rss_body(arrow.utcnow()), r.url)
+        with patch(FETCH, return_value=response), \
+                patch('th_rss.my_rss.FETCH_WAIT', 0), \
+                patch.object(cache, 'add', return_value=False), \
+                patch.object(cache, 'delete') as mock_delete:
+            # fetched by another process for too long : fetched again
+            self.assertEqual(ServiceRss().fetch(r)['status'], 200)
+        # its lock is left to it
+        mock_delete.assert_not_called()
+
+
+class StreamingFeedsTest(TestCase):
+
+    def feed(self, days):
+        items = ''.join(
+            '<item><title>item {0}</title>'
+            '<link>https://foo.bar/{0}</link>'
+            '<pubDate>{1}</pubDate></item>'.format(
+                day, arrow.get('2017-10-{:02d}'.format(day)).format(
+                    'ddd, DD MMM YYYY HH:mm:ss') + ' GMT')
+            for day in days)
+        return self.write('<?xml version="1.0" encoding="utf-8"?>'
+                          '<rss version="2.0"><channel><title>foo</title>'
+                          '{}</channel></rss>'.format(items))
+
+    def write(self, content):
+        fd, path = tempfile.mkstemp(suffix='.rss')
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_datas(self):
+        path = self.feed([20, 10, 1])
+        data = StreamingFeeds(url_to_parse=path).datas()
+        self.assertEqual([e.title for e in data.entries],
+                         ['item 20', 'item 10', 'item 1'])
+        self.assertEqual(data.entries[0].link, 'https://foo.bar/20')
+        self.assertEqual(data.entries[0].published_parsed[:3],
+                         (2017, 10, 20))
+        self.assertFalse(data.truncated)
+
+    def test_stop_at_since(self):
+        since = arrow.get('2017-10-15').timestamp
+        path = self.feed([20, 18, 10, 1])
+        data = StreamingFeeds(url_to_parse=path, since=since).datas()
+        self.assertEqual(len(data.entries), 2)
+        self.assertTrue(data.truncated)
+        self.assertEqual(data.since, since)
+
+    def test_not_ordered(self):
+        since = arrow.get('2017-10-15').timestamp
+        # the oldest first : read until the end
+        path = self.feed([1, 10, 20])
+        data = StreamingFeeds(url_to_parse=path, since=since).datas()
+        self.assertEqual(len(data.entries), 3)
+
+    def test_max_entries(self):
+        path = self.feed([20, 10, 1])
+        data = StreamingFeeds(url_to_parse=path, max_entries=2).datas()
+        self.assertEqual(len(data.entries), 2)
+        self.assertTrue(data.truncated)
+
+    def test_atom(self):
+        path = self.write(
+            '<feed xmlns="http://www.w3.org/2005/Atom"><title>foo</title>'
+            '<entry><title>bar</title><id>urn:1</id>'
+            '<link rel="alternate" href="https://foo.bar/1"/>'
+            '<updated>2017-10-20T10:00:00Z</updated>'
+            '<content type="html">baz</content></entry></feed>')
+        entry = StreamingFeeds(url_to_parse=path).datas().entries[0]
+        self.assertEqual((entry.title, entry.id, entry.link),
+                         ('bar', 'urn:1', 'https://foo.bar/1'))
+        self.assertEqual(entry.content[0]['value'], 'baz')
+        self.assertIsNotNone(entry.updated_parsed)
+
+    def test_invalid(self):
+        path = self.write('<rss><channel><item><title>foo & bar</title>'
+                          '</item></channel></rss>')
+        # parsed again by feedparser
+        with patch('feedparser.parse') as mock_parse:
+            StreamingFeeds(url_to_parse=path).datas()
+        mock_parse.assert_called_once()
+
+
+class FetcherTest(TestCase):
+
+    def test_datas(self):
+        response = Response(200, {'content-type': 'application/rss+xml'},
+                            rss_body(arrow.get('2017-10-20')),
+                            'https://foo.bar/feed')
+        with patch(FETCH, return_value=response) as mock_fetch:
+            data = Feeds(url_to_parse='https://foo.bar/feed', timeout=5,
+                         max_bytes=1024).datas()
+        mock_fetch.assert_called_once_with(
+            'https://foo.bar/feed', None, None, 5, 1024, Feeds.USER_AGENT)
+        self.assertEqual(data.status, 200)
+        self.assertEqual(data.entries[0].link, 'https://foo.bar/0')
+
+    def test_too_large(self):
+        with patch(FETCH, side_effect=FeedTooLarge('too large')):
+            data = Feeds(url_to_parse='https://foo.bar/feed').datas()
+        self.assertEqual(data.entries, '')
+
+    def test_server_error(self):
+        response = Mock(status_code=503, reason='Service Unavailable',
+                        url='https://foo.bar/feed')
+        with patch('th_rss.lib.feedsservice.fetcher.session') as mock_session:
+            mock_session.return_value.get.return_value = response
+            with self.assertRaises(requests.HTTPError):
+                open_feed('https://foo.bar/feed')
+            response.close.assert_called_once_with()
+            # a failure of the provider, not a feed without news
+            data = Feeds(url_to_parse='https://foo.bar/feed').datas()
+            self.assertTrue(data.failed)
+            data = StreamingFeeds(url_to_parse='https://foo.bar/feed').datas()
+            self.assertTrue(data.failed)
+
+    def test_read_feed(self):
+        class FakeResponse(object):
+            url = 'https://foo.bar/feed'
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def iter_content(self, chunk_size):
+                return iter([b'a' * chunk_size] * 4)
+
+        body = b''.join(read_feed(FakeResponse(), 64, chunk_size=16))
+        self.assertEqual(len(body), 64)
+        with self.assertRaises(FeedTooLarge):
+            list(read_feed(FakeResponse(), 63, chunk_size=16))
 
 
 class TestMyRssFeed(RssTest):
@@ -100,6 +373,129 @@ class TestMyRssFeed(RssTest):
         self.assertEqual(response.context_data['version'],
                          django_th.__version__)
 
+    def test_get_cached(self):
+        view = MyRssFeed.as_view(template_name=self.template)
+        response = view(self.request, uuid=str(self.uuid))
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        request = RequestFactory().get('/th/myfeeds/{}'.format(self.uuid),
+                                       HTTP_IF_NONE_MATCH=etag)
+        # the feed has not changed : no query, no rendering
+        with self.assertNumQueries(0):
+            response = view(request, uuid=str(self.uuid))
+        self.assertEqual(response.status_code, 304)
+        with self.assertNumQueries(0):
+            response = view(self.request, uuid=str(self.uuid))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['ETag'], etag)
+        # the data of the trigger changed : rendered again
+        trigger_id = Rss.objects.get(uuid=self.uuid).trigger_id
+        bump_version(trigger_id)
+        response = view(request, uuid=str(self.uuid))
+        self.assertEqual(response.status_code, 304)
+        output = caches['django_th'].get(
+            'django_th_rss_output_{}'.format(self.uuid))
+        self.assertEqual(output['stack_version'], stack_version(trigger_id))
+        # modified when the data changed
+        self.assertEqual(output['last_modified'],
+                         version_time(stack_version(trigger_id)))
+
+    def stack(self, count):
+        trigger_id = Rss.objects.get(uuid=self.uuid).trigger_id
+        # the entries published to the feed
+        feed = PublishedFeed(trigger_id)
+        feed.clear()
+        self.addCleanup(feed.clear)
+        feed.add([
+            {'title': 'foo {}'.format(i),
+             'link': 'https://foo.bar/{}'.format(i),
+             'description': '<p>bar & baz</p>',
+             'my_date': arrow.get('2017-10-20')} for i in range(count)])
+        return feed
+
+    def test_streaming_rss(self):
+        published = self.stack(5)
+        cursor = list(published.scan(count=2))[-1][0]
+        request = RequestFactory().get(
+            '/th/myfeeds/{}/'.format(self.uuid),
+            {'limit': 2, 'cursor': cursor})
+        response = MyRssFeed.as_view()(request, uuid=str(self.uuid))
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        feed = feedparser.parse(content)
+        self.assertEqual([e.title for e in feed.entries], ['foo 2', 'foo 3'])
+        self.assertEqual(feed.entries[0].summary, '<p>bar & baz</p>')
+        # the next page starts after the last entry of this one
+        next_cursor = list(published.scan(count=4))[-1][0]
+        self.assertIn('cursor={}'.format(next_cursor), content)
+        # same version of the data : not modified
+        request = RequestFactory().get(
+            '/th/myfeeds/{}/'.format(self.uuid),
+            {'limit': 2, 'cursor': cursor},
+            HTTP_IF_NONE_MATCH=response['ETag'])
+        response = MyRssFeed.as_view()(request, uuid=str(self.uuid))
+        self.assertEqual(response.status_code, 304)
+
+    def test_streaming_last_page(self):
+        feed = self.stack(3)
+        cursor = list(feed.scan(count=2))[-1][0]
+        request = RequestFactory().get(
+            '/th/myfeeds/{}/'.format(self.uuid),
+            {'limit': 2, 'cursor': cursor})
+        response = MyRssFeed.as_view()(request, uuid=str(self.uuid))
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual([e.title for e in feedparser.parse(content).entries],
+                         ['foo 2'])
+        self.assertNotIn('rel="next"', content)
+
+    def test_streaming_json(self):
+        self.stack(3)
+        request = RequestFactory().get(
+            '/th/myfeeds/{}/'.format(self.uuid), {'format': 'json'})
+        response = MyRssFeed.as_view()(request, uuid=str(self.uuid))
+        feed = json.loads(
+            b''.join(response.streaming_content).decode('utf-8'))
+        self.assertEqual(feed['version'], 'https://jsonfeed.org/version/1')
+        self.assertEqual(len(feed['items']), 3)
+        self.assertNotIn('next_url', feed)
+        self.assertEqual(feed['items'][0]['date_published'],
+                         '2017-10-20T00:00:00Z')
+
+    def test_streaming_bad_request(self):
+        request = RequestFactory().get(
+            '/th/myfeeds/{}/'.format(self.uuid), {'limit': 'all'})
+        response = MyRssFeed.as_view()(request, uuid=str(self.uuid))
+        self.assertEqual(response.status_code, 400)
+        request = RequestFactory().get(
+            '/th/myfeeds/{}/'.format(self.uuid), {'cursor': '+'})
+        response = MyRssFeed.as_view()(request, uuid=str(self.uuid))
+        self.assertEqual(response.status_code, 400)
+
+    def test_save_data(self):
+        from th_rss.my_rss import ServiceRss
+        rss = Rss.objects.get(uuid=self.uuid)
+        feed = PublishedFeed(rss.trigger_id)
+        feed.clear()
+        self.addCleanup(feed.clear)
+        version = stack_version(rss.trigger_id)
+        with self.settings(DJANGO_TH=dict(settings.DJANGO_TH,
+                                          feed_output_length=2)):
+            for i in range(3):
+                self.assertTrue(ServiceRss().save_data(
+                    rss.trigger_id, title='foo {}'.format(i),
+                    link='https://foo.bar/{}'.format(i),
+                    content=[{'value': '<p>bar</p>'}]))
+        self.assertNotEqual(stack_version(rss.trigger_id), version)
+        # the last ones, shown once dropped from the outbox
+        view = setup_view(MyRssFeed(template_name=self.template),
+                          self.request)
+        data = view.get_context_data(uuid=self.uuid)['data']
+        self.assertEqual([d['title'] for d in data], ['foo 1', 'foo 2'])
+        self.assertEqual(data[0]['description'], '<p>bar</p>')
+        # dropped with the feed
+        rss.delete()
+        self.assertEqual(len(feed), 0)
+
     def test_context_data(self):
         kwargs = {'uuid': self.uuid}
 
@@ -114,3 +510,55 @@ class TestMyRssFeed(RssTest):
         self.assertTrue('lang' in context)
         self.assertTrue('version' in context)
         self.assertTrue('uuid' in context)
+
+
+class TestMyRssFeeds(RssTest):
+
+    def setUp(self):
+        super(TestMyRssFeeds, self).setUp()
+        self.rss = self.create_rss()
+        for i in range(4):
+            Rss.objects.create(url='https://foo.bar/{}'.format(i),
+                               name='feed {}'.format(i),
+                               trigger=self.rss.trigger)
+
+    def get(self, **params):
+        request = RequestFactory().get('/th/myfeeds/', params)
+        request.user = self.user
+        return MyRssFeeds.as_view(paginate_by=2)(request)
+
+    def names(self, response):
+        return [rss['name'] for rss in response.context_data['rss_list']]
+
+    def test_get(self):
+        with self.settings(DJANGO_TH={'paginate_by': 2}):
+            with self.assertNumQueries(1):
+                response = self.get()
+            self.assertEqual(self.names(response),
+                             ['TriggerHappy RSS', 'feed 0'])
+            page = response.context_data['page_obj']
+            self.assertFalse(page.has_previous())
+            self.assertEqual(page.num_pages, 3)
+            # the list of the feeds is cached
+            with self.assertNumQueries(0):
+                response = self.get(after=page.next_after)
+            self.assertEqual(self.names(response), ['feed 1', 'feed 2'])
+            page = response.context_data['page_obj']
+            self.assertEqual(page.number, 2)
+            response = self.get(before=page.previous_before)
+            self.assertEqual(self.names(response),
+                             ['TriggerHappy RSS', 'feed 0'])
+            self.assertRaises(Http404, self.get, after='foo')
+
+    def test_invalidated(self):
+        with self.settings(DJANGO_TH={'paginate_by': 10}):
+            self.get()
+            self.assertIsNotNone(
+                caches['django_th'].get(feeds_key(self.user.id)))
+            Rss.objects.filter(name='feed 0').delete()
+            self.assertIsNone(
+                caches['django_th'].get(feeds_key(self.user.id)))
+            self.assertNotIn('feed 0', self.names(self.get()))
+            self.rss.trigger.save()
+            self.assertIsNone(
+                caches['django_th'].get(feeds_key(self.user.id)))
@@ -1,10 +1,23 @@
 # coding: utf-8
+import bisect
+import hashlib
+import math
+import re
+import time
+
 from django.views.generic import TemplateView, ListView
 from django.core.cache import caches
 from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, \
+    StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 
-from th_rss.models import Rss
+from th_rss.lib.feedswriter import entries, json_feed, rss_feed
+from th_rss.models import Rss, feeds_key
+from th_rss.published import PublishedFeed
 from django_th.models import TriggerService
+from django_th.stacks import stack_version, version_time
 
 import django_th
 
@@ -14,6 +27,115 @@ class MyRssFeed(TemplateView):
         page to display its RSS from any service
     """
     template_name = "rss/my_feed.html"
+    # query parameters served by streaming
+    stream_params = ('format', 'limit', 'cursor')
+    # id of the last entry of the previous page
+    cursor_format = re.compile(r'^\d+(-\d+)?$')
+
+    @staticmethod
+    def _output_key(uuid):
+        return 'django_th_rss_output_{}'.format(uuid)
+
+    def streaming(self, request, uuid):
+        """
+            write the feed entry by entry, one page of it with
+            ?limit=<count>&cursor=<id>, as JSON Feed with ?format=json ;
+            the entries are read chunk by chunk from the one after the
+            cursor
+        """
+        cursor = request.GET.get('cursor') or None
+        if cursor is not None and not self.cursor_format.match(cursor):
+            return HttpResponseBadRequest('cursor is the id of an entry')
+        try:
+            limit = int(request.GET['limit']) \
+                if request.GET.get('limit') else None
+        except ValueError:
+            return HttpResponseBadRequest('limit is a number')
+        if limit is not None and limit < 1:
+            return HttpResponseBadRequest('limit is at least 1')
+        rss = Rss.objects.select_related('trigger').get(uuid=uuid)
+        trigger = rss.trigger
+        version = stack_version(trigger.id)
+        next_cursor = None
+        feed = PublishedFeed(trigger.id)
+        if limit is None:
+            # the entries published, read while they are sent
+            data = feed.scan(cursor)
+        else:
+            # one more than the page to know whether there is a next one
+            data = list(feed.scan(cursor, limit + 1))
+            if len(data) > limit:
+                data = data[:limit]
+                next_cursor = data[-1][0]
+
+        meta = {'title': 'Trigger Happy',
+                'description': 'The Micro Entreprise Service BUS (ESB)',
+                'home_url': 'http://www.trigger-happy.eu',
+                'self_url': request.build_absolute_uri(),
+                'last_build_date': trigger.date_triggered,
+                'lang': settings.LANGUAGE_CODE,
+                'version': django_th.__version__}
+        if next_cursor is not None:
+            params = request.GET.copy()
+            params['cursor'] = next_cursor
+            meta['next_url'] = request.build_absolute_uri(
+                '?' + params.urlencode())
+
+        if request.GET.get('format') == 'json':
+            writer, content_type = json_feed, 'application/json'
+        else:
+            writer, content_type = rss_feed, 'application/rss+xml'
+        response = StreamingHttpResponse(
+            writer(meta, entries(d for _, d in data)),
+            content_type=content_type + '; charset=utf-8')
+        if version is None:
+            return response
+        etag = '"{}"'.format(hashlib.sha1('{} {}'.format(
+            version, request.GET.urlencode()).encode('utf-8')).hexdigest())
+        last_modified = version_time(version)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return get_conditional_response(request, etag=etag,
+                                        last_modified=last_modified,
+                                        response=response)
+
+    def get(self, request, *args, **kwargs):
+        """
+            the feed is rendered once per version of the data of the
+            trigger, and the feed readers get a 304 while it is the same
+        """
+        if 'uuid' in kwargs and \
+                any(param in request.GET for param in self.stream_params):
+            return self.streaming(request, kwargs['uuid'])
+        cache = caches['django_th']
+        key = self._output_key(kwargs.get('uuid'))
+        output = cache.get(key) if 'uuid' in kwargs else None
+        if output is not None and \
+                output['stack_version'] == stack_version(output['trigger_id']):
+            response = HttpResponse(output['content'],
+                                    content_type=output['content_type'])
+        else:
+            response = super(MyRssFeed, self).get(request, *args, **kwargs)
+            response.render()
+            if 'uuid' not in kwargs:
+                return response
+            output = {'trigger_id': response.context_data['trigger_id'],
+                      'stack_version': response.context_data['stack_version'],
+                      'content': response.content,
+                      'content_type': response['Content-Type'],
+                      'etag': '"{}"'.format(
+                          hashlib.sha1(response.content).hexdigest()),
+                      # when the data changed, rendered now or later
+                      'last_modified': version_time(
+                          response.context_data['stack_version']) or
+                      int(time.time())}
+            cache.set(key, output, timeout=86400)
+        response['ETag'] = output['etag']
+        response['Last-Modified'] = http_date(output['last_modified'])
+        return get_conditional_response(
+            request, etag=output['etag'],
+            last_modified=output['last_modified'], response=response)
 
     def get_context_data(self, **kw):
         context = super(MyRssFeed, self).get_context_data(**kw)
@@ -21,14 +143,13 @@ class MyRssFeed(TemplateView):
         if 'uuid' in kw:
             # get the uuid from the Rss model
             rss = Rss.objects.get(uuid=kw['uuid'])
+            # read before the data, a change after it renders them again
+            context['trigger_id'] = rss.trigger_id
+            context['stack_version'] = stack_version(rss.trigger_id)
             # get its related Trigger where Provider use RSS
             trigger = TriggerService.objects.get(id=rss.trigger_id)
-            # cut 'Service' to get the service name itself
-            provider = trigger.provider.name.name.split('Service')[1].lower()
-            cache = caches['django_th']
-            pattern = 'th_{provider}_{id}'.format(provider=provider,
-                                                  id=rss.trigger_id)
-            context['data'] = cache.get(pattern)
+            # the entries published
+            context['data'] = PublishedFeed(rss.trigger_id).all()
             context['uuid'] = kw['uuid']
             context['last_build_date'] = trigger.date_triggered
         context['lang'] = settings.LANGUAGE_CODE
@@ -36,14 +157,35 @@ class MyRssFeed(TemplateView):
         return context
 
 
+class KeysetPage(object):
+    """
+        a page of the feeds, starting after or ending before the id
+        of a feed, so a page does not move when feeds are added
+    """
+
+    def __init__(self, object_list, start, end, count, per_page):
+        self.object_list = object_list
+        self.number = start // per_page + 1
+        self.num_pages = int(math.ceil(count / per_page))
+        self.previous_before = object_list[0]['id'] if start > 0 else None
+        self.next_after = object_list[-1]['id'] if end < count else None
+
+    def has_previous(self):
+        return self.previous_before is not None
+
+    def has_next(self):
+        return self.next_after is not None
+
+
 class MyRssFeeds(ListView):
     """
         page to display all existing UUID from all RSS
     """
     context_object_name = "rss_list"
-    queryset = TriggerService.objects.all()
     template_name = "rss/my_feeds.html"
     paginate_by = 3
+    # the list is forgotten as soon as a trigger or a feed changes
+    listing_timeout = 86400
 
     def get_paginate_by(self, queryset):
         """
@@ -53,15 +195,45 @@ class MyRssFeeds(ListView):
         return settings.DJANGO_TH.get('paginate_by', self.paginate_by)
 
     def get_queryset(self):
+        """
+            the feeds of the triggers of the user where the CONSUMER is
+            the ServiceRss, read with one query then kept in cache
+            :return: id, uuid and name of each feed, sorted by id
+        """
         # connected ?
-        if self.request.user.is_authenticated():
-            # get the Trigger that are MINE and where the CONSUMER is
-            # the ServiceRss
-            triggers = self.queryset.filter(user=self.request.user,
-                                            consumer__name='ServiceRss')
-            rss = []
-            for trigger in triggers:
-                rss.append(Rss.objects.get(trigger_id=trigger.id))
-            return rss
-        # otherwise return nothing when user is not connected
-        return TriggerService.objects.none()
+        if not self.request.user.is_authenticated():
+            return []
+        cache = caches['django_th']
+        key = feeds_key(self.request.user.id)
+        feeds = cache.get(key)
+        if feeds is None:
+            feeds = list(Rss.objects.filter(
+                trigger__user=self.request.user,
+                trigger__consumer__name='ServiceRss').order_by('id').values(
+                'id', 'uuid', 'name'))
+            cache.set(key, feeds, timeout=self.listing_timeout)
+        return feeds
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+            keyset pagination : ?after=<id> gives the page following
+            the feed <id>, ?before=<id> the page preceding it
+        """
+        try:
+            after = int(self.request.GET.get('after', 0))
+            before = int(self.request.GET['before']) \
+                if self.request.GET.get('before') else None
+        except ValueError:
+            raise Http404('after and before are ids of feeds')
+        ids = [feed['id'] for feed in queryset]
+        if before is not None:
+            end = bisect.bisect_left(ids, before)
+            start = max(0, end - page_size)
+        else:
+            start = bisect.bisect_right(ids, after)
+            end = start + page_size
+        object_list = queryset[start:end]
+        if not object_list:
+            return None, None, object_list, False
+        page = KeysetPage(object_list, start, end, len(queryset), page_size)
+        return None, page, object_list, len(queryset) > page_size
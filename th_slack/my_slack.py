@@ -7,6 +7,7 @@ from django.core.cache import caches
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 from django_th.models import TriggerService
 from th_slack.models import Slack
 
@@ -42,10 +43,10 @@ class ServiceSlack(ServicesMgr):
             :rtype: dict
         """
         status = False
-        service = TriggerService.objects.get(id=trigger_id)
+        service = get_row(TriggerService, id=trigger_id)
         desc = service.description
 
-        slack = Slack.objects.get(trigger_id=trigger_id)
+        slack = get_row(Slack, trigger_id=trigger_id)
 
         title = self.set_title(data)
         if title is None:
@@ -64,7 +65,8 @@ class ServiceSlack(ServicesMgr):
         payload = {'username': username,
                    'text': data}
 
-        r = requests.post(slack.webhook_url, json=payload)
+        r = requests.post(slack.webhook_url, json=payload,
+                          timeout=self.request_timeout())
 
         if r.status_code == requests.codes.ok:
             status = True
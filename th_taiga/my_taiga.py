@@ -7,6 +7,7 @@ from django.core.cache import caches
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 from django_th.models import UserService
 from th_taiga.models import Taiga
 
@@ -26,7 +27,7 @@ class ServiceTaiga(ServicesMgr):
 
     def taiga_api(self):
 
-        us = UserService.objects.get(user=self.user, name='ServiceTaiga')
+        us = get_row(UserService, user=self.user, name='ServiceTaiga')
         if us.token:
             api = TaigaAPI(token=us.token, host=us.host)
         else:
@@ -54,7 +55,7 @@ class ServiceTaiga(ServicesMgr):
             :rtype: dict
         """
         status = False
-        taiga = Taiga.objects.get(trigger_id=trigger_id)
+        taiga = get_row(Taiga, trigger_id=trigger_id)
         title = self.set_title(data)
         body = self.set_content(data)
         # add a 'story' to the project
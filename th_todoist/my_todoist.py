@@ -1,15 +1,14 @@
 # coding: utf-8
-import arrow
 # TodoistAPI
 from todoist.api import TodoistAPI
 
 # django classes
 from django.conf import settings
 from logging import getLogger
-from django.core.cache import caches
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.timestamps import to_epoch
 
 
 """
@@ -29,8 +28,6 @@ from django_th.services.services import ServicesMgr
 
 logger = getLogger('django_th.trigger_happy')
 
-cache = caches['django_th']
-
 
 class ServiceTodoist(ServicesMgr):
     """
@@ -64,15 +61,14 @@ class ServiceTodoist(ServicesMgr):
             :rtype: list
         """
         trigger_id = kwargs.get('trigger_id')
-        date_triggered = kwargs.get('date_triggered')
+        date_triggered = to_epoch(kwargs.get('date_triggered'))
         data = []
         project_name = 'Main Project'
         items = self.todoist.sync()
         try:
             for item in items.get('items'):
-                date_added = arrow.get(item.get('date_added'),
-                                       'ddd DD MMM YYYY HH:mm:ss ZZ')
-                if date_added > date_triggered:
+                # Fri 01 Sep 2017 10:00:00 +0000
+                if to_epoch(item.get('date_added')) > date_triggered:
                     for project in items.get('projects'):
                         if item.get('project_id') == project.get('id'):
                             project_name = project.get('name')
@@ -85,7 +81,7 @@ class ServiceTodoist(ServicesMgr):
                                            title,
                                            '')
 
-            cache.set('th_todoist_' + str(trigger_id), data)
+            data = self.unseen(trigger_id, data)
         except AttributeError:
             logger.error(items)
 
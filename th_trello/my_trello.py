@@ -6,11 +6,11 @@ from trello import TrelloClient, ResourceUnavailable
 from django.conf import settings
 from django.utils.translation import ugettext as _
 from logging import getLogger
-from django.core.cache import caches
 
 # django_th classes
 from django_th.apps import DjangoThConfig
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 from django_th.models import update_result, UserService
 
 """
@@ -32,8 +32,6 @@ from django_th.models import update_result, UserService
 
 logger = getLogger('django_th.trigger_happy')
 
-cache = caches['django_th']
-
 
 class ServiceTrello(ServicesMgr):
     """
@@ -77,9 +75,7 @@ class ServiceTrello(ServicesMgr):
             :param kwargs: contain keyword args : trigger_id at least
             :type kwargs: dict
         """
-        trigger_id = kwargs.get('trigger_id')
         data = list()
-        cache.set('th_trello_' + str(trigger_id), data)
         return data
 
     def save_data(self, trigger_id, **data):
@@ -101,7 +97,7 @@ class ServiceTrello(ServicesMgr):
 
         if len(title):
             # get the data of this trigger
-            t = Trello.objects.get(trigger_id=trigger_id)
+            t = get_row(Trello, trigger_id=trigger_id)
             # footer of the card
             footer = self.set_card_footer(data, t)
             content += footer
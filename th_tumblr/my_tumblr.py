@@ -2,12 +2,12 @@
 from pytumblr import TumblrRestClient
 # django classes
 from django.conf import settings
-from django.core.cache import caches
 
 from logging import getLogger
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
 
 """
     handle process with tumblr
@@ -21,7 +21,6 @@ from django_th.services.services import ServicesMgr
 """
 
 logger = getLogger('django_th.trigger_happy')
-cache = caches['django_th']
 
 
 class ServiceTumblr(ServicesMgr):
@@ -64,9 +63,8 @@ class ServiceTumblr(ServicesMgr):
 
             :rtype: list
         """
-        trigger_id = kwargs.get('trigger_id')
         data = list()
-        cache.set('th_tumblr_' + str(trigger_id), data)
+        return data
 
     def save_data(self, trigger_id, **data):
         """
@@ -84,7 +82,7 @@ class ServiceTumblr(ServicesMgr):
                                                               **data)
 
         # get the data of this trigger
-        trigger = Tumblr.objects.get(trigger_id=trigger_id)
+        trigger = get_row(Tumblr, trigger_id=trigger_id)
         # we suppose we use a tag property for this service
         status = self.tumblr.create_text(blogname=trigger.blogname,
                                          title=title,
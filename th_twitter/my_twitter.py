@@ -1,5 +1,6 @@
 # coding: utf-8
 import arrow
+import time
 
 # Twitter lib
 from twython import Twython, TwythonAuthError, TwythonRateLimitError
@@ -8,10 +9,11 @@ from twython import Twython, TwythonAuthError, TwythonRateLimitError
 from django.conf import settings
 from django.utils import html
 from django.utils.translation import ugettext as _
-from django.core.cache import caches
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row
+from django_th.timestamps import to_epoch
 from django_th.models import update_result, UserService
 from th_twitter.models import Twitter
 
@@ -29,13 +31,14 @@ from logging import getLogger
 """
 
 logger = getLogger('django_th.trigger_happy')
-cache = caches['django_th']
 
 
 class ServiceTwitter(ServicesMgr):
     """
         Service Twitter
     """
+    rate_limit_host = 'api.twitter.com'
+
     def __init__(self, token=None, **kwargs):
         """
 
@@ -48,12 +51,17 @@ class ServiceTwitter(ServicesMgr):
         self.token = token
         self.oauth = 'oauth1'
         self.service = 'ServiceTwitter'
+        self.limiter = self.rate_limiter(self.token)
         if self.token is not None:
             token_key, token_secret = self.token.split('#TH#')
             try:
                 self.twitter_api = Twython(self.consumer_key,
                                            self.consumer_secret,
                                            token_key, token_secret)
+                self.timed(self.twitter_api.client)
+                # learn the remaining budget from each response of the API
+                self.twitter_api.client.hooks['response'].append(
+                    self.limiter.learn_response)
             except (TwythonAuthError, TwythonRateLimitError) as e:
                 us = UserService.objects.get(token=token)
                 logger.error(e.msg, e.error_code)
@@ -69,12 +77,12 @@ class ServiceTwitter(ServicesMgr):
         """
         twitter_status_url = 'https://www.twitter.com/{}/status/{}'
         twitter_fav_url = 'https://www.twitter.com/{}/status/{}'
-        now = arrow.utcnow().to(settings.TIME_ZONE)
+        now = int(time.time())
         my_tweets = []
         search = {}
         since_id = None
         trigger_id = kwargs['trigger_id']
-        date_triggered = arrow.get(kwargs['date_triggered'])
+        date_triggered = to_epoch(kwargs['date_triggered'])
 
         def _get_tweets(twitter_obj, search):
             """
@@ -112,9 +120,12 @@ class ServiceTwitter(ServicesMgr):
                 search['q'] = twitter_obj.tag
                 search['result_type'] = 'recent'
                 # do a search
-                statuses = self.twitter_api.search(**search)
-                # just return the content of te statuses array
-                statuses = statuses['statuses']
+                try:
+                    statuses = self.twitter_api.search(**search)
+                    # just return the content of te statuses array
+                    statuses = statuses['statuses']
+                except TwythonRateLimitError as e:
+                    self.limiter.block(e.retry_after)
 
             # get the tweets from a given user
             # https://dev.twitter.com/docs/api/1.1/get/statuses/user_timeline
@@ -136,6 +147,8 @@ class ServiceTwitter(ServicesMgr):
                 except TwythonAuthError as e:
                     logger.error(e.msg, e.error_code)
                     update_result(trigger_id, msg=e.msg, status=False)
+                except TwythonRateLimitError as e:
+                    self.limiter.block(e.retry_after)
 
             return count, search, statuses
 
@@ -183,19 +196,17 @@ class ServiceTwitter(ServicesMgr):
                                                             s['id_str'])
                             title = _('Tweet from @{}'.format(screen_name))
                         # Wed Aug 29 17:12:58 +0000 2012
-                        my_date = arrow.get(s['created_at'],
-                                            'ddd MMM DD HH:mm:ss Z YYYY')
-                        published = arrow.get(my_date).to(settings.TIME_ZONE)
+                        published = to_epoch(s['created_at'])
                         if date_triggered is not None and \
                            published is not None and \
                            now >= published >= date_triggered:
                             my_tweets.append({'title': title,
                                               'content': s['text'],
                                               'link': url,
-                                              'my_date': my_date})
+                                              'my_date': arrow.get(published)})
                             # digester
                             self.send_digest_event(trigger_id, title, url)
-                    cache.set('th_twitter_' + str(trigger_id), my_tweets)
+                    my_tweets = self.unseen(trigger_id, my_tweets)
                     Twitter.objects.filter(trigger_id=trigger_id).update(
                         since_id=since_id,
                         max_id=max_id,
@@ -246,7 +257,7 @@ class ServiceTwitter(ServicesMgr):
         """
 
         # get the Twitter data of this trigger
-        trigger = Twitter.objects.get(trigger_id=trigger_id)
+        trigger = get_row(Twitter, trigger_id=trigger_id)
 
         tags = ''
 
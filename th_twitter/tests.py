@@ -10,7 +10,7 @@ from th_twitter.my_twitter import ServiceTwitter
 from django_th.tests.test_main import MainTest
 
 
-from twython import Twython
+from twython import Twython, TwythonRateLimitError
 
 cache = caches['django_th']
 
@@ -119,6 +119,43 @@ class ServiceTwitterTest(TwitterTest):
         se.read_data(**kwargs)
         mock1.assert_called_with(**search)
 
+    @patch.object(Twython, 'get_user_timeline')
+    def test_read_data_no_date(self, mock1):
+        statuses = [{'id': 3, 'id_str': '3', 'text': 'foo',
+                     'user': {'screen_name': 'johndoe'},
+                     'created_at': 'Wed Aug 29 17:12:58 +0000 2018'},
+                    {'id': 2, 'id_str': '2', 'text': 'bar',
+                     'user': {'screen_name': 'johndoe'},
+                     'created_at': None}]
+        mock1.return_value = statuses
+        t = self.create_twitter(tag='', screen='johndoe', fav=False)
+        kwargs = dict({'date_triggered': '2013-05-11 13:23:58+00:00',
+                       'model_name': 'Twitter',
+                       'trigger_id': t.trigger_id})
+
+        se = ServiceTwitter(self.token)
+        data = se.read_data(**kwargs)
+        # the tweet without date is skipped
+        self.assertEqual([d['content'] for d in data], ['foo'])
+
+    @patch.object(Twython, 'search')
+    def test_read_data_rate_limit(self, mock1):
+        mock1.side_effect = TwythonRateLimitError('Rate limit', 429,
+                                                  retry_after=60)
+        t = self.create_twitter(tag='twitter', screen='', fav=False)
+        kwargs = dict({'date_triggered': '2013-05-11 13:23:58+00:00',
+                       'model_name': 'Twitter',
+                       'trigger_id': t.trigger_id})
+
+        se = ServiceTwitter(self.token)
+        cache.delete(se.limiter.key)
+        self.addCleanup(cache.delete, se.limiter.key)
+        self.assertEqual(se.read_data(**kwargs), [])
+        # the reader defers the trigger until then
+        self.assertIsNotNone(se.limiter.blocked_until)
+        self.assertIs(se.rate_limiter(self.token), se.limiter)
+        self.assertFalse(se.limiter.available())
+
     @patch.object(Twython, 'update_status')
     def test_save_data(self, mock1):
         self.create_twitter()
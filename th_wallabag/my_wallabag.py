@@ -8,10 +8,10 @@ from wallabag_api.wallabag import Wallabag as Wall
 # django classes
 from django.core.urlresolvers import reverse
 from logging import getLogger
-from django.core.cache import caches
 
 # django_th classes
 from django_th.services.services import ServicesMgr
+from django_th.rows import get_row, invalidate
 from django_th.html_entities import HtmlEntities
 from django_th.models import UserService, ServicesActivated, update_result
 from th_wallabag.models import Wallabag
@@ -29,8 +29,6 @@ from th_wallabag.models import Wallabag
 
 logger = getLogger('django_th.trigger_happy')
 
-cache = caches['django_th']
-
 
 class ServiceWallabag(ServicesMgr):
     """
@@ -42,7 +40,7 @@ class ServiceWallabag(ServicesMgr):
         self.user = kwargs.get('user')
 
     def _get_wall_data(self):
-        us = UserService.objects.get(user=self.user, name='ServiceWallabag')
+        us = get_row(UserService, user=self.user, name='ServiceWallabag')
 
         params = dict({'access_token': self.token,
                        'archive': 0,
@@ -55,11 +53,13 @@ class ServiceWallabag(ServicesMgr):
                        'tags': []})
 
         responses = requests.get(us.host + '/api/entries.json',
-                                 params=params)
+                                 params=params,
+                                 timeout=self.request_timeout())
         if responses.status_code == 401:
             params['access_token'] = Wall.get_token(host=us.host, **params)
             responses = requests.get(us.host + '/api/entries.json',
-                                     params=params)
+                                     params=params,
+                                     timeout=self.request_timeout())
         elif responses.status_code != 200:
             raise HTTPError(responses.status_code, responses.json())
 
@@ -99,8 +99,7 @@ class ServiceWallabag(ServicesMgr):
                     self.send_digest_event(self.trigger_id,
                                            d.get('title'),
                                            link='')
-            if len(data) > 0:
-                cache.set('th_wallabag_' + str(self.trigger_id), data)
+            data = self.unseen(self.trigger_id, data)
         except Exception as e:
                 logger.critical(e)
                 update_result(self.trigger_id, msg=e, status=False)
@@ -113,7 +112,7 @@ class ServiceWallabag(ServicesMgr):
             then store the token
         :return: wall instance
         """
-        us = UserService.objects.get(user=self.user, name='ServiceWallabag')
+        us = get_row(UserService, user=self.user, name='ServiceWallabag')
         params = {
             'client_id': us.client_id,
             'client_secret': us.client_secret,
@@ -132,6 +131,8 @@ class ServiceWallabag(ServicesMgr):
 
         UserService.objects.filter(user=self.user,
                                    name='ServiceWallabag').update(token=token)
+        # the other processes use the new token too
+        invalidate(UserService)
 
         return wall
 
@@ -176,7 +177,7 @@ class ServiceWallabag(ServicesMgr):
         """
         self.trigger_id = trigger_id
 
-        trigger = Wallabag.objects.get(trigger_id=trigger_id)
+        trigger = get_row(Wallabag, trigger_id=trigger_id)
 
         title = self.set_title(data)
         if title is not None:
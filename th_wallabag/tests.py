@@ -89,7 +89,8 @@ class ServiceWallabagTest(WallabagTest):
             se = ServiceWallabag(self.token)
             se.read_data(**kwargs)
         mock_read_data.assert_called_once_with('http://localhost/api'
-                                               '/entries.json', params=params)
+                                               '/entries.json', params=params,
+                                               timeout=se.request_timeout())
 
     def test_save_data(self):
         self.create_triggerservice()